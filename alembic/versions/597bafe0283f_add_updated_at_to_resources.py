@@ -0,0 +1,33 @@
+"""add_updated_at_to_resources
+
+Revision ID: 597bafe0283f
+Revises: 71534d37a60a
+Create Date: 2025-06-12 14:03:52.860114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "597bafe0283f"
+down_revision: Union[str, None] = "71534d37a60a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lets resource edits bump the version used for ETag / Last-Modified
+    op.add_column("resources", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE resources SET updated_at = COALESCE(added_at, CURRENT_TIMESTAMP)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("resources", "updated_at")
@@ -0,0 +1,44 @@
+"""add_rendered_html_columns
+
+Revision ID: 5f3b69c00c8e
+Revises: 48a95dd8d4e4
+Create Date: 2025-06-10 10:12:31.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f3b69c00c8e"
+down_revision: Union[str, None] = "48a95dd8d4e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Materialized HTML for the markdown fields, filled by `flask render-markdown`
+    op.add_column("projects", sa.Column("description_html", sa.Text(), nullable=True))
+    op.add_column("projects", sa.Column("purpose_html", sa.Text(), nullable=True))
+    op.add_column(
+        "projects", sa.Column("desired_outcome_html", sa.Text(), nullable=True)
+    )
+    op.add_column("projects", sa.Column("markdown_version", sa.Integer(), nullable=True))
+    op.add_column("tasks", sa.Column("description_html", sa.Text(), nullable=True))
+    op.add_column("tasks", sa.Column("context_html", sa.Text(), nullable=True))
+    op.add_column("tasks", sa.Column("markdown_version", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("tasks", "markdown_version")
+    op.drop_column("tasks", "context_html")
+    op.drop_column("tasks", "description_html")
+    op.drop_column("projects", "markdown_version")
+    op.drop_column("projects", "desired_outcome_html")
+    op.drop_column("projects", "purpose_html")
+    op.drop_column("projects", "description_html")
@@ -0,0 +1,46 @@
+"""add_project_listing_indexes
+
+Revision ID: 71534d37a60a
+Revises: 5f3b69c00c8e
+Create Date: 2025-06-11 09:41:07.215530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "71534d37a60a"
+down_revision: Union[str, None] = "5f3b69c00c8e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination needs a non-null sort key on every row
+    op.execute(
+        "UPDATE projects SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    )
+    op.create_index("ix_projects_updated_at_id", "projects", ["updated_at", "id"])
+    op.create_index(
+        "ix_projects_status_updated_at_id", "projects", ["status", "updated_at", "id"]
+    )
+    op.create_index(
+        "ix_projects_priority_updated_at_id",
+        "projects",
+        ["priority", "updated_at", "id"],
+    )
+    op.create_index("ix_projects_deadline", "projects", ["deadline"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_projects_deadline", table_name="projects")
+    op.drop_index("ix_projects_priority_updated_at_id", table_name="projects")
+    op.drop_index("ix_projects_status_updated_at_id", table_name="projects")
+    op.drop_index("ix_projects_updated_at_id", table_name="projects")
@@ -0,0 +1,67 @@
+"""add_full_text_search
+
+Revision ID: 9b4e7f2a6c3d
+Revises: f3a9c1d7e2b6
+Create Date: 2025-06-16 10:41:19.664025
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e7f2a6c3d"
+down_revision: Union[str, None] = "f3a9c1d7e2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Title weighted A, main text B, the rest C/D; services/search.py ranks on these
+SEARCH_VECTORS = {
+    "projects": (
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(purpose, '') || ' ' || coalesce(desired_outcome, '')), 'C')"
+    ),
+    "tasks": (
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(context, '')), 'C')"
+    ),
+    "resources": (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(url, '')), 'D')"
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite (local runs) builds an FTS5 index on the first search instead
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Generated columns, so PostgreSQL keeps them current on every write. They
+    # aren't mapped on the models: SQLite couldn't create them.
+    for table, vector in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY ix_{table}_search_vector "
+                f"ON {table} USING gin (search_vector)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in SEARCH_VECTORS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
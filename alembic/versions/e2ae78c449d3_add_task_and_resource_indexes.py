@@ -0,0 +1,52 @@
+"""add_task_and_resource_indexes
+
+Revision ID: e2ae78c449d3
+Revises: 597bafe0283f
+Create Date: 2025-06-13 11:27:45.903172
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2ae78c449d3"
+down_revision: Union[str, None] = "597bafe0283f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction; it keeps the tables writable
+    # while the indexes build. Verify with `flask explain-hot-queries`.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_project_id_sort_order",
+            "tasks",
+            ["project_id", "sort_order", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_status", "tasks", ["status"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_tasks_due_date", "tasks", ["due_date"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_resources_task_id",
+            "resources",
+            ["task_id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_resources_task_id", table_name="resources")
+    op.drop_index("ix_tasks_due_date", table_name="tasks")
+    op.drop_index("ix_tasks_status", table_name="tasks")
+    op.drop_index("ix_tasks_project_id_sort_order", table_name="tasks")
@@ -0,0 +1,35 @@
+"""add_resource_fingerprints
+
+Revision ID: f3a9c1d7e2b6
+Revises: c7d2e5a1f4b8
+Create Date: 2025-06-15 16:02:48.530217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c1d7e2b6"
+down_revision: Union[str, None] = "c7d2e5a1f4b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled in by `flask fingerprint-resources` for existing rows
+    # Wider than url: canonicalizing can lengthen it
+    op.add_column("resources", sa.Column("canonical_url", sa.String(length=1024), nullable=True))
+    op.add_column("resources", sa.Column("notes_simhash", sa.BigInteger(), nullable=True))
+    op.create_index("ix_resources_canonical_url", "resources", ["canonical_url"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_resources_canonical_url", table_name="resources")
+    op.drop_column("resources", "notes_simhash")
+    op.drop_column("resources", "canonical_url")
@@ -0,0 +1,89 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from flask import Response, request, session
+from sqlalchemy import func, select, true
+from models.project import Project
+from models.task import Task
+from models.resource import Resource
+
+
+@dataclass(frozen=True)
+class ContentVersion:
+    """Cheap validator for a project (or all projects) and everything below it."""
+
+    etag: str
+    last_modified: datetime | None
+
+
+def project_version(db, project_id=None, kind="json"):
+    """
+    Compute the version of a project graph with a single aggregate query
+
+    Combines the max `updated_at` and the row counts of the projects, their
+    tasks and their resources, so edits, inserts and deletes all change it.
+
+    Args:
+        db: Database session
+        project_id: Project to version, or None for every project
+        kind: Representation being versioned, mixed into the ETag
+
+    Returns:
+        ContentVersion | None: None when the project does not exist
+    """
+    projects = select(func.max(Project.updated_at), func.count(Project.id))
+    tasks = select(func.max(Task.updated_at), func.count(Task.id))
+    resources = select(func.max(Resource.updated_at), func.count(Resource.id))
+    if project_id is not None:
+        projects = projects.where(Project.id == project_id)
+        tasks = tasks.where(Task.project_id == project_id)
+        resources = resources.join(Task, Resource.task_id == Task.id).where(
+            Task.project_id == project_id
+        )
+
+    # Each aggregate yields exactly one row, so joining all three is one row
+    projects, tasks, resources = projects.subquery(), tasks.subquery(), resources.subquery()
+    row = db.execute(
+        select(projects, tasks, resources).select_from(
+            projects.join(tasks, true()).join(resources, true())
+        )
+    ).one()
+    project_max, project_count, task_max, task_count, resource_max, resource_count = row
+    if project_id is not None and not project_count:
+        return None
+
+    timestamps = [ts for ts in (project_max, task_max, resource_max) if ts is not None]
+    last_modified = max(timestamps) if timestamps else None
+    fingerprint = "|".join(str(part) for part in (kind, project_id, *row))
+    etag = hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=12).hexdigest()
+    return ContentVersion(etag=etag, last_modified=last_modified)
+
+
+def _http_datetime(dt):
+    # Stored timestamps are naive UTC; HTTP dates have one-second resolution
+    return dt.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def is_not_modified(version):
+    """Return True when the request's validators match the current version."""
+    # A pending flash message must be rendered, so never answer 304 over it
+    if session.get("_flashes"):
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(version.etag)
+    if request.if_modified_since and version.last_modified:
+        return _http_datetime(version.last_modified) <= request.if_modified_since
+    return False
+
+
+def not_modified_response(version):
+    return with_validators(Response(status=304), version)
+
+
+def with_validators(response, version):
+    """Attach ETag/Last-Modified and force clients to revalidate on each use."""
+    response.set_etag(version.etag, weak=True)
+    if version.last_modified:
+        response.last_modified = _http_datetime(version.last_modified)
+    response.cache_control.no_cache = True
+    return response
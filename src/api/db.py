@@ -0,0 +1,25 @@
+from flask import g
+from database.database import SessionLocal
+
+
+def get_request_db():
+    """Return the session bound to the current Flask app context.
+
+    The session is created on first use and closed by the teardown handler
+    registered in `init_app`.
+    """
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+
+def _teardown_db(exception=None):
+    db = g.pop("db", None)
+    if db is not None:
+        if exception is not None:
+            db.rollback()
+        db.close()
+
+
+def init_app(flask_app):
+    flask_app.teardown_appcontext(_teardown_db)
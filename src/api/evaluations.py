@@ -0,0 +1,139 @@
+import json
+import logging
+import threading
+from flask import Blueprint, Response, abort, jsonify, request, url_for
+from api.db import get_request_db
+from models.evaluation_job import FAILED, SUCCEEDED, EvaluationJob
+from models.project import Project
+from services.job_queue import enqueue_evaluation, job_status
+
+logger = logging.getLogger(__name__)
+
+evaluations_bp = Blueprint("evaluations", __name__)
+
+# Suggested wait before polling a job that hasn't finished
+RETRY_AFTER_SECONDS = 2
+
+# Sent as their own events the first time they're complete, so a client can
+# show the verdict while the reasoning behind the rest is still streaming
+DECISION_FIELDS = ("relevance", "action")
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    """Return this worker's project evaluator, created on first use."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                from pipelines.pkm.new_info_for_project_evaluator import (
+                    NewProjectInfoEvaluatorPipeline,
+                )
+
+                _pipeline = NewProjectInfoEvaluatorPipeline()
+    return _pipeline
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _evaluation_input():
+    payload = request.get_json(silent=True) or {}
+    return (payload.get("input") or request.values.get("input") or "").strip()
+
+
+@evaluations_bp.route(
+    "/projects/<int:project_id>/evaluate/stream", methods=["GET", "POST"]
+)
+def stream_evaluation(project_id):
+    """Evaluate new information against a project as a Server-Sent Events stream.
+
+    Events: `partial` with every field generated so far, `relevance` and
+    `action` once each is decided, then `done` with the full result, or
+    `error` if the evaluation failed midway.
+    """
+    user_input = _evaluation_input()
+    if not user_input:
+        return jsonify({"error": "input is required"}), 400
+    if get_request_db().get(Project, project_id) is None:
+        abort(404)
+
+    def generate():
+        decided = set()
+        last = None
+        try:
+            for partial in get_pipeline().stream_new_info(project_id, user_input):
+                data = partial.model_dump(mode="json", exclude_none=True)
+                if data == last:
+                    continue
+                last = data
+                yield sse_event("partial", data)
+                for field in DECISION_FIELDS:
+                    if field in data and field not in decided:
+                        decided.add(field)
+                        yield sse_event(field, {field: data[field]})
+        except Exception:
+            # The details stay in the server log, not in the browser
+            logger.exception("Streaming evaluation for project %s failed", project_id)
+            yield sse_event("error", {"error": "Evaluation failed"})
+            return
+        yield sse_event("done", last or {})
+
+    # The generator doesn't need the request: the request's DB session is
+    # closed before streaming starts instead of held for the whole LLM call
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@evaluations_bp.route("/projects/<int:project_id>/evaluations", methods=["POST"])
+def submit_evaluation(project_id):
+    """Queue an evaluation for `flask run-evaluation-worker` and return at once.
+
+    Responds 202 with the job; poll the `Location` for its result.
+    """
+    user_input = _evaluation_input()
+    if not user_input:
+        return jsonify({"error": "input is required"}), 400
+    db = get_request_db()
+    if db.get(Project, project_id) is None:
+        abort(404)
+    job = enqueue_evaluation(db, project_id, user_input)
+    response = jsonify(job_status(job))
+    response.status_code = 202
+    response.headers["Location"] = url_for("evaluations.evaluation_result", job_id=job.id)
+    return response
+
+
+@evaluations_bp.route("/evaluations/<int:job_id>", methods=["GET"])
+def evaluation_status(job_id):
+    job = get_request_db().get(EvaluationJob, job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job_status(job))
+
+
+@evaluations_bp.route("/evaluations/<int:job_id>/result", methods=["GET"])
+def evaluation_result(job_id):
+    """The classification once the job succeeded.
+
+    202 with `Retry-After` while it's queued or running, 409 if it failed.
+    """
+    job = get_request_db().get(EvaluationJob, job_id)
+    if job is None:
+        abort(404)
+    if job.status == SUCCEEDED:
+        return jsonify(job.result)
+    if job.status == FAILED:
+        return jsonify(job_status(job)), 409
+    response = jsonify(job_status(job))
+    response.status_code = 202
+    response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from database.database import pool_stats
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics/db-pool", methods=["GET"])
+def db_pool_metrics():
+    """Return this worker's connection pool occupancy and checkout wait times"""
+    return jsonify(pool_stats())
+
+
+@metrics_bp.route("/metrics/llm-rate-limits", methods=["GET"])
+def llm_rate_limit_metrics():
+    """Return the LLM rate limits, this worker's waits on them by lane, and callers queued across processes"""
+    from services.llm_factory import get_rate_limiter
+
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return jsonify({"enabled": False, "limits": {}, "lanes": {}, "queue_depth": {}})
+    return jsonify(
+        {
+            "enabled": True,
+            "limits": {name: limit.model_dump() for name, limit in limiter.limits.items()},
+            **limiter.stats(),
+        }
+    )
@@ -1,23 +1,127 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from datetime import datetime
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+    make_response,
+)
+from datetime import datetime, timedelta
 from models.project import Project
-from models.task import Task
-from database.database import SessionLocal
-from sqlalchemy import exc, func
-from utils.markdown_helper import md_to_html
-from models.resource import Resource
+from models.task import SORT_GAP, Task
+from api.db import get_request_db
+from sqlalchemy import case, exc, func, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models.resource import Resource, stored_canonical_url
+from utils.fingerprint import simhash
+from utils.pagination import decode_cursor, encode_cursor
+from services.resource_index import (
+    reindex_resource,
+    reindex_task,
+    unindex_project,
+    unindex_resource,
+    unindex_task,
+)
+from api.conditional import (
+    is_not_modified,
+    not_modified_response,
+    project_version,
+    with_validators,
+)
 
 projects_bp = Blueprint("projects", __name__)
 
 
+PROJECTS_PER_PAGE = 25
+MAX_PROJECTS_PER_PAGE = 100
+# Description and desired outcome are only shown truncated in the listing
+PROJECT_PREVIEW_CHARS = 200
+# Resources accepted by one batch ingest request
+MAX_RESOURCES_PER_BATCH = 1000
+
+
 @projects_bp.route("/projects")
 def list_projects():
-    db = SessionLocal()
+    status = request.args.get("status") or None
+    priority = request.args.get("priority") or None
     try:
-        projects = db.query(Project).all()
-        return render_template("projects/projects.html", projects=projects)
-    finally:
-        db.close()
+        per_page = min(
+            max(int(request.args.get("per_page", PROJECTS_PER_PAGE)), 1),
+            MAX_PROJECTS_PER_PAGE,
+        )
+        deadline_from = request.args.get("deadline_from") or None
+        deadline_to = request.args.get("deadline_to") or None
+        if deadline_from:
+            deadline_from = datetime.strptime(deadline_from, "%Y-%m-%d")
+        if deadline_to:
+            # Inclusive upper bound on the whole day
+            deadline_to = datetime.strptime(deadline_to, "%Y-%m-%d") + timedelta(days=1)
+        after = request.args.get("after")
+        cursor = decode_cursor(after) if after else None
+    except ValueError as e:
+        return f"Invalid listing parameters: {e}", 400
+
+    db = get_request_db()
+    # Stats cards cover every project, computed with a single aggregate query
+    stats = db.query(
+        func.count(Project.id).label("total"),
+        func.count(case((Project.status == "In Progress", 1))).label("in_progress"),
+        func.count(case((Project.status == "Completed", 1))).label("completed"),
+        func.count(case((Project.priority == "High", 1))).label("high_priority"),
+    ).one()
+
+    query = db.query(
+        Project.id,
+        Project.name,
+        Project.status,
+        Project.priority,
+        Project.created_at,
+        Project.updated_at,
+        Project.deadline,
+        func.substr(Project.description, 1, PROJECT_PREVIEW_CHARS).label("description"),
+        func.substr(Project.desired_outcome, 1, PROJECT_PREVIEW_CHARS).label(
+            "desired_outcome"
+        ),
+    )
+    if status:
+        query = query.filter(Project.status == status)
+    if priority:
+        query = query.filter(Project.priority == priority)
+    if deadline_from:
+        query = query.filter(Project.deadline >= deadline_from)
+    if deadline_to:
+        query = query.filter(Project.deadline < deadline_to)
+    if cursor:
+        query = query.filter(tuple_(Project.updated_at, Project.id) < cursor)
+
+    # Keyset pagination over (updated_at, id); fetch one extra row to detect a next page
+    rows = (
+        query.order_by(Project.updated_at.desc(), Project.id.desc())
+        .limit(per_page + 1)
+        .all()
+    )
+    projects = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        next_cursor = encode_cursor(projects[-1].updated_at, projects[-1].id)
+
+    filters = {
+        "status": status,
+        "priority": priority,
+        "deadline_from": request.args.get("deadline_from") or None,
+        "deadline_to": request.args.get("deadline_to") or None,
+        "per_page": per_page if per_page != PROJECTS_PER_PAGE else None,
+    }
+    return render_template(
+        "projects/projects.html",
+        projects=projects,
+        stats=stats,
+        filters=filters,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+    )
 
 
 @projects_bp.route("/projects/new", methods=["GET"])
@@ -27,7 +131,7 @@ def new_project():
 
 @projects_bp.route("/projects/create", methods=["POST"])
 def create_project():
-    db = SessionLocal()
+    db = get_request_db()
     try:
         # Create a new project from form data
         new_project = Project(
@@ -38,6 +142,7 @@ def create_project():
             status=request.form.get("status", "Planning"),
             priority=request.form.get("priority", "Medium"),
         )
+        new_project.render_markdown()
 
         # Handle deadline (could be empty)
         deadline_str = request.form.get("deadline")
@@ -54,31 +159,36 @@ def create_project():
         db.rollback()
         flash(f"Error creating project: {str(e)}", "danger")
         return redirect(url_for("projects.new_project"))
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/<int:project_id>")
 def project_detail(project_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if project is None:
-            return "Project not found", 404
-        # Fetch tasks related to the project, ordered by order field
-        tasks = (
-            db.query(Task)
-            .filter(Task.project_id == project_id)
-            .order_by(Task.sort_order)
-            .all()
-        )
-
-        # Convert markdown to HTML
-        description_html = md_to_html(project.description)
-        purpose_html = md_to_html(project.purpose)
-        desired_outcome_html = md_to_html(project.desired_outcome)
-
-        return render_template(
+    db = get_request_db()
+    # Answer revalidations from the aggregate version alone
+    version = project_version(db, project_id, kind="html")
+    if version is None:
+        return "Project not found", 404
+    if is_not_modified(version):
+        return not_modified_response(version)
+
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if project is None:
+        return "Project not found", 404
+    # Fetch tasks related to the project, ordered by order field
+    tasks = (
+        db.query(Task)
+        .filter(Task.project_id == project_id)
+        .order_by(Task.sort_order, Task.id)
+        .all()
+    )
+
+    # Serve the HTML rendered when the markdown fields were written
+    description_html = project.html("description")
+    purpose_html = project.html("purpose")
+    desired_outcome_html = project.html("desired_outcome")
+
+    response = make_response(
+        render_template(
             "projects/project_detail.html",
             project=project,
             tasks=tasks,
@@ -86,25 +196,22 @@ def project_detail(project_id):
             purpose_html=purpose_html,
             desired_outcome_html=desired_outcome_html,
         )
-    finally:
-        db.close()
+    )
+    return with_validators(response, version)
 
 
 @projects_bp.route("/projects/<int:project_id>/edit", methods=["GET"])
 def edit_project(project_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if project is None:
-            return "Project not found", 404
-        return render_template("projects/edit_project.html", project=project)
-    finally:
-        db.close()
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if project is None:
+        return "Project not found", 404
+    return render_template("projects/edit_project.html", project=project)
 
 
 @projects_bp.route("/projects/<int:project_id>/update", methods=["POST"])
 def update_project(project_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         project = db.query(Project).filter(Project.id == project_id).first()
         if project is None:
@@ -118,6 +225,7 @@ def update_project(project_id):
         project.desired_outcome = request.form.get("desired_outcome")
         project.status = request.form.get("status")
         project.priority = request.form.get("priority")
+        project.render_markdown()
 
         # Handle deadline (could be empty)
         deadline_str = request.form.get("deadline")
@@ -133,37 +241,32 @@ def update_project(project_id):
         db.rollback()
         flash(f"Error updating project: {str(e)}", "danger")
         return redirect(url_for("projects.edit_project", project_id=project_id))
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/<int:project_id>/delete", methods=["GET"])
 def delete_project(project_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if project is None:
-            return "Project not found", 404
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if project is None:
+        return "Project not found", 404
 
-        status_modifiers = {
-            "Planning": "planning",
-            "In Progress": "in-progress",
-            "Completed": "completed",
-            "On Hold": "on-hold",
-        }
+    status_modifiers = {
+        "Planning": "planning",
+        "In Progress": "in-progress",
+        "Completed": "completed",
+        "On Hold": "on-hold",
+    }
 
-        return render_template(
-            "projects/delete_project.html",
-            project=project,
-            status_modifiers=status_modifiers,
-        )
-    finally:
-        db.close()
+    return render_template(
+        "projects/delete_project.html",
+        project=project,
+        status_modifiers=status_modifiers,
+    )
 
 
 @projects_bp.route("/projects/<int:project_id>/delete/confirm", methods=["POST"])
 def delete_project_confirm(project_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         project = db.query(Project).filter(Project.id == project_id).first()
         if project is None:
@@ -173,6 +276,7 @@ def delete_project_confirm(project_id):
         project_name = project.name  # Save name before deletion for message
         db.delete(project)
         db.commit()
+        unindex_project(project_id)
 
         flash(f"Project '{project_name}' has been permanently deleted.", "success")
         return redirect(url_for("projects.list_projects"))
@@ -180,13 +284,11 @@ def delete_project_confirm(project_id):
         db.rollback()
         flash(f"Error deleting project: {str(e)}", "danger")
         return redirect(url_for("projects.delete_project", project_id=project_id))
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/<int:project_id>/tasks/add", methods=["POST"])
 def add_task(project_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         project = db.query(Project).filter(Project.id == project_id).first()
         if not project:
@@ -199,14 +301,13 @@ def add_task(project_id):
         task_priority = request.form.get("priority", "Medium")
         task_due_date_str = request.form.get("due_date")
 
-        # Get the highest order number for this project's tasks
+        # Place the task one gap after the highest order key of this project's tasks
         max_order = (
             db.query(func.max(Task.sort_order))
             .filter(Task.project_id == project_id)
             .scalar()
-            or -1
         )
-        next_order = max_order + 1
+        next_order = (max_order if max_order is not None else 0) + SORT_GAP
 
         if not task_name:
             flash("Task name is required.", "warning")
@@ -235,9 +336,11 @@ def add_task(project_id):
             due_date=task_due_date,
             sort_order=next_order,  # Set the order to be last
         )
+        new_task.render_markdown()
 
         db.add(new_task)
         db.commit()
+        reindex_task(new_task)
         flash(
             f"Task '{new_task.name}' added successfully to project '{project.name}'.",
             "success",
@@ -245,59 +348,51 @@ def add_task(project_id):
     except exc.SQLAlchemyError as e:
         db.rollback()
         flash(f"Error adding task: {str(e)}", "danger")
-    finally:
-        db.close()
     return redirect(url_for("projects.project_detail", project_id=project_id))
 
 
 @projects_bp.route("/projects/<int:project_id>/tasks/new", methods=["GET"])
 def new_task_page(project_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            flash("Project not found.", "danger")
-            return redirect(url_for("projects.list_projects"))
-        return render_template(
-            "tasks/create_task.html", project_id=project_id, project_name=project.name
-        )
-    finally:
-        db.close()
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        flash("Project not found.", "danger")
+        return redirect(url_for("projects.list_projects"))
+    return render_template(
+        "tasks/create_task.html", project_id=project_id, project_name=project.name
+    )
 
 
 @projects_bp.route(
     "/projects/<int:project_id>/tasks/<int:task_id>/edit", methods=["GET"]
 )
 def edit_task_page(project_id, task_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.project_id == project_id)
-            .first()
-        )
-        if not project:
-            flash("Project not found.", "danger")
-            return redirect(url_for("projects.list_projects"))
-        if not task:
-            flash("Task not found.", "danger")
-            return redirect(url_for("projects.project_detail", project_id=project_id))
-        return render_template(
-            "tasks/edit_task.html",
-            project_id=project_id,
-            project_name=project.name,
-            task=task,
-        )
-    finally:
-        db.close()
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    task = (
+        db.query(Task)
+        .filter(Task.id == task_id, Task.project_id == project_id)
+        .first()
+    )
+    if not project:
+        flash("Project not found.", "danger")
+        return redirect(url_for("projects.list_projects"))
+    if not task:
+        flash("Task not found.", "danger")
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+    return render_template(
+        "tasks/edit_task.html",
+        project_id=project_id,
+        project_name=project.name,
+        task=task,
+    )
 
 
 @projects_bp.route(
     "/projects/<int:project_id>/tasks/<int:task_id>/update", methods=["POST"]
 )
 def update_task(project_id, task_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         task = (
             db.query(Task)
@@ -328,6 +423,7 @@ def update_task(project_id, task_id):
         task.context = task_context
         task.status = task_status
         task.priority = task_priority
+        task.render_markdown()
 
         if task_due_date_str:
             try:
@@ -348,12 +444,11 @@ def update_task(project_id, task_id):
             task.due_date = None
 
         db.commit()
+        reindex_task(task)
         flash(f"Task '{task.name}' updated successfully.", "success")
     except exc.SQLAlchemyError as e:
         db.rollback()
         flash(f"Error updating task: {str(e)}", "danger")
-    finally:
-        db.close()
     return redirect(url_for("projects.project_detail", project_id=project_id))
 
 
@@ -361,35 +456,32 @@ def update_task(project_id, task_id):
     "/projects/<int:project_id>/tasks/<int:task_id>/delete", methods=["GET"]
 )
 def delete_task_page(project_id, task_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.project_id == project_id)
-            .first()
-        )
-        if not project:
-            flash("Project not found.", "danger")
-            return redirect(url_for("projects.list_projects"))
-        if not task:
-            flash("Task not found.", "danger")
-            return redirect(url_for("projects.project_detail", project_id=project_id))
-        return render_template(
-            "tasks/delete_task.html",
-            project_id=project_id,
-            project_name=project.name,
-            task=task,
-        )
-    finally:
-        db.close()
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    task = (
+        db.query(Task)
+        .filter(Task.id == task_id, Task.project_id == project_id)
+        .first()
+    )
+    if not project:
+        flash("Project not found.", "danger")
+        return redirect(url_for("projects.list_projects"))
+    if not task:
+        flash("Task not found.", "danger")
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+    return render_template(
+        "tasks/delete_task.html",
+        project_id=project_id,
+        project_name=project.name,
+        task=task,
+    )
 
 
 @projects_bp.route(
     "/projects/<int:project_id>/tasks/<int:task_id>/delete/confirm", methods=["POST"]
 )
 def delete_task_confirm(project_id, task_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         task = (
             db.query(Task)
@@ -403,92 +495,245 @@ def delete_task_confirm(project_id, task_id):
         task_name = task.name  # Save for flash message
         db.delete(task)
         db.commit()
+        unindex_task(task_id)
         flash(f"Task '{task_name}' has been permanently deleted.", "success")
     except exc.SQLAlchemyError as e:
         db.rollback()
         flash(f"Error deleting task: {str(e)}", "danger")
-    finally:
-        db.close()
     return redirect(url_for("projects.project_detail", project_id=project_id))
 
 
+def _renumber_tasks(db, project_id):
+    """Respread a project's sort_order keys SORT_GAP apart in one UPDATE."""
+    positions = (
+        select(
+            Task.id.label("id"),
+            func.row_number()
+            .over(order_by=(Task.sort_order, Task.id))
+            .label("position"),
+        )
+        .where(Task.project_id == project_id)
+        .subquery()
+    )
+    db.execute(
+        update(Task)
+        .where(Task.id == positions.c.id)
+        .values(sort_order=positions.c.position * SORT_GAP)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _is_int(value):
+    # bool is an int subclass, but true/false aren't IDs
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _apply_full_order(db, project_id, task_orders):
+    """Apply a complete ordering of the project's tasks in one UPDATE.
+
+    Raises ValueError unless `task_orders` lists every task of the project
+    exactly once, with integer taskId and order.
+    """
+    if not isinstance(task_orders, list) or not all(
+        isinstance(task_order, dict)
+        and _is_int(task_order.get("taskId"))
+        and _is_int(task_order.get("order"))
+        for task_order in task_orders
+    ):
+        raise ValueError("taskOrders must be a list of integer taskId and order pairs")
+    task_ids = [task_order["taskId"] for task_order in task_orders]
+    project_task_ids = set(db.scalars(select(Task.id).where(Task.project_id == project_id)))
+    if len(set(task_ids)) != len(task_ids) or set(task_ids) != project_task_ids:
+        raise ValueError("taskOrders must list each of the project's tasks exactly once")
+    if not task_ids:
+        return
+    ordered = sorted((task_order["order"], task_order["taskId"]) for task_order in task_orders)
+    new_orders = {
+        task_id: (position + 1) * SORT_GAP for position, (_, task_id) in enumerate(ordered)
+    }
+    db.execute(
+        update(Task)
+        .where(Task.project_id == project_id, Task.id.in_(new_orders))
+        .values(sort_order=case(new_orders, value=Task.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _neighbour_keys(db, project_id, task_id, after_id, before_id):
+    """Return the (lower, upper) sort keys the moved task must fit between.
+
+    Either bound is None at the ends of the list. Ties are broken by id,
+    matching the order the project page displays.
+    """
+    anchor_id = after_id if after_id is not None else before_id
+    row = (
+        db.query(Task.sort_order)
+        .filter(Task.id == anchor_id, Task.project_id == project_id)
+        .first()
+    )
+    if row is None:
+        raise LookupError(f"Task {anchor_id} not found in project {project_id}")
+    if row.sort_order is None:
+        # Legacy rows without a key cannot be compared; give every task one first
+        _renumber_tasks(db, project_id)
+        return _neighbour_keys(db, project_id, task_id, after_id, before_id)
+    anchor = row.sort_order
+
+    key = tuple_(Task.sort_order, Task.id)
+    others = db.query(Task.sort_order).filter(
+        Task.project_id == project_id, Task.id != task_id
+    )
+    if after_id is not None:
+        upper = (
+            others.filter(key > (anchor, after_id))
+            .order_by(Task.sort_order, Task.id)
+            .limit(1)
+            .scalar()
+        )
+        return anchor, upper
+    lower = (
+        others.filter(key < (anchor, before_id))
+        .order_by(Task.sort_order.desc(), Task.id.desc())
+        .limit(1)
+        .scalar()
+    )
+    return lower, anchor
+
+
+def _move_task(db, project_id, task_id, after_id=None, before_id=None):
+    """Move one task next to a neighbour, updating only that task's row.
+
+    The project's keys are renumbered first when there is no room left
+    between the two neighbours.
+    """
+    if after_id is None and before_id is None:
+        # Nothing to move next to, but the task must still exist
+        exists = db.query(Task.id).filter(Task.id == task_id, Task.project_id == project_id).first()
+        if exists is None:
+            raise LookupError(f"Task {task_id} not found in project {project_id}")
+        return
+    lower, upper = _neighbour_keys(db, project_id, task_id, after_id, before_id)
+    if lower is not None and upper is not None and upper - lower < 2:
+        _renumber_tasks(db, project_id)
+        lower, upper = _neighbour_keys(db, project_id, task_id, after_id, before_id)
+
+    if lower is None:
+        new_order = upper - SORT_GAP
+    elif upper is None:
+        new_order = lower + SORT_GAP
+    else:
+        new_order = (lower + upper) // 2
+
+    result = db.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.project_id == project_id)
+        .values(sort_order=new_order)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise LookupError(f"Task {task_id} not found in project {project_id}")
+
+
 @projects_bp.route("/projects/<int:project_id>/tasks/reorder", methods=["POST"])
 def reorder_tasks(project_id):
-    db = SessionLocal()
+    """Reorder tasks from either a single move or a full ordering.
+
+    Single move: {"move": {"taskId": int, "afterId": int | null, "beforeId": int | null}}
+    Full ordering: {"taskOrders": [{"taskId": int, "order": int}, ...]}, listing
+    every task of the project once
+    """
+    data = request.get_json(silent=True) or {}
+    db = get_request_db()
     try:
-        data = request.get_json()
-        task_orders = data.get("taskOrders", [])  # List of {taskId: int, order: int}
-
-        # Update each task's order
-        for task_order in task_orders:
-            task_id = task_order.get("taskId")
-            new_order = task_order.get("order")
-            if task_id is not None and new_order is not None:
-                task = (
-                    db.query(Task)
-                    .filter(Task.id == task_id, Task.project_id == project_id)
-                    .first()
-                )
-                if task:
-                    task.sort_order = new_order
+        move = data.get("move")
+        if move:
+            if not isinstance(move, dict):
+                return {"status": "error", "message": "move must be an object"}, 400
+            if not _is_int(move.get("taskId")):
+                return {"status": "error", "message": "move.taskId must be an integer"}, 400
+            for field in ("afterId", "beforeId"):
+                if move.get(field) is not None and not _is_int(move[field]):
+                    return {
+                        "status": "error",
+                        "message": f"move.{field} must be an integer or null",
+                    }, 400
+            _move_task(
+                db,
+                project_id,
+                move["taskId"],
+                after_id=move.get("afterId"),
+                before_id=move.get("beforeId"),
+            )
+        else:
+            _apply_full_order(db, project_id, data.get("taskOrders", []))
 
         db.commit()
         return {"status": "success"}, 200
+    except ValueError as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}, 400
+    except LookupError as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}, 404
     except Exception as e:
         db.rollback()
         return {"status": "error", "message": str(e)}, 500
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/<int:project_id>/tasks/<int:task_id>")
 def task_detail(project_id, task_id):
-    db = SessionLocal()
-    try:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.project_id == project_id)
-            .first()
+    db = get_request_db()
+    project = db.query(Project).filter(Project.id == project_id).first()
+    task = (
+        db.query(Task)
+        .filter(Task.id == task_id, Task.project_id == project_id)
+        .first()
+    )
+    if not project:
+        flash("Project not found.", "danger")
+        return redirect(url_for("projects.list_projects"))
+    if not task:
+        flash("Task not found.", "danger")
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+
+    # Serve the HTML rendered when the markdown fields were written
+    description_html = task.html("description")
+    context_html = task.html("context")
+
+    # sort_order keys are sparse, so the position is the number of tasks before it
+    task_position = (
+        db.query(func.count(Task.id))
+        .filter(
+            Task.project_id == project_id,
+            tuple_(Task.sort_order, Task.id) < (task.sort_order, task.id),
         )
-        if not project:
-            flash("Project not found.", "danger")
-            return redirect(url_for("projects.list_projects"))
-        if not task:
-            flash("Task not found.", "danger")
-            return redirect(url_for("projects.project_detail", project_id=project_id))
+        .scalar()
+        + 1
+    )
 
-        # Convert markdown to HTML
-        description_html = md_to_html(task.description)
-        context_html = md_to_html(task.context)
-
-        return render_template(
-            "tasks/task_detail.html",
-            task=task,
-            project=project,
-            description_html=description_html,
-            context_html=context_html,
-        )
-    finally:
-        db.close()
+    return render_template(
+        "tasks/task_detail.html",
+        task=task,
+        project=project,
+        task_position=task_position,
+        description_html=description_html,
+        context_html=context_html,
+    )
 
 
 @projects_bp.route("/resources/<int:resource_id>", methods=["GET"])
 def resource_detail(resource_id):
-    db = SessionLocal()
-    try:
-        resource = db.query(Resource).filter(Resource.id == resource_id).first()
-        if not resource:
-            flash("Resource not found.", "danger")
-            return redirect(url_for("projects.list_projects"))
-        return render_template("resources/resource_detail.html", resource=resource)
-    finally:
-        db.close()
+    db = get_request_db()
+    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    if not resource:
+        flash("Resource not found.", "danger")
+        return redirect(url_for("projects.list_projects"))
+    return render_template("resources/resource_detail.html", resource=resource)
 
 
 @projects_bp.route("/resources/<int:resource_id>/update", methods=["POST"])
 def update_resource(resource_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         resource = db.query(Resource).filter(Resource.id == resource_id).first()
         if not resource:
@@ -499,7 +744,9 @@ def update_resource(resource_id):
         resource.type = request.form.get("type")
         resource.notes = request.form.get("notes")
         resource.is_consumed = bool(request.form.get("is_consumed"))
+        resource.fingerprint()
         db.commit()
+        reindex_resource(resource)
         flash("Resource updated successfully.", "success")
         return redirect(
             url_for(
@@ -512,36 +759,31 @@ def update_resource(resource_id):
         db.rollback()
         flash(f"Error updating resource: {str(e)}", "danger")
         return redirect(url_for("projects.resource_detail", resource_id=resource_id))
-    finally:
-        db.close()
 
 
 @projects_bp.route(
     "/projects/<int:project_id>/tasks/<int:task_id>/resources/new", methods=["GET"]
 )
 def new_resource_page(project_id, task_id):
-    db = SessionLocal()
-    try:
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.project_id == project_id)
-            .first()
-        )
-        if not task:
-            flash("Task not found.", "danger")
-            return redirect(url_for("projects.project_detail", project_id=project_id))
-        return render_template(
-            "resources/create_resource.html", task=task, project_id=project_id
-        )
-    finally:
-        db.close()
+    db = get_request_db()
+    task = (
+        db.query(Task)
+        .filter(Task.id == task_id, Task.project_id == project_id)
+        .first()
+    )
+    if not task:
+        flash("Task not found.", "danger")
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+    return render_template(
+        "resources/create_resource.html", task=task, project_id=project_id
+    )
 
 
 @projects_bp.route(
     "/projects/<int:project_id>/tasks/<int:task_id>/resources/create", methods=["POST"]
 )
 def create_resource(project_id, task_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         task = (
             db.query(Task)
@@ -570,8 +812,10 @@ def create_resource(project_id, task_id):
             is_consumed=False,
             task_id=task_id,
         )
+        new_resource.fingerprint()
         db.add(new_resource)
         db.commit()
+        reindex_resource(new_resource)
         flash("Resource added successfully.", "success")
         return redirect(
             url_for("projects.task_detail", project_id=project_id, task_id=task_id)
@@ -584,13 +828,173 @@ def create_resource(project_id, task_id):
                 "projects.new_resource_page", project_id=project_id, task_id=task_id
             )
         )
-    finally:
-        db.close()
+
+
+def _validate_resource(item):
+    """Return the resource's column values, or raise ValueError naming the problem."""
+    if not isinstance(item, dict):
+        raise ValueError("must be an object")
+    values = {}
+    for field, max_length in (("title", 255), ("url", 255), ("type", 50)):
+        value = item.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{field} is required")
+        if len(value.strip()) > max_length:
+            raise ValueError(f"{field} is longer than {max_length} characters")
+        values[field] = value.strip()
+    notes = item.get("notes")
+    if notes is not None and not isinstance(notes, str):
+        raise ValueError("notes must be a string")
+    values["notes"] = notes
+    # None when not given, so an update keeps the stored value
+    is_consumed = item.get("is_consumed")
+    values["is_consumed"] = None if is_consumed is None else bool(is_consumed)
+    values["canonical_url"] = stored_canonical_url(values["url"])
+    values["notes_simhash"] = simhash(notes) if notes else None
+    return values
+
+
+def _upsert_resources(db, task_id, rows):
+    """
+    Insert or update resources by URL with one INSERT ... ON CONFLICT (url)
+
+    Existing rows of the same task get the new title, type, notes and
+    is_consumed (notes and is_consumed are kept when None). A URL already used by another task's resource
+    is left alone, as the WHERE of the DO UPDATE guarantees even if it was
+    inserted after the caller looked.
+
+    Returns:
+        dict: Resource id by URL for every row inserted or updated
+    """
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    now = func.now()
+    statement = insert(Resource).values(
+        [{**row, "task_id": task_id, "added_at": now, "updated_at": now} for row in rows]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[Resource.url],
+        set_={
+            "title": statement.excluded.title,
+            "type": statement.excluded.type,
+            "notes": func.coalesce(statement.excluded.notes, Resource.notes),
+            "is_consumed": func.coalesce(statement.excluded.is_consumed, Resource.is_consumed),
+            "canonical_url": statement.excluded.canonical_url,
+            "notes_simhash": case(
+                (statement.excluded.notes.is_(None), Resource.notes_simhash),
+                else_=statement.excluded.notes_simhash,
+            ),
+            "updated_at": now,
+        },
+        where=Resource.task_id == statement.excluded.task_id,
+    ).returning(Resource.id, Resource.url)
+    return {url: resource_id for resource_id, url in db.execute(statement)}
+
+
+@projects_bp.route(
+    "/projects/<int:project_id>/tasks/<int:task_id>/resources/batch", methods=["POST"]
+)
+def ingest_resources(project_id, task_id):
+    """Create or update many resources of a task in one transaction.
+
+    Body: {"resources": [{"title", "url", "type", "notes"?, "is_consumed"?}, ...]}
+
+    Resources are matched by URL. Each gets an outcome in `results`, in
+    request order: created, updated, unchanged, conflict (the URL belongs
+    to another task's resource), duplicate (the URL appeared earlier in the
+    request) or invalid. Invalid rows don't stop the others; a database
+    error rolls back the whole batch.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get("resources")
+    if not isinstance(items, list) or not items:
+        return {"status": "error", "message": "resources must be a non-empty list"}, 400
+    if len(items) > MAX_RESOURCES_PER_BATCH:
+        return {
+            "status": "error",
+            "message": f"At most {MAX_RESOURCES_PER_BATCH} resources per request",
+        }, 400
+
+    db = get_request_db()
+    try:
+        task_exists = (
+            db.query(Task.id)
+            .filter(Task.id == task_id, Task.project_id == project_id)
+            .first()
+        )
+        if not task_exists:
+            return {"status": "error", "message": "Task not found"}, 404
+
+        results = []
+        valid = {}
+        for index, item in enumerate(items):
+            try:
+                values = _validate_resource(item)
+            except ValueError as e:
+                results.append({"index": index, "status": "invalid", "error": str(e)})
+                continue
+            result = {"index": index, "url": values["url"]}
+            if values["url"] in valid:
+                result["status"] = "duplicate"
+            else:
+                valid[values["url"]] = values
+            results.append(result)
+
+        # One query for what already exists, to tell inserts from updates and
+        # leave identical rows (and the project's ETag) untouched
+        existing = {
+            row.url: row
+            for row in db.execute(
+                select(
+                    Resource.id, Resource.url, Resource.task_id, Resource.title,
+                    Resource.type, Resource.notes, Resource.is_consumed,
+                ).where(Resource.url.in_(list(valid)))
+            )
+        }
+        outcomes = {}
+        changed = []
+        for url, values in valid.items():
+            current = existing.get(url)
+            if current is None:
+                outcomes[url] = ("created", None)
+                values["is_consumed"] = bool(values["is_consumed"])
+            elif current.task_id != task_id:
+                outcomes[url] = ("conflict", current.id)
+                continue
+            elif (
+                (current.title, current.type) == (values["title"], values["type"])
+                and values["notes"] in (None, current.notes)
+                and values["is_consumed"] in (None, bool(current.is_consumed))
+            ):
+                outcomes[url] = ("unchanged", current.id)
+                continue
+            else:
+                outcomes[url] = ("updated", current.id)
+            changed.append(values)
+
+        ids = _upsert_resources(db, task_id, changed) if changed else {}
+        db.commit()
+    except exc.SQLAlchemyError as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}, 500
+
+    counts = {}
+    for result in results:
+        if "status" not in result:
+            status, resource_id = outcomes[result["url"]]
+            if status in ("created", "updated") and result["url"] not in ids:
+                # Claimed by another task's resource since we looked
+                status = "conflict"
+            result["status"] = status
+            result["id"] = ids.get(result["url"], resource_id)
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    # The pipelines' index picks up new and edited resources on its next sync
+    return jsonify({"status": "success", "counts": counts, "results": results}), 200
 
 
 @projects_bp.route("/resources/<int:resource_id>/delete", methods=["POST"])
 def delete_resource(resource_id):
-    db = SessionLocal()
+    db = get_request_db()
     try:
         resource = db.query(Resource).filter(Resource.id == resource_id).first()
         if not resource:
@@ -600,6 +1004,7 @@ def delete_resource(resource_id):
         task_id = resource.task.id
         db.delete(resource)
         db.commit()
+        unindex_resource(resource_id)
         flash("Resource deleted successfully.", "success")
         return redirect(
             url_for("projects.task_detail", project_id=project_id, task_id=task_id)
@@ -608,15 +1013,20 @@ def delete_resource(resource_id):
         db.rollback()
         flash(f"Error deleting resource: {str(e)}", "danger")
         return redirect(url_for("projects.resource_detail", resource_id=resource_id))
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/<int:project_id>/json", methods=["GET"])
 def project_data_json(project_id):
     """Return project data as JSON including tasks and resources"""
-    db = SessionLocal()
+    db = get_request_db()
     try:
+        # Answer revalidations before loading the ORM graph
+        version = project_version(db, project_id)
+        if version is None:
+            return jsonify({"error": "Project not found"}), 404
+        if is_not_modified(version):
+            return not_modified_response(version)
+
         # Get project with all related data using eager loading with joins
         from sqlalchemy.orm import joinedload
 
@@ -679,23 +1089,26 @@ def project_data_json(project_id):
                         for resource in task.resources
                     ],
                 }
-                for task in sorted(project.tasks, key=lambda t: t.sort_order or 0)
+                for task in sorted(project.tasks, key=lambda t: (t.sort_order or 0, t.id))
             ],
         }
 
-        return jsonify(project_data)
+        return with_validators(jsonify(project_data), version)
 
     except Exception as e:
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
-    finally:
-        db.close()
 
 
 @projects_bp.route("/projects/all/json", methods=["GET"])
 def all_projects_data_json():
     """Return all projects data as JSON including tasks and resources"""
-    db = SessionLocal()
+    db = get_request_db()
     try:
+        # Answer revalidations before loading the ORM graph
+        version = project_version(db)
+        if is_not_modified(version):
+            return not_modified_response(version)
+
         # Get all projects with all related data using eager loading with joins
         from sqlalchemy.orm import joinedload
 
@@ -756,16 +1169,14 @@ def all_projects_data_json():
                                 for resource in task.resources
                             ],
                         }
-                        for task in sorted(project.tasks, key=lambda t: t.sort_order or 0)
+                        for task in sorted(project.tasks, key=lambda t: (t.sort_order or 0, t.id))
                     ],
                 }
                 for project in projects
             ]
         }
 
-        return jsonify(all_projects_data)
+        return with_validators(jsonify(all_projects_data), version)
 
     except Exception as e:
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
-    finally:
-        db.close()
@@ -0,0 +1,77 @@
+from flask import Blueprint, jsonify, render_template, request, url_for
+from api.db import get_request_db
+from services.search import KINDS, search
+
+search_bp = Blueprint("search", __name__)
+
+RESULTS_PER_PAGE = 20
+MAX_RESULTS_PER_PAGE = 100
+
+
+def _search_args():
+    """Parse the query string shared by the page and the JSON endpoint"""
+    query = (request.args.get("q") or "").strip()
+    kinds = [kind for kind in request.args.getlist("kind") if kind in KINDS] or None
+    page = max(int(request.args.get("page", 1)), 1)
+    per_page = min(
+        max(int(request.args.get("per_page", RESULTS_PER_PAGE)), 1), MAX_RESULTS_PER_PAGE
+    )
+    return query, kinds, page, per_page
+
+
+def hit_url(hit):
+    if hit.kind == "project":
+        return url_for("projects.project_detail", project_id=hit.id)
+    if hit.kind == "task":
+        return url_for("projects.task_detail", project_id=hit.project_id, task_id=hit.id)
+    return url_for("projects.resource_detail", resource_id=hit.id)
+
+
+@search_bp.route("/search")
+def search_page():
+    try:
+        query, kinds, page, per_page = _search_args()
+    except ValueError as e:
+        return f"Invalid search parameters: {e}", 400
+    results = search(get_request_db(), query, kinds, page, per_page) if query else None
+    return render_template(
+        "search/search.html",
+        query=query,
+        kinds=kinds or [],
+        results=results,
+        hit_url=hit_url,
+    )
+
+
+@search_bp.route("/search/json")
+def search_json():
+    """Ranked search results as JSON; `snippet` is HTML with the matches in <mark>"""
+    try:
+        query, kinds, page, per_page = _search_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid search parameters: {e}"}), 400
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    results = search(get_request_db(), query, kinds, page, per_page)
+    return jsonify(
+        {
+            "query": results.query,
+            "page": results.page,
+            "per_page": results.per_page,
+            "has_next": results.has_next,
+            "elapsed_ms": round(results.elapsed_ms, 3),
+            "results": [
+                {
+                    "kind": hit.kind,
+                    "id": hit.id,
+                    "project_id": hit.project_id,
+                    "task_id": hit.task_id,
+                    "title": hit.title,
+                    "rank": hit.rank,
+                    "snippet": str(hit.snippet),
+                    "url": hit_url(hit),
+                }
+                for hit in results.hits
+            ],
+        }
+    )
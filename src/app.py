@@ -1,6 +1,11 @@
 import os
 from flask import Flask
 from api.routes import projects_bp
+from api.metrics import metrics_bp
+from api.evaluations import evaluations_bp
+from api.search import search_bp
+from cli import register_commands
+from api.db import init_app as init_db
 from dotenv import load_dotenv
 
 
@@ -9,6 +14,11 @@ load_dotenv()
 def create_app():
     flask_app = Flask(__name__)
     flask_app.register_blueprint(projects_bp)
+    flask_app.register_blueprint(metrics_bp)
+    flask_app.register_blueprint(evaluations_bp)
+    flask_app.register_blueprint(search_bp)
+    init_db(flask_app)
+    register_commands(flask_app)
     return flask_app
 
 # Create an instance for Gunicorn to find
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import httpx
+import instructor
+from openai import AsyncOpenAI, OpenAI
+
+from database.database import Base
+from models.project import Project
+from models.resource import Resource
+from models.task import Task
+
+WORDS = (
+    "research plan draft review budget launch outline interview survey design "
+    "prototype metrics deploy archive notes video article paper course migration "
+    "database python langchain pricing hiring roadmap security testing workshop "
+    "summary analysis feedback release backlog sprint vendor contract training"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_inputs(count: int, seed: int = 0) -> List[str]:
+    """New-information snippets like the ones users paste into the pipelines."""
+    rng = random.Random(seed)
+    return [
+        f"{_sentence(rng, 6)} {_sentence(rng, 30)} https://example.com/input/{number}"
+        for number in range(count)
+    ]
+
+
+def seed_database(
+    engine,
+    projects: int,
+    tasks_per_project: int,
+    resources_per_task: int,
+    seed: int = 0,
+) -> List[int]:
+    """Create the schema on `engine` and fill it with deterministic projects.
+
+    Returns the new project IDs.
+    """
+    from sqlalchemy.orm import Session
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(seed)
+    now = datetime(2025, 6, 1)
+    statuses = ["todo", "in progress", "done"]
+    priorities = ["low", "medium", "high"]
+    with Session(engine) as db:
+        rows = []
+        for p in range(projects):
+            project = Project(
+                name=f"Project {p}: {_sentence(rng, 3)}",
+                purpose=_sentence(rng, 15),
+                description=" ".join(_sentence(rng, 20) for _ in range(3)),
+                desired_outcome=_sentence(rng, 15),
+                status=rng.choice(["active", "on hold", "active"]),
+                priority=rng.choice(["low", "normal", "high"]),
+                updated_at=now - timedelta(days=p),
+            )
+            for t in range(tasks_per_project):
+                task = Task(
+                    name=_sentence(rng, 5),
+                    description=" ".join(_sentence(rng, 20) for _ in range(2)),
+                    context=_sentence(rng, 25),
+                    status=rng.choice(statuses),
+                    priority=rng.choice(priorities),
+                    sort_order=(t + 1) * 1024,
+                    updated_at=now - timedelta(hours=t),
+                )
+                for r in range(resources_per_task):
+                    resource = Resource(
+                        title=_sentence(rng, 6),
+                        url=f"https://example.com/{p}/{t}/{r}",
+                        type=rng.choice(["video", "article", "paper"]),
+                        notes=" ".join(_sentence(rng, 25) for _ in range(2)),
+                        is_consumed=rng.random() < 0.4,
+                        updated_at=now - timedelta(minutes=r),
+                    )
+                    # As the routes store it
+                    resource.fingerprint()
+                    task.resources.append(resource)
+                project.tasks.append(task)
+            rows.append(project)
+        db.add_all(rows)
+        db.commit()
+        return [project.id for project in rows]
+
+
+def _example_value(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """The simplest value that validates against a JSON schema fragment."""
+    if "$ref" in schema:
+        return _example_value(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return _example_value(options[0], defs) if options else None
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _example_value(field, defs)
+            for name, field in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return []
+    if kind == "number":
+        return 0.5
+    if kind == "integer":
+        return 0
+    if kind == "boolean":
+        return False
+    return "benchmark"
+
+
+class FakeLLM:
+    """In-process, OpenAI-compatible chat completions endpoint.
+
+    Answers every tool call with the simplest arguments that validate
+    against the requested response model, after `latency` seconds (plus up
+    to `jitter`, drawn from a seeded generator). Usage is reported at one
+    token per four characters. The wait is recorded as the `llm_wait` stage
+    when a timer is given.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0, timer=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.timer = timer
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    def _delay(self) -> float:
+        return self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+
+    def _wait_stage(self):
+        return self.timer.stage("llm_wait") if self.timer is not None else nullcontext()
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = json.loads(request.content)
+        function = body["tools"][0]["function"]
+        parameters = function["parameters"]
+        arguments = json.dumps(_example_value(parameters, parameters.get("$defs", {})))
+        prompt = "".join(str(message.get("content") or "") for message in body["messages"])
+        return httpx.Response(
+            200,
+            json={
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [
+                                {
+                                    "id": "call_1",
+                                    "type": "function",
+                                    "function": {"name": function["name"], "arguments": arguments},
+                                }
+                            ],
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(arguments) // 4,
+                    "total_tokens": (len(prompt) + len(arguments)) // 4,
+                },
+            },
+        )
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        with self._wait_stage():
+            time.sleep(self._delay())
+        return self._respond(request)
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        with self._wait_stage():
+            await asyncio.sleep(self._delay())
+        return self._respond(request)
+
+    def client(self, use_async: bool = False) -> Any:
+        if use_async:
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.ahandle))
+            openai_client = AsyncOpenAI(
+                api_key="bench", base_url="http://llm.invalid/v1", http_client=http_client
+            )
+        else:
+            http_client = httpx.Client(transport=httpx.MockTransport(self.handle))
+            openai_client = OpenAI(
+                api_key="bench", base_url="http://llm.invalid/v1", http_client=http_client
+            )
+        return instructor.from_openai(openai_client)
+
+    def install(self, factory) -> None:
+        """Point an LLMFactory at this fake, without its response cache or rate limits."""
+        factory._initialize_client = self.client
+        factory.client = self.client()
+        factory.cache = None
+        factory.rate_limiter = None
+
+
+class LangfuseStandIn:
+    """Answers the Langfuse API calls the pipelines and evals make, in-process.
+
+    Trace and score ingestion is accepted and counted; datasets added with
+    `add_dataset` can be fetched and linked to runs. Nothing leaves the
+    process.
+    """
+
+    host = "http://langfuse.invalid"
+
+    def __init__(self) -> None:
+        self.datasets: Dict[str, List[Dict[str, Any]]] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.run_items: List[Dict[str, Any]] = []
+        self.transport = httpx.MockTransport(self.handle)
+
+    def add_dataset(self, name: str, items: List[Dict[str, Any]]) -> None:
+        """Add a dataset from dicts with `input` and `expected_output`."""
+        created = datetime.now(timezone.utc).isoformat()
+        self.datasets[name] = [
+            {
+                "id": f"{name}_{number}",
+                "status": "ACTIVE",
+                "input": item.get("input"),
+                "expectedOutput": item.get("expected_output"),
+                "metadata": item.get("metadata"),
+                "datasetId": name,
+                "datasetName": name,
+                "createdAt": created,
+                "updatedAt": created,
+            }
+            for number, item in enumerate(items)
+        ]
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        now = datetime.now(timezone.utc).isoformat()
+        if request.method == "POST" and path == "/api/public/ingestion":
+            batch = json.loads(request.content)["batch"]
+            self.events.extend(batch)
+            return httpx.Response(
+                207,
+                json={
+                    "successes": [{"id": event["id"], "status": 201} for event in batch],
+                    "errors": [],
+                },
+            )
+        if request.method == "GET" and path.startswith("/api/public/v2/datasets/"):
+            name = path.rsplit("/", 1)[-1]
+            if name not in self.datasets:
+                return httpx.Response(404, json={"message": "Dataset not found"})
+            return httpx.Response(
+                200,
+                json={
+                    "id": name,
+                    "name": name,
+                    "projectId": "bench",
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+        if request.method == "GET" and path == "/api/public/dataset-items":
+            items = self.datasets.get(request.url.params["datasetName"], [])
+            page = int(request.url.params.get("page", 1))
+            limit = int(request.url.params.get("limit", 50))
+            return httpx.Response(
+                200,
+                json={
+                    "data": items[(page - 1) * limit : page * limit],
+                    "meta": {
+                        "page": page,
+                        "limit": limit,
+                        "totalItems": len(items),
+                        "totalPages": max(1, -(-len(items) // limit)),
+                    },
+                },
+            )
+        if request.method == "POST" and path == "/api/public/dataset-run-items":
+            body = json.loads(request.content)
+            self.run_items.append(body)
+            return httpx.Response(
+                200,
+                json={
+                    "id": str(uuid.uuid4()),
+                    "datasetRunId": body["runName"],
+                    "datasetRunName": body["runName"],
+                    "datasetItemId": body["datasetItemId"],
+                    "traceId": body.get("traceId"),
+                    "createdAt": now,
+                    "updatedAt": now,
+                },
+            )
+        return httpx.Response(404, json={"message": f"Not served by the stand-in: {path}"})
+
+    def client(self):
+        from langfuse import Langfuse
+
+        return Langfuse(
+            public_key="pk-lf-bench",
+            secret_key="sk-lf-bench",
+            host=self.host,
+            httpx_client=httpx.Client(transport=self.transport),
+        )
+
+    def install(self) -> None:
+        """Send the `@observe` traces of this process to the stand-in."""
+        from langfuse.decorators import langfuse_context
+        from langfuse.utils.langfuse_singleton import LangfuseSingleton
+
+        LangfuseSingleton().reset()
+        langfuse_context.configure(
+            public_key="pk-lf-bench",
+            secret_key="sk-lf-bench",
+            host=self.host,
+            httpx_client=httpx.Client(transport=self.transport),
+            enabled=True,
+        )
+
+    def uninstall(self) -> None:
+        from langfuse.decorators import langfuse_context
+        from langfuse.utils.langfuse_singleton import LangfuseSingleton
+
+        langfuse_context.flush()
+        LangfuseSingleton().reset()
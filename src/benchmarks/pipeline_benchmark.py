@@ -0,0 +1,405 @@
+"""Offline benchmark of the PKM pipelines and the eval runner.
+
+Seeds a synthetic SQLite database, answers LLM calls with `FakeLLM` and
+Langfuse calls with `LangfuseStandIn`, and reports where the time goes per
+stage. Run from `src/`:
+
+    python -m benchmarks.pipeline_benchmark --projects 50 --latency 0.05
+
+Stage times are summed per item, so in the concurrent scenarios
+(project_batch, eval_runner) they overlap and can add up to more than the
+wall time; there, a `llm_wait` above the configured latency means the event
+loop or thread pool was too busy to pick the answer up on time.
+
+Pass --update-baseline to store the results as the new baseline; later runs
+with the same settings fail (exit code 1) when a stage got slower than the
+baseline allows. Baselines are keyed by the settings and only comparable on
+the machine that recorded them.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+
+SCENARIOS = ("new_info", "project_info", "project_batch", "eval_runner")
+
+# Exclusive time of every stage; the caller's time leaves out its stages' time
+STAGES = {
+    "db_load": "loading projects from the database",
+    "index": "syncing the retrieval index",
+    "retrieval": "similarity search for the input",
+    "context": "ranking and fitting the project context",
+    "tokens": "counting tokens",
+    "render": "rendering the prompt template",
+    "llm_wait": "waiting on the (fake) provider",
+    "parse": "client overhead: request building, response parsing, validation, tracing",
+}
+
+_active_frame: ContextVar[Optional[list]] = ContextVar("benchmark_stage", default=None)
+
+
+class StageTimer:
+    """Collects exclusive wall time per named stage.
+
+    Stages nest: time spent in an inner stage is subtracted from the
+    enclosing one, so the stages of a run add up to its instrumented time.
+    The nesting follows the context (threads started with `to_thread` and
+    asyncio tasks inherit it).
+    """
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        parent = _active_frame.get()
+        frame = [0.0]
+        token = _active_frame.set(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _active_frame.reset(token)
+            with self._lock:
+                self.samples[name].append(elapsed - frame[0])
+                if parent is not None:
+                    parent[0] += elapsed
+
+    def wrap(self, owner: Any, attribute: str, name: str) -> Callable[[], None]:
+        """Time every call of `owner.attribute` as `name`; returns an undo function."""
+        raw = owner.__dict__[attribute] if isinstance(owner, type) else None
+        original = getattr(owner, attribute)
+
+        if asyncio.iscoroutinefunction(original):
+
+            @wraps(original)
+            async def timed(*args, **kwargs):
+                with self.stage(name):
+                    return await original(*args, **kwargs)
+
+        else:
+
+            @wraps(original)
+            def timed(*args, **kwargs):
+                with self.stage(name):
+                    return original(*args, **kwargs)
+
+        if isinstance(raw, (staticmethod, classmethod)):
+            # `original` is already bound (or plain), keep it from binding again
+            setattr(owner, attribute, staticmethod(timed))
+        else:
+            setattr(owner, attribute, timed)
+
+        def undo():
+            if raw is not None:
+                setattr(owner, attribute, raw)
+            else:
+                delattr(owner, attribute)
+
+        return undo
+
+    def report(self, items: int) -> Dict[str, Dict[str, float]]:
+        from services.llm_router import percentile
+
+        report = {}
+        for name in STAGES:
+            samples = self.samples.get(name)
+            if not samples:
+                continue
+            values = [sample * 1000 for sample in samples]
+            report[name] = {
+                "calls": len(samples),
+                "ms_per_item": round(sum(values) / items, 3),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+            }
+        return report
+
+
+@contextlib.contextmanager
+def instrument(timer: StageTimer):
+    """Wrap the pipeline stages' entry points in timers for the duration."""
+    from pipelines.pkm.new_info_evaluator import NewInfoEvaluatorPipeline
+    from pipelines.pkm.new_info_for_project_evaluator import NewProjectInfoEvaluatorPipeline
+    from pipelines.pkm.project_context import ProjectContextBuilder
+    from prompts.prompt_manager import PromptManager
+    from services.llm_factory import LLMFactory
+    from services.token_counter import TokenCounter
+
+    targets = [
+        (NewInfoEvaluatorPipeline, "get_projects", "db_load"),
+        (NewProjectInfoEvaluatorPipeline, "get_project", "db_load"),
+        (NewProjectInfoEvaluatorPipeline, "sync_index", "index"),
+        (NewProjectInfoEvaluatorPipeline, "retrieve", "retrieval"),
+        (ProjectContextBuilder, "build", "context"),
+        (TokenCounter, "count_text", "tokens"),
+        (TokenCounter, "count_messages", "tokens"),
+        (PromptManager, "_render", "render"),
+        (LLMFactory, "create_completion", "parse"),
+        (LLMFactory, "acreate_completion", "parse"),
+    ]
+    undo = [timer.wrap(owner, attribute, name) for owner, attribute, name in targets]
+    try:
+        yield
+    finally:
+        for restore in reversed(undo):
+            restore()
+
+
+@contextlib.contextmanager
+def synthetic_database(projects: int, tasks: int, resources: int, seed: int = 0):
+    """Bind the app's sessions to a freshly seeded SQLite file; yields the project IDs."""
+    from sqlalchemy import create_engine
+
+    from benchmarks.fakes import seed_database
+    from database.database import SessionLocal
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.sqlite3")
+        project_ids = seed_database(engine, projects, tasks, resources, seed=seed)
+        previous = SessionLocal.kw.get("bind")
+        SessionLocal.configure(bind=engine)
+        try:
+            yield project_ids, Path(directory)
+        finally:
+            SessionLocal.configure(bind=previous)
+            engine.dispose()
+
+
+def run_benchmark(
+    projects: int = 20,
+    tasks: int = 10,
+    resources: int = 5,
+    inputs: int = 20,
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    concurrency: int = 8,
+    retrieval_top_k: int = 10,
+    scenarios=SCENARIOS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run the scenarios offline and return their per-stage timings."""
+    from benchmarks.fakes import FakeLLM, LangfuseStandIn, synthetic_inputs
+    from evals.runner import EvalCheckpoint, run_dataset_experiment
+    from pipelines.pkm.new_info_evaluator import NewInfoEvaluatorPipeline
+    from pipelines.pkm.new_info_for_project_evaluator import NewProjectInfoEvaluatorPipeline
+    from prompts.prompt_manager import PromptManager
+    from services.llm_factory import LLMFactory
+    from services.resource_index import ResourceIndex
+
+    config = {
+        "projects": projects,
+        "tasks": tasks,
+        "resources": resources,
+        "inputs": inputs,
+        "latency": latency,
+        "jitter": jitter,
+        "concurrency": concurrency,
+        "retrieval_top_k": retrieval_top_k,
+        "seed": seed,
+    }
+    results: Dict[str, Any] = {"config": config, "scenarios": {}}
+    texts = synthetic_inputs(inputs, seed=seed)
+    langfuse = LangfuseStandIn()
+    langfuse.install()
+    PromptManager.preload()
+
+    def factory(provider: str, timer: StageTimer) -> LLMFactory:
+        llm = LLMFactory(provider, max_concurrency=concurrency)
+        FakeLLM(latency=latency, jitter=jitter, seed=seed, timer=timer).install(llm)
+        return llm
+
+    def new_info(timer, project_ids, directory):
+        pipeline = NewInfoEvaluatorPipeline()
+        pipeline.llm = factory("github_models", timer)
+        for text in texts:
+            pipeline.evaluate_new_info(text)
+
+    def project_pipeline(timer, directory):
+        pipeline = NewProjectInfoEvaluatorPipeline(
+            llm=factory("deepseek", timer), retrieval_top_k=retrieval_top_k
+        )
+        if pipeline.index is not None:
+            pipeline.index = ResourceIndex(directory / "index.sqlite3")
+        return pipeline
+
+    def project_info(timer, project_ids, directory):
+        pipeline = project_pipeline(timer, directory)
+        for number, text in enumerate(texts):
+            pipeline.evaluate_new_info(project_ids[number % len(project_ids)], text)
+
+    def project_batch(timer, project_ids, directory):
+        pipeline = project_pipeline(timer, directory)
+        pipeline.evaluate_many(project_ids[0], texts, max_concurrency=concurrency)
+
+    def eval_runner(timer, project_ids, directory):
+        from pipelines.pkm.new_info_evaluator import NewInfoClassification
+
+        llm = factory("github_models", timer)
+        langfuse.add_dataset(
+            "bench", [{"input": {"text": text}, "expected_output": {}} for text in texts]
+        )
+
+        def task(item):
+            prompt = PromptManager.get_prompt("categorization", ticket=item.input["text"])
+            return llm.create_completion(
+                response_model=NewInfoClassification,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": item.input["text"]},
+                ],
+            )
+
+        run_dataset_experiment(
+            langfuse.client(),
+            "bench",
+            "bench run",
+            task,
+            {"has_reasoning": lambda item, output: bool(output.reasoning)},
+            max_concurrency=concurrency,
+            checkpoint=EvalCheckpoint(directory / "checkpoints.sqlite3"),
+        )
+
+    runners = {
+        "new_info": new_info,
+        "project_info": project_info,
+        "project_batch": project_batch,
+        "eval_runner": eval_runner,
+    }
+    try:
+        with synthetic_database(projects, tasks, resources, seed=seed) as (project_ids, directory):
+            for name in scenarios:
+                timer = StageTimer()
+                # The pipelines print progress for interactive use; keep it out of the report
+                with instrument(timer), contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    runners[name](timer, project_ids, directory)
+                    wall = time.perf_counter() - start
+                results["scenarios"][name] = {
+                    "items": len(texts),
+                    "wall_ms_per_item": round(wall * 1000 / len(texts), 3),
+                    "stages": timer.report(len(texts)),
+                }
+    finally:
+        langfuse.uninstall()
+    results["langfuse_events"] = len(langfuse.events)
+    return results
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    min_delta_ms: float = 0.5,
+) -> List[str]:
+    """Describe every stage that got slower than the baseline allows.
+
+    A stage regresses when its time per item exceeds the baseline by more
+    than `tolerance` (relative) and `min_delta_ms` (absolute), so noise in
+    sub-millisecond stages doesn't fail the run. The fake provider's wait
+    is configured, not measured, and is never compared.
+    """
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        reference = baseline["scenarios"].get(name)
+        if reference is None:
+            continue
+        pairs = [("wall", scenario["wall_ms_per_item"], reference["wall_ms_per_item"])]
+        for stage, timing in scenario["stages"].items():
+            if stage != "llm_wait" and stage in reference["stages"]:
+                pairs.append((stage, timing["ms_per_item"], reference["stages"][stage]["ms_per_item"]))
+        for stage, current, previous in pairs:
+            if current > previous * (1 + tolerance) and current - previous > min_delta_ms:
+                regressions.append(
+                    f"{name}/{stage}: {current:.2f} ms/item vs baseline {previous:.2f} ms/item"
+                )
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = []
+    for name, scenario in results["scenarios"].items():
+        lines.append(
+            f"{name} ({scenario['items']} items): {scenario['wall_ms_per_item']:.2f} ms/item wall"
+        )
+        for stage, timing in scenario["stages"].items():
+            lines.append(
+                f"  {stage:<10} {timing['ms_per_item']:>9.2f} ms/item"
+                f"  p50 {timing['p50_ms']:>8.2f} ms  p95 {timing['p95_ms']:>8.2f} ms"
+                f"  x{timing['calls']}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=10, help="Tasks per project.")
+    parser.add_argument("--resources", type=int, default=5, help="Resources per task.")
+    parser.add_argument("--inputs", type=int, default=20, help="Inputs per scenario.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency (s).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency (s).")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retrieval-top-k", type=int, default=10, help="0 turns retrieval off.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, dest="scenarios")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    # The fake provider never checks them, but the settings require keys
+    for key in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GITHUB_MODELS_API_KEY", "DEEPSEEK_API_KEY"):
+        os.environ.setdefault(key, "bench")
+
+    results = run_benchmark(
+        projects=args.projects,
+        tasks=args.tasks,
+        resources=args.resources,
+        inputs=args.inputs,
+        latency=args.latency,
+        jitter=args.jitter,
+        concurrency=args.concurrency,
+        retrieval_top_k=args.retrieval_top_k,
+        scenarios=args.scenarios or SCENARIOS,
+    )
+    print(format_results(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    key = json.dumps(results["config"], sort_keys=True)
+    if args.update_baseline:
+        baselines[key] = results
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if key not in baselines:
+        print("No baseline for these settings; run with --update-baseline to store one.")
+        return 0
+    regressions = compare(results, baselines[key], tolerance=args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
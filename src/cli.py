@@ -0,0 +1,145 @@
+import os
+import signal
+import click
+from sqlalchemy import or_
+from database.database import SessionLocal, engine
+from database.query_plans import check_hot_queries
+from models.project import Project
+from models.resource import Resource
+from models.task import Task
+from utils.markdown_helper import RENDERER_VERSION
+
+
+@click.command("render-markdown")
+@click.option("--all", "render_all", is_flag=True, help="Re-render every row, not only stale ones.")
+@click.option("--batch-size", default=500, show_default=True, help="Rows committed per batch.")
+def render_markdown_command(render_all, batch_size):
+    """Backfill the stored *_html columns of projects and tasks.
+
+    Only rows never rendered or rendered by an older RENDERER_VERSION are
+    touched unless --all is given.
+    """
+    db = SessionLocal()
+    try:
+        for model in (Project, Task):
+            query = db.query(model).order_by(model.id)
+            if not render_all:
+                query = query.filter(
+                    or_(
+                        model.markdown_version.is_(None),
+                        model.markdown_version != RENDERER_VERSION,
+                    )
+                )
+
+            # Keyset over the primary key so each batch is a fresh, bounded query
+            rendered = 0
+            last_id = 0
+            while True:
+                rows = query.filter(model.id > last_id).limit(batch_size).all()
+                if not rows:
+                    break
+                for row in rows:
+                    row.render_markdown()
+                db.commit()
+                rendered += len(rows)
+                last_id = rows[-1].id
+            click.echo(f"Rendered {rendered} {model.__tablename__} row(s).")
+    finally:
+        db.close()
+
+
+@click.command("fingerprint-resources")
+@click.option("--all", "fingerprint_all", is_flag=True, help="Recompute every row, not only new ones.")
+@click.option("--batch-size", default=500, show_default=True, help="Rows committed per batch.")
+def fingerprint_resources_command(fingerprint_all, batch_size):
+    """Backfill the canonical URL and notes SimHash of resources.
+
+    Only rows never fingerprinted are touched unless --all is given.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Resource).order_by(Resource.id)
+        if not fingerprint_all:
+            query = query.filter(Resource.canonical_url.is_(None))
+
+        updated = 0
+        last_id = 0
+        while True:
+            rows = query.filter(Resource.id > last_id).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                row.fingerprint()
+            db.commit()
+            updated += len(rows)
+            last_id = rows[-1].id
+        click.echo(f"Fingerprinted {updated} resource(s).")
+    finally:
+        db.close()
+
+
+@click.command("explain-hot-queries")
+@click.option("--verbose", is_flag=True, help="Print the full plan of every query.")
+def explain_hot_queries_command(verbose):
+    """Check with EXPLAIN that the hot-path queries use their indexes."""
+    failed = 0
+    for query, ok, plan in check_hot_queries(engine):
+        click.echo(f"[{'ok' if ok else 'MISSING INDEX'}] {query.name}")
+        if verbose or not ok:
+            click.echo(f"  expected one of: {', '.join(query.expected_indexes)}")
+            click.echo("  " + plan.replace("\n", "\n  "))
+        failed += not ok
+    if failed:
+        raise click.ClickException(f"{failed} hot query(ies) not using an index.")
+
+
+@click.command("warm-tokenizers")
+@click.option("--dir", "tokenizer_dir", required=True, help="Directory to store tokenizer files in.")
+@click.argument("encodings", nargs=-1)
+def warm_tokenizers_command(tokenizer_dir, encodings):
+    """Download tokenizer files so token counting works offline.
+
+    Point TIKTOKEN_CACHE_DIR at the same directory at runtime.
+    """
+    os.environ["TIKTOKEN_CACHE_DIR"] = tokenizer_dir
+    from services.token_counter import get_encoding
+
+    for name in encodings or ("cl100k_base", "o200k_base"):
+        get_encoding.cache_clear()
+        if get_encoding(name) is None:
+            raise click.ClickException(f"Could not load tokenizer {name}.")
+        click.echo(f"Cached {name} in {tokenizer_dir}.")
+
+
+@click.command("run-evaluation-worker")
+@click.option("--concurrency", type=int, help="Evaluations run at once (default: EVALUATION_WORKER_CONCURRENCY).")
+def run_evaluation_worker_command(concurrency):
+    """Run the evaluations queued through the API until interrupted.
+
+    Start as many of these as the LLM rate limits allow; they share the
+    queue in the database and never run the same job twice.
+    """
+    from config.worker_settings import get_worker_settings
+    from services.job_queue import EvaluationWorker, default_pipeline
+
+    settings = get_worker_settings()
+    worker = EvaluationWorker(
+        concurrency=concurrency or settings.concurrency,
+        poll_interval=settings.poll_seconds,
+        stale_after=settings.stale_seconds,
+        max_attempts=settings.max_attempts,
+        pipeline_factory=lambda: default_pipeline(settings.llm_provider),
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    click.echo(f"Evaluation worker {worker.worker_id} running {worker.concurrency} job(s) at once.")
+    worker.run()
+    click.echo(f"Stopped after {worker.processed} job(s).")
+
+
+def register_commands(flask_app):
+    flask_app.cli.add_command(render_markdown_command)
+    flask_app.cli.add_command(fingerprint_resources_command)
+    flask_app.cli.add_command(explain_hot_queries_command)
+    flask_app.cli.add_command(warm_tokenizers_command)
+    flask_app.cli.add_command(run_evaluation_worker_command)
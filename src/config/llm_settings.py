@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import BaseModel, Field
 from functools import lru_cache
 import pathlib
 
@@ -14,6 +14,7 @@ class LLMProviderSettings(BaseSettings):
     temperature: float = 0.0
     max_tokens: Optional[int] = None
     max_retries: int = 3
+    max_concurrency: int = 16  # in-flight async completions per factory and event loop
 
 
 class GithubOpenAISettings(LLMProviderSettings):
@@ -45,6 +46,57 @@ class LlamaSettings(LLMProviderSettings):
     base_url: str = "http://localhost:11434/v1"
 
 
+class LLMCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    enabled: bool = Field(default=False, validation_alias="LLM_CACHE_ENABLED")
+    path: str = Field(default=str(root_dir / ".cache" / "llm_cache.sqlite3"), validation_alias="LLM_CACHE_PATH")
+    ttl_seconds: float = Field(default=7 * 24 * 3600, validation_alias="LLM_CACHE_TTL_SECONDS")
+    max_bytes: int = Field(default=256 * 1024 * 1024, validation_alias="LLM_CACHE_MAX_BYTES")
+    # Only cache calls whose sampling is deterministic
+    deterministic_only: bool = Field(default=True, validation_alias="LLM_CACHE_DETERMINISTIC_ONLY")
+
+
+class TokenCountSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    # auto: tiktoken for OpenAI-compatible providers, length estimate for the rest
+    mode: Literal["auto", "exact", "estimate", "off"] = Field(default="auto", validation_alias="LLM_TOKEN_COUNT_MODE")
+    # Directory holding pre-downloaded tokenizer files (see `flask warm-tokenizers`)
+    tokenizer_dir: Optional[str] = Field(default=None, validation_alias="TIKTOKEN_CACHE_DIR")
+    # Pretty-print every request's token table with rich
+    debug_render: bool = Field(default=False, validation_alias="LLM_DEBUG_TOKENS")
+
+
+class RoutingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    # Comma-separated providers in failover order, e.g. "deepseek,github_models"
+    providers: str = Field(default="deepseek,github_models", validation_alias="LLM_PROVIDERS")
+    # Whole-call budget, shared by every attempt
+    deadline_seconds: float = Field(default=60.0, validation_alias="LLM_DEADLINE_SECONDS")
+    # Hedge to the next provider once a call outlives this latency percentile
+    hedge_percentile: float = Field(default=95.0, validation_alias="LLM_HEDGE_PERCENTILE")
+    # Hedge delay used until a provider has enough latency samples
+    hedge_delay_seconds: float = Field(default=10.0, validation_alias="LLM_HEDGE_DELAY_SECONDS")
+    hedge_min_samples: int = Field(default=20, validation_alias="LLM_HEDGE_MIN_SAMPLES")
+
+    @property
+    def provider_list(self) -> List[str]:
+        return [name.strip() for name in self.providers.split(",") if name.strip()]
+
+
+class RateLimit(BaseModel):
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+
+class RateLimitSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    path: str = Field(default=str(root_dir / ".cache" / "llm_rate_limits.sqlite3"), validation_alias="LLM_RATE_LIMIT_PATH")
+    # JSON by provider, e.g. {"deepseek": {"requests_per_minute": 60, "tokens_per_minute": 100000}}
+    limits: Dict[str, RateLimit] = Field(default_factory=dict, validation_alias="LLM_RATE_LIMITS")
+    # Lane of calls that don't pass one: interactive, batch or eval
+    default_lane: Literal["interactive", "batch", "eval"] = Field(default="interactive", validation_alias="LLM_RATE_LIMIT_LANE")
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
@@ -52,6 +104,10 @@ class Settings(BaseSettings):
     llama: LlamaSettings = Field(default_factory=LlamaSettings)
     github_models: GithubOpenAISettings = Field(default_factory=GithubOpenAISettings)
     deepseek: DeepSeekSettings = Field(default_factory=DeepSeekSettings)
+    cache: LLMCacheSettings = Field(default_factory=LLMCacheSettings)
+    tokens: TokenCountSettings = Field(default_factory=TokenCountSettings)
+    routing: RoutingSettings = Field(default_factory=RoutingSettings)
+    rate_limits: RateLimitSettings = Field(default_factory=RateLimitSettings)
 
 
 @lru_cache
@@ -0,0 +1,30 @@
+import pathlib
+from functools import lru_cache
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+root_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+
+env_file_path = root_dir / ".env"
+
+
+class RetrievalSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    enabled: bool = Field(default=True, validation_alias="RETRIEVAL_INDEX_ENABLED")
+    path: str = Field(default=str(root_dir / ".cache" / "retrieval_index.sqlite3"), validation_alias="RETRIEVAL_INDEX_PATH")
+    # Hashed feature space; changing it re-indexes documents lazily
+    dimensions: int = Field(default=4096, validation_alias="RETRIEVAL_INDEX_DIMENSIONS")
+    # Resources sent to the LLM per evaluation, 0 sends all of them
+    top_k: int = Field(default=10, validation_alias="RETRIEVAL_TOP_K")
+    # Inputs that repeat a resource's URL or notes are classified redundant without the LLM
+    duplicate_detection: bool = Field(default=True, validation_alias="DUPLICATE_DETECTION_ENABLED")
+    # SimHash bits (of 64) two notes may differ by and still count as the same;
+    # a one or two word edit of a short note stays under 10, unrelated notes
+    # differ by about 32
+    duplicate_max_distance: int = Field(default=10, validation_alias="DUPLICATE_MAX_DISTANCE")
+
+
+@lru_cache
+def get_retrieval_settings() -> RetrievalSettings:
+    return RetrievalSettings()
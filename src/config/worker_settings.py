@@ -0,0 +1,26 @@
+import pathlib
+from functools import lru_cache
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+root_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+
+env_file_path = root_dir / ".env"
+
+
+class WorkerSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=env_file_path, env_file_encoding="utf-8", extra="ignore")
+    # Evaluations run at once per worker process, independent of gunicorn's workers
+    concurrency: int = Field(default=4, validation_alias="EVALUATION_WORKER_CONCURRENCY")
+    # Idle wait between polls of an empty queue
+    poll_seconds: float = Field(default=1.0, validation_alias="EVALUATION_WORKER_POLL_SECONDS")
+    # Running jobs without a heartbeat for this long are requeued (worker died)
+    stale_seconds: float = Field(default=300.0, validation_alias="EVALUATION_JOB_STALE_SECONDS")
+    max_attempts: int = Field(default=3, validation_alias="EVALUATION_JOB_MAX_ATTEMPTS")
+    llm_provider: str = Field(default="deepseek", validation_alias="EVALUATION_WORKER_LLM_PROVIDER")
+
+
+@lru_cache
+def get_worker_settings() -> WorkerSettings:
+    return WorkerSettings()
@@ -1,13 +1,90 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/projectdb")
 
-engine = create_engine(DATABASE_URL)
+# Pool settings apply per process: each gunicorn worker owns its own pool, so
+# the worst case is workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections,
+# which must stay below Postgres' max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+class PoolWaitStats:
+    """Thread-safe counters for time spent waiting on pool checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": round(self.total_wait, 6),
+                "avg_wait_seconds": round(self.total_wait / self.checkouts, 6)
+                if self.checkouts
+                else 0.0,
+                "max_wait_seconds": round(self.max_wait, 6),
+            }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def _engine_options(url):
+    # SQLite (local and test runs) keeps SQLAlchemy's default pooling
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -18,3 +95,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def pool_stats():
+    """Return the current pool occupancy and checkout wait statistics."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats["max_overflow"] = DB_MAX_OVERFLOW
+        stats["recycle_seconds"] = DB_POOL_RECYCLE
+        stats["pre_ping"] = DB_POOL_PRE_PING
+        stats["wait"] = pool_wait_stats.snapshot()
+    return stats
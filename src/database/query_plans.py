@@ -0,0 +1,142 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import func, select, text
+from models.project import Project
+from models.task import Task
+from models.resource import Resource
+from models.evaluation_job import EvaluationJob
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    statement: object
+    # Any of these indexes satisfies the query
+    expected_indexes: tuple
+
+
+def hot_queries():
+    """The queries on the request hot path and the indexes that must serve them."""
+    return [
+        HotQuery(
+            "project tasks ordered",
+            select(Task).where(Task.project_id == 1).order_by(Task.sort_order, Task.id),
+            ("ix_tasks_project_id_sort_order",),
+        ),
+        HotQuery(
+            "max task sort_order",
+            select(func.max(Task.sort_order)).where(Task.project_id == 1),
+            ("ix_tasks_project_id_sort_order",),
+        ),
+        HotQuery(
+            "task resources",
+            select(Resource).where(Resource.task_id == 1),
+            ("ix_resources_task_id",),
+        ),
+        HotQuery(
+            "projects page",
+            select(Project.id)
+            .order_by(Project.updated_at.desc(), Project.id.desc())
+            .limit(26),
+            ("ix_projects_updated_at_id",),
+        ),
+        HotQuery(
+            "projects page by status",
+            select(Project.id)
+            .where(Project.status == "In Progress")
+            .order_by(Project.updated_at.desc(), Project.id.desc())
+            .limit(26),
+            ("ix_projects_status_updated_at_id",),
+        ),
+        HotQuery(
+            "projects by deadline range",
+            select(Project.id).where(
+                Project.deadline >= datetime(2025, 1, 1),
+                Project.deadline < datetime(2025, 2, 1),
+            ),
+            ("ix_projects_deadline",),
+        ),
+        HotQuery(
+            "resources by canonical url",
+            select(Resource.id).where(Resource.canonical_url == "https://example.com/a"),
+            ("ix_resources_canonical_url",),
+        ),
+        HotQuery(
+            "next queued evaluation job",
+            select(EvaluationJob.id)
+            .where(EvaluationJob.status == "queued")
+            .order_by(EvaluationJob.id)
+            .limit(1),
+            ("ix_evaluation_jobs_status_id",),
+        ),
+    ]
+
+
+def _postgres_indexes(plan):
+    found = set()
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "Index Name" in node:
+                found.add(node["Index Name"])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return found
+
+
+def explain(connection, statement):
+    """
+    Return (plan_text, indexes_used) for a statement on the connection's backend
+
+    Args:
+        connection: SQLAlchemy connection (PostgreSQL or SQLite)
+        statement: Select statement to explain
+
+    Returns:
+        tuple: Human-readable plan and the set of index names it uses
+    """
+    sql = str(
+        statement.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+    if connection.dialect.name == "postgresql":
+        raw = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        plan = raw if isinstance(raw, list) else json.loads(raw)
+        return json.dumps(plan, indent=2), _postgres_indexes(plan)
+
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    details = [row[-1] for row in rows]
+    indexes = {
+        word
+        for detail in details
+        for word in detail.replace("(", " ").split()
+        if word.startswith("ix_")
+    }
+    return "\n".join(details), indexes
+
+
+def check_hot_queries(engine):
+    """
+    Explain every hot query and report whether it uses one of its indexes
+
+    On PostgreSQL sequential scans are disabled for the check, so a small
+    table doesn't hide a missing or unusable index.
+
+    Returns:
+        list: (HotQuery, ok, plan_text) per query
+    """
+    results = []
+    with engine.connect() as connection:
+        with connection.begin() as transaction:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for query in hot_queries():
+                plan, indexes = explain(connection, query.statement)
+                ok = bool(indexes & set(query.expected_indexes))
+                results.append((query, ok, plan))
+            transaction.rollback()
+    return results
@@ -0,0 +1,268 @@
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.llm_settings import root_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = root_dir / ".cache" / "eval_checkpoints.sqlite3"
+
+
+class EvalCheckpoint:
+    """IDs of the dataset items each run has finished, kept in a local SQLite file.
+
+    Re-running an experiment under the same run name skips these items, so
+    an interrupted run picks up where it stopped.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CHECKPOINT_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS completed_items (
+                    run_name TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    completed_at REAL NOT NULL,
+                    PRIMARY KEY (run_name, item_id)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def completed(self, run_name: str) -> set:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_id FROM completed_items WHERE run_name = ?", (run_name,)
+            )
+            return {item_id for (item_id,) in rows}
+
+    def mark(self, run_name: str, item_ids: Iterable[str]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO completed_items (run_name, item_id, completed_at) "
+                "VALUES (?, ?, ?)",
+                [(run_name, item_id, now) for item_id in item_ids],
+            )
+            conn.execute("COMMIT")
+
+    def clear(self, run_name: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM completed_items WHERE run_name = ?", (run_name,))
+
+
+@dataclass
+class ItemResult:
+    item_id: str
+    output: Any = None
+    scores: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class RunSummary:
+    run_name: str
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    results: List[ItemResult] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.run_name}: {self.completed} completed, {self.failed} failed, "
+            f"{self.skipped} skipped (already done) of {self.total} "
+            f"in {self.elapsed_seconds:.1f}s"
+        )
+
+
+class ScoreBatcher:
+    """Collects Langfuse scores and posts them through the ingestion API in batches."""
+
+    def __init__(self, langfuse: Any, batch_size: int = 50) -> None:
+        self.langfuse = langfuse
+        self.batch_size = batch_size
+        self.pending: List[tuple] = []
+        self.batches_sent = 0
+        # Keys (item IDs) with at least one score that didn't make it to Langfuse
+        self.failed: set = set()
+        self._lock = threading.Lock()
+
+    def add(self, key: str, trace_id: str, name: str, value: Any) -> None:
+        with self._lock:
+            self.pending.append((key, trace_id, name, value))
+
+    @property
+    def full(self) -> bool:
+        return len(self.pending) >= self.batch_size
+
+    def flush(self) -> None:
+        """Post every queued score in one ingestion request."""
+        from langfuse.api import IngestionEvent_ScoreCreate, ScoreBody
+
+        with self._lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        events, keys_by_id = [], {}
+        for key, trace_id, name, value in pending:
+            score_id = str(uuid.uuid4())
+            keys_by_id[score_id] = key
+            if isinstance(value, bool):
+                value = float(value)
+            events.append(
+                IngestionEvent_ScoreCreate(
+                    id=str(uuid.uuid4()),
+                    timestamp=now,
+                    body=ScoreBody(id=score_id, trace_id=trace_id, name=name, value=value),
+                )
+            )
+        try:
+            response = self.langfuse.client.ingestion.batch(batch=events)
+        except Exception:
+            logger.exception("Posting %d scores to Langfuse failed", len(events))
+            self.failed.update(keys_by_id.values())
+            return
+        self.batches_sent += 1
+        # Errors carry the event id; map them back to the item the score belonged to
+        event_keys = {event.id: keys_by_id[event.body.id] for event in events}
+        for error in response.errors:
+            logger.warning("Langfuse rejected score event %s: %s", error.id, error.message)
+            self.failed.add(event_keys.get(error.id))
+
+
+class EvalRunner:
+    """Runs an eval task over dataset items with bounded concurrency.
+
+    Items run on a thread pool, `max_concurrency` at a time. Finished items
+    are recorded in `checkpoint` under the run name (after their scores
+    are posted, when there's a `ScoreBatcher`), so a rerun with the same
+    name only does the items that didn't finish. A failing item is logged
+    and left out of the checkpoint; it doesn't stop the run.
+    """
+
+    def __init__(
+        self,
+        run_name: str,
+        max_concurrency: int = 8,
+        checkpoint: Optional[EvalCheckpoint] = None,
+        scores: Optional[ScoreBatcher] = None,
+    ) -> None:
+        self.run_name = run_name
+        self.max_concurrency = max_concurrency
+        self.checkpoint = checkpoint
+        self.scores = scores
+
+    def _save(self, item_ids: List[str]) -> None:
+        """Checkpoint finished items once their scores are stored."""
+        if self.scores is not None:
+            self.scores.flush()
+            item_ids = [item_id for item_id in item_ids if item_id not in self.scores.failed]
+        if self.checkpoint is not None and item_ids:
+            self.checkpoint.mark(self.run_name, item_ids)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        task: Callable[[Any], ItemResult],
+        item_id: Callable[[Any], str] = lambda item: item.id,
+    ) -> RunSummary:
+        """Run `task` on every item not yet checkpointed and return a summary.
+
+        `task` returns the item's ItemResult and queues its scores on
+        `self.scores` itself, since only it knows the trace they belong to.
+        """
+        start = time.perf_counter()
+        items = list(items)
+        summary = RunSummary(run_name=self.run_name, total=len(items))
+        done = self.checkpoint.completed(self.run_name) if self.checkpoint else set()
+        todo = [item for item in items if item_id(item) not in done]
+        summary.skipped = len(items) - len(todo)
+
+        unsaved: List[str] = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {pool.submit(task, item): item_id(item) for item in todo}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning("Eval item %s failed: %s", futures[future], e)
+                        result = ItemResult(item_id=futures[future], error=e)
+                        summary.failed += 1
+                    else:
+                        summary.completed += 1
+                        unsaved.append(result.item_id)
+                    summary.results.append(result)
+                    if self.scores is None or self.scores.full:
+                        self._save(unsaved)
+                        unsaved = []
+            except BaseException:
+                # Interrupted: don't start the items still queued
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                self._save(unsaved)
+
+        summary.elapsed_seconds = time.perf_counter() - start
+        logger.info("%s", summary)
+        return summary
+
+
+def run_dataset_experiment(
+    langfuse: Any,
+    dataset_name: str,
+    run_name: str,
+    task: Callable[[Any], Any],
+    evaluators: Dict[str, Callable[[Any, Any], Any]],
+    max_concurrency: int = 8,
+    checkpoint: Optional[EvalCheckpoint] = None,
+    score_batch_size: int = 50,
+) -> RunSummary:
+    """Run `task` over a Langfuse dataset as the experiment `run_name`.
+
+    Each item is traced through `item.observe` (which links it to the run),
+    each evaluator's value is scored on its trace in batches, and finished
+    items are checkpointed so the same run name can be resumed.
+    """
+    dataset = langfuse.get_dataset(dataset_name)
+    scores = ScoreBatcher(langfuse, batch_size=score_batch_size)
+    runner = EvalRunner(
+        run_name,
+        max_concurrency=max_concurrency,
+        checkpoint=checkpoint or EvalCheckpoint(),
+        scores=scores,
+    )
+
+    def evaluate(item) -> ItemResult:
+        with item.observe(run_name=run_name) as trace_id:
+            output = task(item)
+        values = {name: evaluator(item, output) for name, evaluator in evaluators.items()}
+        for name, value in values.items():
+            scores.add(item.id, trace_id, name, value)
+        return ItemResult(item_id=item.id, output=output, scores=values)
+
+    return runner.run(dataset.items, evaluate)
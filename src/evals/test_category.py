@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field
 from services.llm_factory import LLMFactory
 from enum import Enum
 from prompts.prompt_manager import PromptManager
+from evals.runner import EvalRunner, ItemResult
 
 
 
@@ -32,7 +33,7 @@ def test_eval():
 
     llm = LLMFactory("github_models")
 
-    for entry in data:
+    def classify(entry) -> ItemResult:
         # Example of using the PromptManager
         prompt = PromptManager.get_prompt(
         "categorization", ticket=entry["text"]
@@ -46,6 +47,15 @@ def test_eval():
             response_model=Classification,
             messages=messages,
         )
+        return ItemResult(item_id=entry["text"], output=completion)
+
+    runner = EvalRunner("sentiment_analysis", max_concurrency=llm.max_concurrency)
+    summary = runner.run(data, classify, item_id=lambda entry: entry["text"])
+    assert summary.failed == 0, [result.error for result in summary.results if result.error]
+
+    outputs = {result.item_id: result.output for result in summary.results}
+    for entry in data:
+        completion = outputs[entry["text"]]
         assert isinstance(completion, Classification)
         assert completion.sentiment.value == entry["label"]
         assert abs(completion.confidence - entry["confidence"]) < 0.15
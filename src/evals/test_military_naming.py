@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+import sys
 
 
 from typing import List, Literal
@@ -7,8 +8,9 @@ from langfuse import Langfuse
 from langfuse.decorators import observe, langfuse_context
 from pydantic import BaseModel, Field
 
-from ..config.langfuse_settings import langFuseSettings
-from ..services.llm_factory import LLMFactory
+from config.langfuse_settings import langFuseSettings
+from evals.runner import run_dataset_experiment
+from services.llm_factory import LLMFactory
 from datetime import datetime
 
 load_dotenv()  # take environment variables
@@ -51,45 +53,43 @@ def simple_evaluation(output, expected_output):
 
 
 def run_experiment(experiment_name, label):
-    dataset = langfuse_client.get_dataset("video_summaries")
-
-    for item in dataset.items:
-        # item.observe() returns a trace_id that can be used to add custom evaluations later
-        # it also automatically links the trace to the experiment run
-        with item.observe(run_name=experiment_name) as trace_id:
-            # run application, pass input and system prompt
-            output = get_chat_response(
-                user_background=item.input.get("user_background"),
-                first_video_summary=item.input.get("first_video_summary"),
-                second_video_summary=item.input.get("second_video_summary"),
-                label=label,
-            )
-
-            # optional: add custom evaluation results to the experiment trace
-            # we use the previously created example evaluation function
-            # Assuming item.expected_output is a string and should be compared against the detailed_analysis.
-            # If item.expected_output is structured or another field is more appropriate, this may need adjustment.
-            langfuse_client.score(
-                trace_id=trace_id,
-                name="exact_match",
-                value=simple_evaluation(
-                    output.selected_video, item.expected_output.get("selected_video")
-                ),
-            )
+    """Run the dataset through `label`'s prompt; rerun with the same name to resume."""
+
+    def task(item):
+        return get_chat_response(
+            user_background=item.input.get("user_background"),
+            first_video_summary=item.input.get("first_video_summary"),
+            second_video_summary=item.input.get("second_video_summary"),
+            label=label,
+        )
+
+    return run_dataset_experiment(
+        langfuse_client,
+        dataset_name="video_summaries",
+        run_name=experiment_name,
+        task=task,
+        evaluators={
+            "exact_match": lambda item, output: simple_evaluation(
+                output.selected_video, item.expected_output.get("selected_video")
+            ),
+        },
+        max_concurrency=llm_factory.max_concurrency,
+    )
 
 
 # Example of how to use the new function (optional, can be removed or adapted)
 if __name__ == "__main__":
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Pass an earlier run's timestamp to resume it instead of starting over
+    timestamp = sys.argv[1] if len(sys.argv) > 1 else datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    run_experiment(
+    print(run_experiment(
         experiment_name=f"verify_video_summaries_{timestamp}",
         label="production",
-    )
-    run_experiment(
+    ))
+    print(run_experiment(
         experiment_name=f"verify_new_version_{timestamp}",
         label="latest",
-    )
+    ))
     # run_experiment(
     #     experiment_name="asking_specifically",
     #     label="The user will input countries, respond with only the name of the capital",
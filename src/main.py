@@ -1,11 +1,268 @@
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import sys
+from enum import Enum
+from typing import List, Optional, Set, Tuple
 from rich.console import Console
+from rich.live import Live
+from rich.logging import RichHandler
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
 from rich.syntax import Syntax
-from pipelines.pkm.new_info_for_project_evaluator import NewProjectInfoEvaluatorPipeline
+from rich.table import Table
+from pipelines.pkm.new_info_for_project_evaluator import (
+    BatchEvaluationResult,
+    NewInfoClassification,
+    NewProjectInfoEvaluatorPipeline,
+)
+from prompts.prompt_manager import PromptManager
 from database.database import SessionLocal
 from models.project import Project
+from services.llm_factory import LLMFactory
+
+# Files picked up when --input is a directory
+INPUT_SUFFIXES = {".txt", ".md"}
+
+
+def render_partial(partial) -> Table:
+    """Table of the classification's fields, with the ones not generated yet pending"""
+    table = Table(show_header=False, box=None, expand=True)
+    table.add_column(style="bold cyan", no_wrap=True)
+    table.add_column()
+    for field in NewInfoClassification.model_fields:
+        value = getattr(partial, field, None)
+        if value is None:
+            table.add_row(field, "[dim]…[/dim]")
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, list):
+            value = ", ".join(value) or "-"
+        table.add_row(field, str(value))
+    return table
+
+
+def read_inputs(path: pathlib.Path) -> List[Tuple[str, str]]:
+    """
+    Read (input id, text) pairs from a JSONL file or a directory
+
+    JSONL lines are either a string or an object with `input` and an
+    optional `id` (the line number by default). In a directory every .txt
+    and .md file is an input, identified by its relative path.
+    """
+    items = []
+    if path.is_dir():
+        for file in sorted(path.rglob("*")):
+            if file.is_file() and file.suffix in INPUT_SUFFIXES:
+                text = file.read_text(encoding="utf-8").strip()
+                if text:
+                    items.append((file.relative_to(path).as_posix(), text))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"input": record}
+                text = (record.get("input") or "").strip()
+                if text:
+                    items.append((str(record.get("id", line_number)), text))
+    ids = [input_id for input_id, _ in items]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Input ids in {path} must be unique to resume a batch.")
+    return items
+
+
+def completed_inputs(output_path: pathlib.Path) -> Set[Tuple[int, str]]:
+    """(project id, input id) pairs the output already has a result for; failures are retried."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted run may be cut short
+                continue
+            if record.get("result") is not None:
+                done.add((record["project_id"], record["id"]))
+    return done
+
+
+def open_output(output_path: pathlib.Path, resume: bool):
+    """Open the results file for a batch run, appending when resuming.
+
+    An interrupted run can leave a cut-short last line; it's dropped so the
+    first new record starts on a line of its own.
+    """
+    if resume and output_path.exists():
+        with open(output_path, "r+b") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+    return open(output_path, "a" if resume else "w", encoding="utf-8")
+
+
+async def run_batch(
+    pipeline,
+    items: List[Tuple[str, str]],
+    project_ids: List[int],
+    output,
+    max_concurrency: int,
+    progress: Optional[Progress] = None,
+    skip: Set[Tuple[int, str]] = frozenset(),
+) -> Tuple[int, int]:
+    """
+    Evaluate every input against every project, writing results as they finish
+
+    One JSON line per result goes to `output` as soon as it's done, so an
+    interrupted run loses only the evaluations in flight. At most
+    `max_concurrency` LLM calls run at once across all projects.
+
+    Returns:
+        tuple: Number of evaluations that succeeded and that failed
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    finished: asyncio.Queue = asyncio.Queue()
+    batches = {
+        project_id: [item for item in items if (project_id, item[0]) not in skip]
+        for project_id in project_ids
+    }
+    batches = {project_id: pending for project_id, pending in batches.items() if pending}
+    task = None
+    if progress is not None:
+        total = sum(len(pending) for pending in batches.values())
+        task = progress.add_task("Evaluating", total=total)
+
+    async def evaluate_project(project_id, pending):
+        reported = set()
+        try:
+            async for result in pipeline.aiter_evaluations(
+                project_id, [text for _, text in pending], semaphore=semaphore
+            ):
+                reported.add(result.index)
+                await finished.put((project_id, pending[result.index][0], result))
+        except Exception as e:
+            # e.g. an unknown project: every input left fails with the same error
+            for index, (input_id, text) in enumerate(pending):
+                if index not in reported:
+                    error = BatchEvaluationResult(
+                        index=index, user_input=text, error=f"{type(e).__name__}: {e}"
+                    )
+                    await finished.put((project_id, input_id, error))
+        finally:
+            await finished.put(None)
+
+    workers = [
+        asyncio.create_task(evaluate_project(project_id, pending))
+        for project_id, pending in batches.items()
+    ]
+    succeeded = failed = 0
+    running = len(workers)
+    while running:
+        item = await finished.get()
+        if item is None:
+            running -= 1
+            continue
+        project_id, input_id, result = item
+        record = {
+            "project_id": project_id,
+            "id": input_id,
+            "result": result.result.model_dump(mode="json") if result.result else None,
+            "error": result.error,
+            "retrieval_ms": result.retrieval_ms,
+        }
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        if result.error is None:
+            succeeded += 1
+        else:
+            failed += 1
+        if progress is not None:
+            progress.update(
+                task, advance=1, description=f"Evaluating ({failed} failed)" if failed else "Evaluating"
+            )
+    await asyncio.gather(*workers)
+    return succeeded, failed
+
+
+def evaluate_batch(args) -> int:
+    console = Console(stderr=True)
+    items = read_inputs(pathlib.Path(args.input))
+    output_path = pathlib.Path(args.output)
+    skip = completed_inputs(output_path) if args.resume else set()
+    if skip:
+        console.print(f"Resuming: {len(skip)} evaluation(s) already in {output_path}.")
+
+    PromptManager.preload()
+    # Batch calls wait behind interactive ones for rate limit quota
+    pipeline = NewProjectInfoEvaluatorPipeline(llm=LLMFactory(args.provider, lane="batch"))
+    progress = Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with open_output(output_path, args.resume) as output, progress:
+        succeeded, failed = asyncio.run(
+            run_batch(
+                pipeline,
+                items,
+                args.project,
+                output,
+                args.concurrency,
+                progress=progress,
+                skip=skip,
+            )
+        )
+    console.print(f"{succeeded} evaluation(s) written to {output_path}, {failed} failed.")
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate new information against projects. "
+        "Without --input, pick a project and evaluate input.txt interactively."
+    )
+    parser.add_argument("--input", help="JSONL file or directory of inputs to evaluate in batch.")
+    parser.add_argument(
+        "--project", type=int, action="append", default=[], help="Project ID; repeat for several."
+    )
+    parser.add_argument("--output", default="results.jsonl", help="JSONL file results are written to.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Evaluations run at once.")
+    parser.add_argument("--provider", default="deepseek", help="LLM provider for batch runs.")
+    parser.add_argument(
+        "--resume", action="store_true", help="Append to --output, skipping inputs already evaluated."
+    )
+    args = parser.parse_args(argv)
+    if args.input and not args.project:
+        parser.error("--input needs at least one --project")
+    return args
+
+
+def show_pipeline_progress(console: Console) -> None:
+    """Print the pipelines' progress logs (project, context, retrieval) on the console."""
+    handler = RichHandler(console=console, show_time=False, show_level=False, show_path=False)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    pipeline_logger = logging.getLogger("pipelines")
+    pipeline_logger.addHandler(handler)
+    pipeline_logger.setLevel(logging.INFO)
 
 
 def main():
+    args = parse_args()
+    if args.input:
+        sys.exit(evaluate_batch(args))
+
+    # Only the interactive run shows them; a batch would interleave them with its progress bar
+    console = Console()
+    show_pipeline_progress(console)
+
     # List all projects and let the user select one
     db = SessionLocal()
     try:
@@ -29,6 +286,8 @@ def main():
     finally:
         db.close()
 
+    # Compile the prompt templates once, before any evaluation
+    PromptManager.preload()
     pipeline = NewProjectInfoEvaluatorPipeline()
 
     # Read user input from input.txt in the root folder
@@ -42,13 +301,16 @@ def main():
         )
         return
 
-    result = pipeline.evaluate_new_info(
-        project_id=project_id,
-        user_input=user_input,
-    )
+    result = None
+    # Show the fields as the model writes them; the final JSON replaces this view
+    with Live(render_partial(None), console=console, transient=True) as live:
+        for result in pipeline.stream_new_info(
+            project_id=project_id,
+            user_input=user_input,
+        ):
+            live.update(render_partial(result))
 
     # Print the result with monokai theme and word wrap
-    console = Console()
     json_str = result.model_dump_json(indent=4)
     syntax = Syntax(
         json_str, "json", theme="monokai", line_numbers=False, word_wrap=True
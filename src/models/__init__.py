@@ -1,4 +1,5 @@
 # src/models/__init__.py
 from .project import Project
 from .task import Task
-from .resource import Resource
\ No newline at end of file
+from .resource import Resource
+from .evaluation_job import EvaluationJob
\ No newline at end of file
@@ -0,0 +1,33 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text, func
+from database.database import Base
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class EvaluationJob(Base):
+    """A new-info evaluation waiting for, or run by, the evaluation worker."""
+
+    __tablename__ = "evaluation_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job and look for stale running ones
+        Index("ix_evaluation_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    user_input = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default=QUEUED)  # queued, running, succeeded, failed
+    # NewInfoClassification as JSON once succeeded
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100))
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -1,12 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, func
 from sqlalchemy.orm import relationship
 from database.database import Base
+from utils.markdown_helper import render_markdown_fields, stored_html
 
 metadata = Base.metadata
 
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Keyset pagination and filters of the /projects listing
+        Index("ix_projects_updated_at_id", "updated_at", "id"),
+        Index("ix_projects_status_updated_at_id", "status", "updated_at", "id"),
+        Index("ix_projects_priority_updated_at_id", "priority", "updated_at", "id"),
+        Index("ix_projects_deadline", "deadline"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -22,4 +30,17 @@ class Project(Base):
         default=func.now(),
         onupdate=func.now(),
     )
+    # Sanitized HTML rendered from the markdown fields at write time
+    description_html = Column(Text)
+    purpose_html = Column(Text)
+    desired_outcome_html = Column(Text)
+    markdown_version = Column(Integer)
     tasks = relationship("Task", back_populates="project")
+
+    MARKDOWN_FIELDS = ("description", "purpose", "desired_outcome")
+
+    def render_markdown(self):
+        render_markdown_fields(self, self.MARKDOWN_FIELDS)
+
+    def html(self, field):
+        return stored_html(self, field)
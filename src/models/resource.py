@@ -1,9 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, func
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from database.database import Base
+from utils.fingerprint import canonicalize_url, simhash
+
+# Canonicalizing can lengthen a URL (https, re-quoted query parameters)
+CANONICAL_URL_LENGTH = 1024
+
+
+def stored_canonical_url(url):
+    """Canonical URL to store for a resource URL; None if there's none or it doesn't fit"""
+    canonical = canonicalize_url(url) if url else None
+    if canonical is None or len(canonical) > CANONICAL_URL_LENGTH:
+        return None
+    return canonical
+
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # Task.resources loads
+        Index("ix_resources_task_id", "task_id"),
+        # Resources by canonical URL, whatever form the link was saved in
+        Index("ix_resources_canonical_url", "canonical_url"),
+    )
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -13,5 +32,20 @@ class Resource(Base):
     notes = Column(Text)
     added_at = Column(DateTime, default=func.now())
     is_consumed = Column(Boolean, default=False)
+    updated_at = Column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+    )
+
+    # Set by `fingerprint()` whenever url or notes are written. notes_simhash
+    # isn't indexed: near-duplicates are found by Hamming distance over a
+    # project's loaded resources, which a b-tree can't answer
+    canonical_url = Column(String(CANONICAL_URL_LENGTH))
+    notes_simhash = Column(BigInteger)
+
+    task = relationship("Task", back_populates="resources")
 
-    task = relationship("Task", back_populates="resources")
\ No newline at end of file
+    def fingerprint(self):
+        self.canonical_url = stored_canonical_url(self.url)
+        self.notes_simhash = simhash(self.notes) if self.notes else None
\ No newline at end of file
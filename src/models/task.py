@@ -1,12 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, func, ForeignKey
 from sqlalchemy.orm import relationship
 from database.database import Base
+from utils.markdown_helper import render_markdown_fields, stored_html
 
 metadata = Base.metadata
 
+# Spacing between consecutive sort_order keys, so a task can be moved between
+# two neighbours by updating only its own row
+SORT_GAP = 1024
+
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Project task lists, max(sort_order) on insert and reorder neighbours
+        Index("ix_tasks_project_id_sort_order", "project_id", "sort_order", "id"),
+        Index("ix_tasks_status", "status"),
+        Index("ix_tasks_due_date", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -23,6 +34,18 @@ class Task(Base):
         onupdate=func.now(),
     )
     due_date = Column(DateTime, nullable=True)
+    # Sanitized HTML rendered from the markdown fields at write time
+    description_html = Column(Text)
+    context_html = Column(Text)
+    markdown_version = Column(Integer)
 
     project = relationship("Project", back_populates="tasks")
-    resources = relationship("Resource", back_populates="task")
\ No newline at end of file
+    resources = relationship("Resource", back_populates="task")
+
+    MARKDOWN_FIELDS = ("description", "context")
+
+    def render_markdown(self):
+        render_markdown_fields(self, self.MARKDOWN_FIELDS)
+
+    def html(self, field):
+        return stored_html(self, field)
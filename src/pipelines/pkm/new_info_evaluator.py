@@ -2,6 +2,7 @@ from enum import Enum
 from pydantic import BaseModel, Field
 from services.llm_factory import LLMFactory
 from prompts.prompt_manager import PromptManager
+from services.prompt_cache import layout_messages
 from typing import List, Dict
 from database.database import SessionLocal
 from models.project import Project
@@ -70,10 +71,8 @@ class NewInfoEvaluatorPipeline:
 
         completion = self.llm.create_completion(
             response_model=NewInfoClassification,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input},
-            ],
+            # The projects list is the same across inputs, cache all of it
+            messages=layout_messages(system_prompt, "", user_input),
         )
 
         return completion
@@ -1,11 +1,31 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
 from enum import Enum
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field
 from services.llm_factory import LLMFactory
+from services.llm_router import LLMRouter
 from prompts.prompt_manager import PromptManager
 from database.database import SessionLocal
 from models.project import Project
 from sqlalchemy.orm import joinedload
 from models.task import Task
+from pipelines.pkm.project_context import ProjectContext, ProjectContextBuilder
+from config.retrieval_settings import get_retrieval_settings
+from services.prompt_cache import layout_messages
+from services.resource_index import get_resource_index
+from utils.fingerprint import (
+    TOKEN_PATTERN,
+    URL_PATTERN,
+    canonicalize_url,
+    extract_urls,
+    hamming_distance,
+    simhash,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class NewProjectInfoRelevance(str, Enum):
@@ -42,11 +62,60 @@ class NewInfoClassification(BaseModel):
     )
 
 
+class BatchEvaluationResult(BaseModel):
+    index: int = Field(description="Position of the input in the submitted batch.")
+    user_input: str
+    result: Optional[NewInfoClassification] = None
+    error: Optional[str] = None
+    retrieval_ms: Optional[float] = None
+
+
+@dataclass
+class Retrieval:
+    """Resources and tasks most similar to an input, and how long finding them took."""
+
+    resource_ids: set
+    task_ids: set
+    elapsed_ms: float
+
+
+@dataclass
+class DuplicateMatch:
+    """A project resource an input repeats, found without calling the LLM."""
+
+    resource: Any
+    # "url" when the input is only the resource's link, "notes" for its text
+    matched_on: str
+    # SimHash bits that differ; 0 for the same URL
+    distance: int
+
+
 class NewProjectInfoEvaluatorPipeline:
     """Pipeline for evaluating the relevance of new information to existing projects."""
 
-    def __init__(self, llm_provider: str = "deepseek"):
-        self.llm = LLMFactory(llm_provider)
+    def __init__(
+        self,
+        llm_provider: str = "deepseek",
+        context_token_budget: int = 6000,
+        retrieval_top_k: Optional[int] = None,
+        llm: Optional[Union[LLMFactory, LLMRouter]] = None,
+        duplicate_max_distance: Optional[int] = None,
+    ):
+        # Pass an LLMRouter to hedge and fail over across providers
+        self.llm = llm or LLMFactory(llm_provider)
+        self.context_builder = ProjectContextBuilder(
+            self.llm.count_text_tokens, token_budget=context_token_budget
+        )
+        self.retrieval_top_k = (
+            retrieval_top_k
+            if retrieval_top_k is not None
+            else get_retrieval_settings().top_k
+        )
+        self.index = get_resource_index() if self.retrieval_top_k > 0 else None
+        # None turns duplicate detection off
+        self.duplicate_max_distance = duplicate_max_distance
+        if duplicate_max_distance is None and get_retrieval_settings().duplicate_detection:
+            self.duplicate_max_distance = get_retrieval_settings().duplicate_max_distance
 
     def get_project(self, project_id: int):
         """Fetch a single project and its tasks (with resources) from the database by ID."""
@@ -64,28 +133,258 @@ class NewProjectInfoEvaluatorPipeline:
         finally:
             db.close()
 
+    def sync_index(self, project) -> None:
+        """Index whatever of the project the routes haven't indexed yet."""
+        if self.index is not None:
+            self.index.sync_project(project)
+
+    def retrieve(self, project, user_input: str) -> Optional[Retrieval]:
+        """Find the project's resources and tasks most similar to the input.
+
+        Returns None when retrieval is off, so every resource is considered.
+        """
+        if self.index is None:
+            return None
+        start = time.perf_counter()
+        hits = self.index.search(project.id, user_input, k=None)
+        resource_ids = [hit.id for hit in hits if hit.kind == "resource"]
+        task_ids = [hit.id for hit in hits if hit.kind == "task"]
+        return Retrieval(
+            resource_ids=set(resource_ids[: self.retrieval_top_k]),
+            task_ids=set(task_ids[: self.retrieval_top_k]),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    def find_duplicate(self, project, user_input: str) -> Optional[DuplicateMatch]:
+        """Find a resource of the project that the input merely repeats.
+
+        An input made only of links matches a resource with the same
+        canonical URL; any other input matches the resource whose notes'
+        SimHash is closest, within `duplicate_max_distance` bits.
+        """
+        if self.duplicate_max_distance is None:
+            return None
+        resources = [resource for task in project.tasks for resource in task.resources]
+        urls = {canonicalize_url(url) for url in extract_urls(user_input)} - {None}
+        if urls and not TOKEN_PATTERN.search(URL_PATTERN.sub(" ", user_input)):
+            for resource in resources:
+                # Rows not backfilled by `flask fingerprint-resources` are hashed here
+                canonical_url = resource.canonical_url or canonicalize_url(resource.url or "")
+                if canonical_url in urls:
+                    return DuplicateMatch(resource, "url", 0)
+            return None
+
+        fingerprint = simhash(user_input)
+        if fingerprint is None:
+            return None
+        best = None
+        for resource in resources:
+            notes_simhash = resource.notes_simhash
+            if notes_simhash is None and resource.notes:
+                notes_simhash = simhash(resource.notes)
+            if notes_simhash is None:
+                continue
+            distance = hamming_distance(fingerprint, notes_simhash)
+            if distance <= self.duplicate_max_distance and (best is None or distance < best.distance):
+                best = DuplicateMatch(resource, "notes", distance)
+        return best
+
+    @staticmethod
+    def classify_duplicate(match: DuplicateMatch) -> NewInfoClassification:
+        """The classification the LLM would give an input that repeats a resource."""
+        resource = match.resource
+        if match.matched_on == "url":
+            evidence = f"links to the same page as the resource '{resource.title}'"
+        elif match.distance == 0:
+            evidence = f"has the same text as the notes of the resource '{resource.title}'"
+        else:
+            evidence = (
+                f"is a near copy of the notes of the resource '{resource.title}' "
+                f"({match.distance} of 64 fingerprint bits differ)"
+            )
+        return NewInfoClassification(
+            reasoning=f"The new information {evidence}, which the project already tracks.",
+            relevance=NewProjectInfoRelevance.STRONG_RELEVANCE,
+            related_resources=[resource.title],
+            novelty_reasoning="It adds nothing the existing resource doesn't cover. Detected locally, without an LLM call.",
+            novelty=Novelty.redundant,
+            action_reasoning="The project already has this resource.",
+            action=NewProjectInfoAction.EXCLUDE,
+        )
+
+    def _duplicate_classification(
+        self, project, user_input: str
+    ) -> Optional[NewInfoClassification]:
+        match = self.find_duplicate(project, user_input)
+        if match is None:
+            return None
+        logger.info(
+            "Duplicate of resource %s (%s, distance %s): skipping the LLM call",
+            match.resource.id, match.matched_on, match.distance,
+        )
+        return self.classify_duplicate(match)
+
+    def build_context(self, project, retrieval: Optional[Retrieval] = None) -> ProjectContext:
+        """Fit the project's tasks and resources into the context token budget."""
+        if retrieval is None:
+            context = self.context_builder.build(project)
+        else:
+            context = self.context_builder.build(
+                project, resource_ids=retrieval.resource_ids, task_ids=retrieval.task_ids
+            )
+        logger.info("Project context: %s", context.summary())
+        return context
+
+    def build_system_prompt(
+        self, project, retrieval: Optional[Retrieval] = None
+    ) -> Tuple[str, str]:
+        """Render the system prompt as (cacheable prefix, per-call suffix)."""
+        return PromptManager.get_prompt_parts(
+            "evaluate_new_info_for_project",
+            project=project,
+            context=self.build_context(project, retrieval),
+        )
+
+    @staticmethod
+    def _messages(system_prompt: Tuple[str, str], user_input: str):
+        prefix, suffix = system_prompt
+        return layout_messages(prefix, suffix, user_input)
+
+    def _load_project(self, project_id: int):
+        project = self.get_project(project_id)
+        logger.info(
+            "Evaluating against project %s | Name: %s | Status: %s",
+            project.id, project.name, project.status,
+        )
+        return project
+
+    def _prepare_messages(self, project, user_input: str):
+        self.sync_index(project)
+        retrieval = self.retrieve(project, user_input)
+        if retrieval is not None:
+            logger.info("Retrieval: %.1f ms", retrieval.elapsed_ms)
+        return self._messages(self.build_system_prompt(project, retrieval), user_input)
+
     def evaluate_new_info(
         self,
         project_id: int,
         user_input: str,
     ) -> NewInfoClassification:
-        project = self.get_project(project_id)
-
-        # Display the project in a user-friendly format
-        project_str = f"ID: {project.id} | Name: {project.name} | Status: {project.status} | {project.description} | "
-        print(f"Project in the database:\n{project_str}")
-        print("--" * 50)
-
-        system_prompt = PromptManager.get_prompt(
-            "evaluate_new_info_for_project", project=project
-        )
+        project = self._load_project(project_id)
+        duplicate = self._duplicate_classification(project, user_input)
+        if duplicate is not None:
+            return duplicate
 
         completion = self.llm.create_completion(
             response_model=NewInfoClassification,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input},
-            ],
+            messages=self._prepare_messages(project, user_input),
         )
 
         return completion
+
+    def stream_new_info(
+        self,
+        project_id: int,
+        user_input: str,
+    ) -> Iterator[NewInfoClassification]:
+        """Like `evaluate_new_info`, but yield the classification as it's generated.
+
+        Fields are None until the model gets to them, in schema order, so
+        `relevance` shows up after the first reasoning and `action` last.
+        The last item yielded is complete; a duplicate is yielded once.
+        """
+        project = self._load_project(project_id)
+        duplicate = self._duplicate_classification(project, user_input)
+        if duplicate is not None:
+            yield duplicate
+            return
+
+        yield from self.llm.stream_completion(
+            response_model=NewInfoClassification,
+            messages=self._prepare_messages(project, user_input),
+        )
+
+    async def aevaluate_many(
+        self,
+        project_id: int,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+    ) -> List[BatchEvaluationResult]:
+        """Evaluate many inputs against one project concurrently.
+
+        The project is loaded and indexed once. Without retrieval the system
+        prompt is rendered once too; with it each input gets its own context
+        and the time spent retrieving is reported per item. Results come back
+        in input order; a failing item carries its error instead of failing
+        the batch.
+        """
+        results = [
+            result
+            async for result in self.aiter_evaluations(project_id, inputs, max_concurrency)
+        ]
+        return sorted(results, key=lambda result: result.index)
+
+    async def aiter_evaluations(
+        self,
+        project_id: int,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> AsyncIterator[BatchEvaluationResult]:
+        """Like `aevaluate_many`, but yield each result as soon as it's done.
+
+        Pass a `semaphore` to bound several batches, e.g. against different
+        projects, by one shared limit.
+        """
+        project = self.get_project(project_id)
+        self.sync_index(project)
+        shared_prompt = self.build_system_prompt(project) if self.index is None else None
+        semaphore = semaphore or asyncio.Semaphore(max_concurrency or self.llm.max_concurrency)
+
+        async def evaluate(index: int, user_input: str) -> BatchEvaluationResult:
+            duplicate = self._duplicate_classification(project, user_input)
+            if duplicate is not None:
+                return BatchEvaluationResult(index=index, user_input=user_input, result=duplicate)
+            async with semaphore:
+                retrieval_ms = None
+                try:
+                    system_prompt = shared_prompt
+                    if system_prompt is None:
+                        retrieval = await asyncio.to_thread(self.retrieve, project, user_input)
+                        retrieval_ms = retrieval.elapsed_ms
+                        system_prompt = self.build_system_prompt(project, retrieval)
+                    result = await self.llm.acreate_completion(
+                        response_model=NewInfoClassification,
+                        messages=self._messages(system_prompt, user_input),
+                    )
+                except Exception as e:
+                    return BatchEvaluationResult(
+                        index=index,
+                        user_input=user_input,
+                        error=f"{type(e).__name__}: {e}",
+                        retrieval_ms=retrieval_ms,
+                    )
+                return BatchEvaluationResult(
+                    index=index, user_input=user_input, result=result, retrieval_ms=retrieval_ms
+                )
+
+        tasks = [
+            asyncio.ensure_future(evaluate(index, user_input))
+            for index, user_input in enumerate(inputs)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer stopped early: don't leave calls running unobserved
+            for task in tasks:
+                task.cancel()
+
+    def evaluate_many(
+        self,
+        project_id: int,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+    ) -> List[BatchEvaluationResult]:
+        """Synchronous entry point for `aevaluate_many`."""
+        return asyncio.run(self.aevaluate_many(project_id, inputs, max_concurrency))
@@ -0,0 +1,232 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Set
+
+# Tokens spent on a tag skeleton (<task>, <name>, <status>, ...) around the text
+TASK_TAG_TOKENS = 40
+RESOURCE_TAG_TOKENS = 30
+PROJECT_TAG_TOKENS = 60
+
+STATUS_RANK = {"in progress": 0, "todo": 1, "done": 2}
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+@dataclass
+class ResourceContext:
+    resource: object
+    full: bool = False
+
+
+@dataclass
+class TaskContext:
+    task: object
+    full: bool = False
+    resources: List[ResourceContext] = field(default_factory=list)
+
+
+@dataclass
+class ProjectContext:
+    """The part of a project that fits the prompt's token budget.
+
+    Tasks keep the project's order; `full` tells whether an item's long text
+    (task description, resource notes) is included or only a stub.
+    """
+
+    project: object
+    tasks: List[TaskContext]
+    budget: int
+    used_tokens: int
+    # What rendering everything in full would have cost
+    full_tokens: int
+    omitted_tasks: int = 0
+    omitted_resources: int = 0
+    stubbed_items: int = 0
+    # Resources left out because retrieval didn't rank them in the top k
+    pruned_resources: int = 0
+
+    @property
+    def dropped_tokens(self) -> int:
+        return max(self.full_tokens - self.used_tokens, 0)
+
+    def summary(self) -> str:
+        return (
+            f"{self.used_tokens}/{self.budget} tokens used, {self.dropped_tokens} dropped "
+            f"({self.stubbed_items} stubbed, {self.omitted_tasks} task(s) and "
+            f"{self.omitted_resources} resource(s) omitted, "
+            f"{self.pruned_resources} pruned by retrieval)"
+        )
+
+
+@dataclass
+class _Item:
+    key: tuple
+    stub_tokens: int
+    full_tokens: int
+    task_index: int
+    resource: Optional[object] = None
+    included: bool = False
+    full: bool = False
+
+
+def _text(*values) -> str:
+    return "\n".join(str(value) for value in values if value)
+
+
+def _recency(*values: Optional[datetime]) -> float:
+    for value in values:
+        if value is not None:
+            return -value.timestamp()
+    return 0.0
+
+
+def _task_rank(task) -> tuple:
+    return (
+        STATUS_RANK.get((task.status or "").lower(), 1),
+        PRIORITY_RANK.get((task.priority or "").lower(), 1),
+    )
+
+
+class ProjectContextBuilder:
+    """Fits a project's tasks and resources into a token budget.
+
+    Items are ranked by task status (in progress, todo, done), task priority,
+    similarity to the input when retrieval ran, whether a resource was
+    consumed (the user's notes on it are what novelty is judged against) and
+    recency. Every item first gets a compact stub, using at most `stub_share`
+    of the budget left after the project header; the remaining budget then
+    buys full text for items in rank order. Items whose stub doesn't fit are
+    left out.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        token_budget: int = 6000,
+        stub_share: float = 0.5,
+    ):
+        self.count_tokens = count_tokens
+        self.token_budget = token_budget
+        self.stub_share = stub_share
+
+    def _items(self, tasks, resource_ids, task_ids) -> List[_Item]:
+        items = []
+        for index, task in enumerate(tasks):
+            # Tasks similar to the input come first within their rank
+            similar = 0 if task_ids is None or task.id in task_ids else 1
+            stub = TASK_TAG_TOKENS + self.count_tokens(
+                _text(task.name, task.status, task.priority, task.due_date)
+            )
+            items.append(
+                _Item(
+                    key=(
+                        *_task_rank(task),
+                        similar,
+                        0,
+                        _recency(task.updated_at, task.created_at),
+                    ),
+                    stub_tokens=stub,
+                    full_tokens=stub + self.count_tokens(_text(task.description)),
+                    task_index=index,
+                )
+            )
+            for resource in task.resources:
+                if resource_ids is not None and resource.id not in resource_ids:
+                    continue
+                stub = RESOURCE_TAG_TOKENS + self.count_tokens(
+                    _text(resource.title, resource.url, resource.type)
+                )
+                items.append(
+                    _Item(
+                        key=(
+                            *_task_rank(task),
+                            similar,
+                            0 if resource.is_consumed else 1,
+                            _recency(resource.updated_at, resource.added_at),
+                        ),
+                        stub_tokens=stub,
+                        full_tokens=stub + self.count_tokens(_text(resource.notes)),
+                        task_index=index,
+                        resource=resource,
+                    )
+                )
+        return items
+
+    def build(
+        self,
+        project,
+        resource_ids: Optional[Set[int]] = None,
+        task_ids: Optional[Set[int]] = None,
+    ) -> ProjectContext:
+        """Select what of the project goes into the prompt.
+
+        `resource_ids` restricts the resources considered (e.g. to the ones
+        retrieval found similar to the input); `task_ids` ranks those tasks
+        ahead of others of the same status and priority.
+        """
+        tasks = list(project.tasks)
+        header = PROJECT_TAG_TOKENS + self.count_tokens(
+            _text(
+                project.name,
+                project.description,
+                project.purpose,
+                project.desired_outcome,
+                project.created_at,
+                project.deadline,
+                project.status,
+                project.priority,
+            )
+        )
+        items = self._items(tasks, resource_ids, task_ids)
+        ranked = sorted(items, key=lambda item: item.key)
+        task_items = {item.task_index: item for item in items if item.resource is None}
+
+        used = header
+        stub_limit = used + max(self.token_budget - used, 0) * self.stub_share
+        for item in ranked:
+            if item.included:
+                continue
+            needed = item.stub_tokens
+            parent = task_items[item.task_index]
+            if item is not parent and not parent.included:
+                # A resource is only shown under its task
+                needed += parent.stub_tokens
+            if used + needed > stub_limit:
+                continue
+            used += needed
+            item.included = parent.included = True
+
+        for item in ranked:
+            if not item.included:
+                continue
+            extra = item.full_tokens - item.stub_tokens
+            if used + extra <= self.token_budget:
+                used += extra
+                item.full = True
+
+        task_contexts = {}
+        for item in items:
+            if not item.included:
+                continue
+            if item.resource is None:
+                task_contexts[item.task_index] = TaskContext(
+                    task=tasks[item.task_index], full=item.full
+                )
+            else:
+                task_contexts[item.task_index].resources.append(
+                    ResourceContext(resource=item.resource, full=item.full)
+                )
+
+        return ProjectContext(
+            project=project,
+            tasks=list(task_contexts.values()),
+            budget=self.token_budget,
+            used_tokens=used,
+            full_tokens=header + sum(item.full_tokens for item in items),
+            omitted_tasks=sum(1 for item in task_items.values() if not item.included),
+            omitted_resources=sum(
+                1 for item in items if item.resource is not None and not item.included
+            ),
+            stubbed_items=sum(1 for item in items if item.included and not item.full),
+            pruned_resources=sum(len(task.resources) for task in tasks)
+            - sum(1 for item in items if item.resource is not None),
+        )
@@ -1,10 +1,35 @@
+import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 import frontmatter
-from jinja2 import Environment, FileSystemLoader, StrictUndefined, TemplateError, meta
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, TemplateError, meta
+
+# Put in a template to end the part that stays the same across calls, so
+# providers can cache it (see get_prompt_parts)
+CACHE_BREAKPOINT = "<!-- cache-breakpoint -->"
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A parsed template file: frontmatter, compiled body and declared variables."""
+
+    name: str
+    path: str
+    mtime_ns: int
+    template: Template
+    metadata: dict
+    variables: frozenset
 
 
 class PromptManager:
     _env = None
+    # Compiled templates by name, invalidated when the file's mtime changes
+    _cache = {}
+    _lock = threading.Lock()
+    # Stat template files on every lookup to pick up edits; turn off once preloaded
+    # in deployments where templates never change at runtime
+    auto_reload = True
 
     @classmethod
     def _get_env(cls, templates_dir="prompts/templates"):
@@ -16,33 +41,86 @@ class PromptManager:
             )
         return cls._env
 
-    @staticmethod
-    def get_prompt(template, **kwargs):
-        env = PromptManager._get_env()
-        template_path = f"{template}.j2"
-        with open(env.loader.get_source(env, template_path)[1]) as file:
-            post = frontmatter.load(file)
+    @classmethod
+    def _compile(cls, template):
+        env = cls._get_env()
+        source, path, _ = env.loader.get_source(env, f"{template}.j2")
+        mtime_ns = os.stat(path).st_mtime_ns
+        post = frontmatter.loads(source)
+        return CompiledPrompt(
+            name=template,
+            path=path,
+            mtime_ns=mtime_ns,
+            template=env.from_string(post.content),
+            metadata=post.metadata,
+            variables=frozenset(meta.find_undeclared_variables(env.parse(post.content))),
+        )
+
+    @classmethod
+    def get_compiled(cls, template):
+        """Return the compiled template, compiling it on first use or after an edit."""
+        compiled = cls._cache.get(template)
+        if compiled is not None:
+            if not cls.auto_reload:
+                return compiled
+            try:
+                if os.stat(compiled.path).st_mtime_ns == compiled.mtime_ns:
+                    return compiled
+            except FileNotFoundError:
+                pass
+        with cls._lock:
+            compiled = cls._compile(template)
+            cls._cache[template] = compiled
+        return compiled
+
+    @classmethod
+    def preload(cls):
+        """Compile every template up front and return the manifest."""
+        templates_dir = Path(cls._get_env().loader.searchpath[0])
+        for path in sorted(templates_dir.glob("*.j2")):
+            cls.get_compiled(path.stem)
+        return cls.manifest()
 
-        template = env.from_string(post.content)
+    @classmethod
+    def manifest(cls):
+        """Declared variables of every compiled template, by name."""
+        return {name: sorted(compiled.variables) for name, compiled in cls._cache.items()}
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._cache.clear()
+
+    @staticmethod
+    def _render(template, **kwargs):
+        compiled = PromptManager.get_compiled(template)
         try:
-            return template.render(**kwargs)
+            return compiled.template.render(**kwargs)
         except TemplateError as e:
             raise ValueError(f"Error rendering template: {str(e)}")
 
     @staticmethod
-    def get_template_info(template):
-        env = PromptManager._get_env()
-        template_path = f"{template}.j2"
-        with open(env.loader.get_source(env, template_path)[1]) as file:
-            post = frontmatter.load(file)
+    def get_prompt(template, **kwargs):
+        return PromptManager._render(template, **kwargs).replace(CACHE_BREAKPOINT, "")
+
+    @staticmethod
+    def get_prompt_parts(template, **kwargs):
+        """Render a template split at its cache breakpoint into (prefix, suffix).
 
-        ast = env.parse(post.content)
-        variables = meta.find_undeclared_variables(ast)
+        Templates without a breakpoint are all prefix.
+        """
+        prefix, _, suffix = PromptManager._render(template, **kwargs).partition(
+            CACHE_BREAKPOINT
+        )
+        return prefix, suffix
 
+    @staticmethod
+    def get_template_info(template):
+        compiled = PromptManager.get_compiled(template)
         return {
             "name": template,
-            "description": post.metadata.get("description", "No description provided"),
-            "author": post.metadata.get("author", "Unknown"),
-            "variables": list(variables),
-            "frontmatter": post.metadata,
+            "description": compiled.metadata.get("description", "No description provided"),
+            "author": compiled.metadata.get("author", "Unknown"),
+            "variables": list(compiled.variables),
+            "frontmatter": compiled.metadata,
         }
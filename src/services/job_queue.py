@@ -0,0 +1,242 @@
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update
+
+from database.database import SessionLocal
+from models.evaluation_job import FAILED, QUEUED, RUNNING, SUCCEEDED, EvaluationJob
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    # Naive UTC, like the DateTime columns it's compared with
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_evaluation(db, project_id: int, user_input: str) -> EvaluationJob:
+    """Queue a new-info evaluation and commit it, so a worker can pick it up."""
+    job = EvaluationJob(project_id=project_id, user_input=user_input, status=QUEUED, attempts=0)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def claim_next_job(db, worker_id: str) -> Optional[EvaluationJob]:
+    """Mark the oldest queued job as running by this worker and return it.
+
+    On PostgreSQL rows locked by another worker's claim are skipped rather
+    than waited on. The status check in the UPDATE makes the claim safe
+    where row locks aren't available (SQLite): if another worker got there
+    first no row changes and the next job is tried.
+    """
+    while True:
+        job_id = db.execute(
+            select(EvaluationJob.id)
+            .where(EvaluationJob.status == QUEUED)
+            .order_by(EvaluationJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+        now = _now()
+        claimed = db.execute(
+            update(EvaluationJob)
+            .where(EvaluationJob.id == job_id, EvaluationJob.status == QUEUED)
+            .values(
+                status=RUNNING,
+                worker_id=worker_id,
+                attempts=EvaluationJob.attempts + 1,
+                started_at=now,
+                heartbeat_at=now,
+                error=None,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(EvaluationJob, job_id)
+
+
+def heartbeat(db, job_ids: List[int]) -> None:
+    """Record that this worker is still running these jobs."""
+    if not job_ids:
+        return
+    db.execute(
+        update(EvaluationJob)
+        .where(EvaluationJob.id.in_(job_ids), EvaluationJob.status == RUNNING)
+        .values(heartbeat_at=_now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def complete_job(db, job: EvaluationJob, result: Dict[str, Any]) -> None:
+    job.status = SUCCEEDED
+    job.result = result
+    job.error = None
+    job.finished_at = _now()
+    db.commit()
+
+
+def fail_job(db, job: EvaluationJob, error: str, max_attempts: int) -> None:
+    """Requeue the job for another attempt, or mark it failed once it's out of them."""
+    job.error = error
+    if job.attempts < max_attempts:
+        job.status = QUEUED
+        job.worker_id = None
+    else:
+        job.status = FAILED
+        job.finished_at = _now()
+    db.commit()
+
+
+def requeue_stale_jobs(db, stale_after: float, max_attempts: int) -> int:
+    """Give running jobs whose worker stopped heartbeating back to the queue.
+
+    Returns:
+        int: Number of jobs requeued or, when out of attempts, failed
+    """
+    cutoff = _now() - timedelta(seconds=stale_after)
+    stale = (
+        db.query(EvaluationJob)
+        .filter(EvaluationJob.status == RUNNING, EvaluationJob.heartbeat_at < cutoff)
+        .all()
+    )
+    for job in stale:
+        logger.warning("Evaluation job %d lost its worker %s", job.id, job.worker_id)
+        fail_job(db, job, f"Worker {job.worker_id} stopped responding", max_attempts)
+    return len(stale)
+
+
+def job_status(job: EvaluationJob) -> Dict[str, Any]:
+    """Serialize a job for the API, without its result."""
+    return {
+        "id": job.id,
+        "project_id": job.project_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def default_pipeline(llm_provider: str = "deepseek"):
+    from pipelines.pkm.new_info_for_project_evaluator import NewProjectInfoEvaluatorPipeline
+    from services.llm_factory import LLMFactory
+
+    # Queued evaluations wait behind interactive calls for rate limit quota
+    return NewProjectInfoEvaluatorPipeline(llm=LLMFactory(llm_provider, lane="batch"))
+
+
+class EvaluationWorker:
+    """Run queued evaluations on a fixed number of threads.
+
+    Each thread claims a job, evaluates it with the shared pipeline and
+    stores the result, using its own database session. The calling thread
+    heartbeats the running jobs and requeues those of workers that died.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        stale_after: float = 300.0,
+        max_attempts: int = 3,
+        pipeline_factory: Callable[[], Any] = default_pipeline,
+        session_factory: Callable[[], Any] = SessionLocal,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.pipeline_factory = pipeline_factory
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self._pipeline = None
+        self._running: set = set()
+        self._lock = threading.Lock()
+
+    @property
+    def pipeline(self):
+        with self._lock:
+            if self._pipeline is None:
+                self._pipeline = self.pipeline_factory()
+        return self._pipeline
+
+    def stop(self, *_) -> None:
+        """Finish the jobs in progress and exit; usable as a signal handler."""
+        self.stop_event.set()
+
+    def run_one(self, db) -> bool:
+        """Claim and run one job. Returns False when the queue was empty."""
+        job = claim_next_job(db, self.worker_id)
+        if job is None:
+            return False
+        with self._lock:
+            self._running.add(job.id)
+        try:
+            result = self.pipeline.evaluate_new_info(job.project_id, job.user_input)
+        except Exception:
+            # The details stay in the worker's log: the job's error is shown to clients
+            logger.exception("Evaluation job %d failed", job.id)
+            db.rollback()
+            fail_job(db, job, "Evaluation failed", self.max_attempts)
+        else:
+            complete_job(db, job, result.model_dump(mode="json"))
+        finally:
+            with self._lock:
+                self._running.discard(job.id)
+                self.processed += 1
+        return True
+
+    def _work(self) -> None:
+        while not self.stop_event.is_set():
+            db = self.session_factory()
+            try:
+                ran = self.run_one(db)
+            except Exception:
+                # e.g. the database is unreachable; back off and try again
+                logger.exception("Evaluation worker could not claim a job")
+                ran = False
+            finally:
+                db.close()
+            if not ran:
+                self.stop_event.wait(self.poll_interval)
+
+    def _maintain(self) -> None:
+        db = self.session_factory()
+        try:
+            with self._lock:
+                running = list(self._running)
+            heartbeat(db, running)
+            requeue_stale_jobs(db, self.stale_after, self.max_attempts)
+        except Exception:
+            logger.exception("Evaluation worker heartbeat failed")
+        finally:
+            db.close()
+
+    def run(self) -> None:
+        """Process jobs until `stop` is called."""
+        threads = [
+            threading.Thread(target=self._work, name=f"evaluation-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Heartbeat well within the stale timeout
+        interval = max(self.poll_interval, min(self.stale_after / 3, 30.0))
+        while not self.stop_event.wait(interval):
+            self._maintain()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+
+class LLMResponseCache:
+    """Persistent, content-addressed cache of structured LLM responses.
+
+    Entries live in a local SQLite file keyed by a hash of everything that
+    determines the response (provider, model, messages, sampling params and
+    the response model's JSON schema). Entries expire after `ttl_seconds`
+    and the least recently used ones are evicted once the stored payloads
+    exceed `max_bytes`. Identical requests issued while one is already in
+    flight wait for it instead of calling the provider again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(provider: str, params: Dict[str, Any]) -> str:
+        """Hash the provider and completion params into a cache key."""
+        response_model = params.get("response_model")
+        material = {
+            "provider": provider,
+            "schema": response_model.model_json_schema() if response_model else None,
+            **{k: v for k, v in params.items() if k not in ("response_model", "max_retries", "timeout")},
+        }
+        canonical = json.dumps(material, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, response_model: Type[BaseModel]) -> Optional[BaseModel]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return response_model.model_validate_json(payload)
+
+    def put(self, key: str, value: BaseModel) -> None:
+        payload = value.model_dump_json()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the payloads fit again
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def get_or_compute(
+        self,
+        key: str,
+        response_model: Type[BaseModel],
+        compute: Callable[[], BaseModel],
+    ) -> BaseModel:
+        """Return the cached response, or compute it once across threads."""
+        cached = self.get(key, response_model)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.shared += 1
+            return future.result().model_copy(deep=True)
+
+        try:
+            # Another leader may have finished between our lookup and taking the lock
+            result = self.get(key, response_model)
+            if result is None:
+                self.misses += 1
+                result = compute()
+                self.put(key, result)
+            else:
+                self.hits += 1
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        response_model: Type[BaseModel],
+        compute: Callable[[], Awaitable[BaseModel]],
+    ) -> BaseModel:
+        """Async counterpart of `get_or_compute`, deduplicating within an event loop."""
+        cached = self.get(key, response_model)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        inflight = self._ainflight.setdefault(asyncio.get_running_loop(), {})
+        future = inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            return (await asyncio.shield(future)).model_copy(deep=True)
+
+        future = inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            self.misses += 1
+            result = await compute()
+            self.put(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            inflight.pop(key, None)
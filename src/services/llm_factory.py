@@ -1,52 +1,155 @@
-from typing import Any, Dict, List, Literal, Type
+import asyncio
+import logging
+import weakref
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Literal, Optional, Type, get_args, get_origin
 
 import instructor
-import tiktoken
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
 from langfuse.decorators import observe
-from langfuse.openai import OpenAI
-from pydantic import BaseModel
-from rich.console import Console
-from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.table import Table
-from ..config.llm_settings import get_settings
+from langfuse.openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, create_model, model_validator
+from config.llm_settings import get_settings
+from services.llm_cache import LLMResponseCache
+from services.prompt_cache import PromptCacheUsage, format_messages
+from services.rate_limiter import RateLimiter
+from services.token_counter import TokenCount, TokenCounter, render_token_count
 
 
 load_dotenv()  # take environment variables
 
+logger = logging.getLogger(__name__)
+
 type LLMProviders = Literal["openai", "anthropic", "deepseek", "github_models", "llama"]
 
 
+_shared_caches: Dict[str, LLMResponseCache] = {}
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache when LLM_CACHE_ENABLED is set."""
+    cache_settings = get_settings().cache
+    if not cache_settings.enabled:
+        return None
+    if cache_settings.path not in _shared_caches:
+        _shared_caches[cache_settings.path] = LLMResponseCache(
+            cache_settings.path,
+            ttl_seconds=cache_settings.ttl_seconds,
+            max_bytes=cache_settings.max_bytes,
+        )
+    return _shared_caches[cache_settings.path]
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the process-wide rate limiter when LLM_RATE_LIMITS sets any limit."""
+    limit_settings = get_settings().rate_limits
+    if not limit_settings.limits:
+        return None
+    if limit_settings.path not in _shared_limiters:
+        _shared_limiters[limit_settings.path] = RateLimiter(
+            limit_settings.path, limit_settings.limits
+        )
+    return _shared_limiters[limit_settings.path]
+
+
+@lru_cache(maxsize=None)
+def _streaming_model(response_model: Type[BaseModel]) -> Type[BaseModel]:
+    """Subclass of `response_model` whose partials tolerate half-written choices.
+
+    instructor streams strings as they grow, so an enum or Literal field
+    briefly holds a prefix like "weak_rel" that fails validation. Such
+    values are left out until they're complete. (instructor's
+    PartialLiteralMixin would instead hold back every string until it's
+    finished, the long reasoning fields included.)
+    """
+    choices = {}
+    for name, field in response_model.model_fields.items():
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            if isinstance(candidate, type) and issubclass(candidate, Enum):
+                choices[name] = {member.value for member in candidate}
+            elif get_origin(candidate) is Literal:
+                choices[name] = set(get_args(candidate))
+    if not choices:
+        return response_model
+
+    def drop_unfinished_choices(cls, data):
+        if not isinstance(data, dict):
+            return data
+        return {
+            key: value
+            for key, value in data.items()
+            if not (key in choices and isinstance(value, str) and value not in choices[key])
+        }
+
+    streaming = create_model(
+        response_model.__name__,
+        __base__=response_model,
+        __module__=response_model.__module__,
+        __validators__={
+            "drop_unfinished_choices": model_validator(mode="before")(
+                classmethod(drop_unfinished_choices)
+            )
+        },
+    )
+    # instructor describes the tool with the docstring; keep the prompt unchanged
+    streaming.__doc__ = response_model.__doc__
+    return streaming
+
+
 class LLMFactory:
-    def __init__(self, provider: LLMProviders) -> None:
+    def __init__(
+        self,
+        provider: LLMProviders,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[LLMResponseCache] = None,
+        lane: Optional[str] = None,
+    ) -> None:
         self.provider: LLMProviders = provider
         self.settings = getattr(get_settings(), provider)
         self.client = self._initialize_client()
+        self.cache = cache if cache is not None else get_response_cache()
+        token_settings = get_settings().tokens
+        self.token_counter = TokenCounter(
+            mode=token_settings.mode, tokenizer_dir=token_settings.tokenizer_dir
+        )
+        self.max_concurrency = max_concurrency or self.settings.max_concurrency
+        # Input tokens served from the provider's prompt cache
+        self.prompt_cache_usage = PromptCacheUsage()
+        # Requests and tokens per minute, shared with other processes
+        self.rate_limiter = get_rate_limiter()
+        self.lane = lane or get_settings().rate_limits.default_lane
+        # Async clients and semaphores are bound to the event loop that uses them
+        self._async_state: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
-    def _initialize_client(self) -> Any:
+    def _initialize_client(self, use_async: bool = False) -> Any:
+        openai_client = AsyncOpenAI if use_async else OpenAI
+        anthropic_client = AsyncAnthropic if use_async else Anthropic
         client_initializers = {
             "openai": lambda settings: instructor.from_openai(
-                OpenAI(api_key=settings.api_key)
+                openai_client(api_key=settings.api_key)
             ),
             "github_models": lambda settings: instructor.from_openai(
-                OpenAI(
+                openai_client(
                     api_key=settings.api_key,
                     base_url=settings.base_url,
                 )
             ),
             "anthropic": lambda settings: instructor.from_anthropic(
-                Anthropic(api_key=settings.api_key)
+                anthropic_client(api_key=settings.api_key)
             ),
             "deepseek": lambda settings: instructor.from_openai(
-                OpenAI(
+                openai_client(
                     api_key=settings.api_key,
                     base_url=settings.base_url,
                 )
             ),
             "llama": lambda settings: instructor.from_openai(
-                OpenAI(base_url=settings.base_url, api_key=settings.api_key),
+                openai_client(base_url=settings.base_url, api_key=settings.api_key),
                 mode=instructor.Mode.JSON,
             ),
         }
@@ -56,62 +159,185 @@ class LLMFactory:
             return initializer(self.settings)
         raise ValueError(f"Unsupported LLM provider: {self.provider}")
 
-    @observe()
-    def create_completion(
-        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
-    ) -> Any:
-        # Log token count before making the LLM call
-        self._log_token_count(messages)
+    def _async_client(self) -> tuple[Any, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        state = self._async_state.get(loop)
+        if state is None:
+            state = (
+                self._initialize_client(use_async=True),
+                asyncio.Semaphore(self.max_concurrency),
+            )
+            self._async_state[loop] = state
+        return state
+
+    def _completion_params(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs
+    ) -> Dict[str, Any]:
         model = kwargs.get("model", self.settings.default_model)
-        completion_params = {
+        params = {
             "model": model,
             "temperature": kwargs.get("temperature", self.settings.temperature),
             "max_retries": kwargs.get("max_retries", self.settings.max_retries),
             "max_tokens": kwargs.get("max_tokens", self.settings.max_tokens),
             "response_model": response_model,
-            "messages": messages,
+            "messages": format_messages(messages, self.provider),
         }
-        return self.client.chat.completions.create(**completion_params)
-
-    def _log_token_count(self, messages: List[Dict[str, str]]):
-        console = Console()
-        try:
-            enc = tiktoken.encoding_for_model("gpt-4-1106-preview")
-            tokens_per_message = 3
-            num_tokens = 0
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("Role", style="cyan", no_wrap=True)
-            table.add_column("Content", style="white")
-            table.add_column("Tokens", style="green")
-            for message in messages:
-                role = message.get("role", "-")
-                content = message.get("content", str(message))
-                token_count = tokens_per_message
-                for key, value in message.items():
-                    token_count += len(enc.encode(value))
-                num_tokens += token_count
-                if role == "system":
-                    # Syntax highlight HTML for system prompt
-                    syntax = Syntax(content, "html", theme="dracula", word_wrap=True)
-                    table.add_row(role, syntax, str(token_count))
-                elif role == "user":
-                    preview = content[:80] + ("..." if len(content) > 80 else "")
-                    table.add_row(role, preview, str(token_count))
-            num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
-            panel = Panel(
-                table,
-                title=f"[tiktoken] Estimated input tokens: [bold yellow]{num_tokens}[/]",
-                border_style="bright_blue",
-                padding=(1, 2),
+        if kwargs.get("timeout") is not None:
+            # Per-request HTTP timeout in seconds, e.g. what's left of a deadline
+            params["timeout"] = kwargs["timeout"]
+        return params
+
+    def _cache_key(self, completion_params: Dict[str, Any], use_cache: bool) -> Optional[str]:
+        """Return the cache key for these params, or None when not cacheable."""
+        if self.cache is None or not use_cache:
+            return None
+        # Raw (unstructured) completions can't be rebuilt from the cache
+        if completion_params["response_model"] is None:
+            return None
+        if get_settings().cache.deterministic_only and completion_params["temperature"] != 0:
+            return None
+        return self.cache.make_key(self.provider, completion_params)
+
+    @observe()
+    def create_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs
+    ) -> Any:
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        cache_key = self._cache_key(completion_params, kwargs.get("use_cache", True))
+
+        def complete():
+            # Count input tokens before making the LLM call
+            count = self._record_token_count(messages, completion_params["model"])
+            reserved = self._reserved_tokens(count, completion_params)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self.provider, reserved, kwargs.get("lane", self.lane))
+            if response_model is None:
+                result = response = self.client.chat.completions.create(**completion_params)
+            else:
+                result, response = self.client.chat.completions.create_with_completion(
+                    **completion_params
+                )
+            self._record_usage(response, completion_params["model"], reserved)
+            return result
+
+        if cache_key is None:
+            return complete()
+        return self.cache.get_or_compute(cache_key, response_model, complete)
+
+    @observe()
+    async def acreate_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs
+    ) -> Any:
+        """Async counterpart of `create_completion`.
+
+        At most `max_concurrency` calls per event loop are in flight at once;
+        the rest wait on the semaphore.
+        """
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        cache_key = self._cache_key(completion_params, kwargs.get("use_cache", True))
+
+        async def complete():
+            count = self._record_token_count(messages, completion_params["model"])
+            reserved = self._reserved_tokens(count, completion_params)
+            if self.rate_limiter is not None:
+                # Wait for quota before taking a concurrency slot
+                await self.rate_limiter.aacquire(
+                    self.provider, reserved, kwargs.get("lane", self.lane)
+                )
+            client, semaphore = self._async_client()
+            async with semaphore:
+                if response_model is None:
+                    result = response = await client.chat.completions.create(
+                        **completion_params
+                    )
+                else:
+                    result, response = await client.chat.completions.create_with_completion(
+                        **completion_params
+                    )
+            self._record_usage(response, completion_params["model"], reserved)
+            return result
+
+        if cache_key is None:
+            return await complete()
+        return await self.cache.aget_or_compute(cache_key, response_model, complete)
+
+    @observe()
+    def stream_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs
+    ) -> Iterator[BaseModel]:
+        """Yield `response_model` instances that fill in as the answer streams.
+
+        Fields are None until the model has generated them; the last item is
+        the complete answer. A cached answer is yielded once, as it is.
+        """
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        cache_key = self._cache_key(completion_params, kwargs.get("use_cache", True))
+        if cache_key is not None:
+            cached = self.cache.get(cache_key, response_model)
+            if cached is not None:
+                yield cached
+                return
+
+        count = self._record_token_count(messages, completion_params["model"])
+        if self.rate_limiter is not None:
+            # Streams don't report usage, so the reservation stands as the cost
+            self.rate_limiter.acquire(
+                self.provider,
+                self._reserved_tokens(count, completion_params),
+                kwargs.get("lane", self.lane),
             )
-            console.print(panel)
-            return num_tokens
-        except Exception as e:
-            console.print(
-                Panel(
-                    f"Error counting tokens: {e}",
-                    title="[red]Token Count Error",
-                    border_style="red",
+        partial = None
+        for partial in self.client.chat.completions.create_partial(
+            **{**completion_params, "response_model": _streaming_model(response_model)}
+        ):
+            yield partial
+        if cache_key is not None and partial is not None:
+            self.cache.put(cache_key, response_model.model_validate(partial.model_dump()))
+
+    def count_tokens(
+        self, messages: List[Dict[str, Any]], model: Optional[str] = None
+    ) -> Optional[TokenCount]:
+        """Return the structured input token count of a request."""
+        return self.token_counter.count_messages(
+            messages, self.provider, model or self.settings.default_model
+        )
+
+    def count_text_tokens(self, text: str, model: Optional[str] = None) -> int:
+        """Count the tokens of a prompt fragment, e.g. to budget context."""
+        return self.token_counter.count_text(
+            text, self.provider, model or self.settings.default_model
+        )
+
+    @staticmethod
+    def _reserved_tokens(count: Optional[TokenCount], completion_params: Dict[str, Any]) -> int:
+        """Tokens to take from the rate limit before a call: input plus the output cap."""
+        return (count.total if count is not None else 0) + (completion_params["max_tokens"] or 0)
+
+    def _record_usage(self, response: Any, model: str, reserved: int = 0) -> None:
+        usage = self.prompt_cache_usage.record(response)
+        if usage is not None:
+            if self.rate_limiter is not None:
+                self.rate_limiter.settle(
+                    self.provider, reserved, usage["input_tokens"] + usage["output_tokens"]
                 )
+            logger.debug(
+                "%s/%s prompt cache: %d of %d input tokens cached, %d written",
+                self.provider,
+                model,
+                usage["cached_tokens"],
+                usage["input_tokens"],
+                usage["cache_write_tokens"],
             )
+
+    def _record_token_count(
+        self, messages: List[Dict[str, Any]], model: str
+    ) -> Optional[TokenCount]:
+        count = self.count_tokens(messages, model)
+        if count is None:
             return None
+        logger.debug(
+            "%s/%s input tokens: %d (%s)", self.provider, model, count.total, count.method
+        )
+        if get_settings().tokens.debug_render:
+            render_token_count(messages, count)
+        return count
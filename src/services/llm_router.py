@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+from config.llm_settings import get_settings
+from services.llm_factory import LLMFactory
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """No provider answered before the call's deadline."""
+
+
+class AllProvidersFailed(RuntimeError):
+    """Every provider failed; `errors` holds (provider, exception) pairs."""
+
+    def __init__(self, errors: List[tuple]):
+        self.errors = errors
+        summary = "; ".join(f"{provider}: {type(e).__name__}: {e}" for provider, e in errors)
+        super().__init__(f"All LLM providers failed ({summary})")
+
+
+def percentile(samples: Sequence[float], q: float) -> Optional[float]:
+    """The q-th percentile of `samples`, or None when there are none.
+
+    Interpolates linearly between the closest ranks, like numpy's default.
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LatencyStats:
+    """Latencies of a provider's successful calls over a sliding window, plus counters."""
+
+    def __init__(self, window: int = 1000):
+        self.samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        return percentile(self.samples, q)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "samples": len(self.samples),
+            **{
+                f"p{q}_ms": None if value is None else round(value * 1000, 1)
+                for q in (50, 95, 99)
+                for value in (self.percentile(q),)
+            },
+        }
+
+
+class LLMRouter:
+    """Structured completions over an ordered list of providers.
+
+    The first provider gets every call. If it hasn't answered after its
+    `hedge_percentile` latency, the same request is also sent to the next
+    provider and the first answer wins; the other request is cancelled. A
+    provider that errors fails over to the next one right away. The whole
+    call, hedges and failovers included, has to finish within its deadline,
+    and each attempt's HTTP timeout is what's left of it.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Sequence[str]] = None,
+        factories: Optional[Sequence[LLMFactory]] = None,
+        deadline_seconds: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_delay_seconds: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+    ):
+        settings = get_settings().routing
+        if factories is None:
+            factories = [LLMFactory(name) for name in providers or settings.provider_list]
+        if not factories:
+            raise ValueError("LLMRouter needs at least one provider.")
+        self.factories = list(factories)
+        self.deadline_seconds = deadline_seconds or settings.deadline_seconds
+        self.hedge_percentile = hedge_percentile or settings.hedge_percentile
+        self.hedge_delay_seconds = (
+            hedge_delay_seconds if hedge_delay_seconds is not None else settings.hedge_delay_seconds
+        )
+        self.hedge_min_samples = (
+            hedge_min_samples if hedge_min_samples is not None else settings.hedge_min_samples
+        )
+        self.latency = {factory.provider: LatencyStats() for factory in self.factories}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.deadlines_exceeded = 0
+
+    @property
+    def primary(self) -> LLMFactory:
+        return self.factories[0]
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.primary.max_concurrency
+
+    def count_tokens(self, messages, model=None):
+        return self.primary.count_tokens(messages, model)
+
+    def count_text_tokens(self, text: str, model: Optional[str] = None) -> int:
+        return self.primary.count_text_tokens(text, model)
+
+    def hedge_delay(self, factory: LLMFactory) -> float:
+        """Seconds to wait on a provider before hedging to the next one."""
+        stats = self.latency[factory.provider]
+        if len(stats.samples) < self.hedge_min_samples:
+            return self.hedge_delay_seconds
+        return stats.percentile(self.hedge_percentile)
+
+    async def _attempt(self, factory: LLMFactory, response_model, messages, timeout, kwargs):
+        stats = self.latency[factory.provider]
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            result = await factory.acreate_completion(
+                response_model=response_model, messages=messages, timeout=timeout, **kwargs
+            )
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.record(time.perf_counter() - start)
+        return result
+
+    def _deadline_exceeded(self, seconds: float) -> DeadlineExceeded:
+        self.deadlines_exceeded += 1
+        return DeadlineExceeded(f"No LLM answer within {seconds:.1f}s")
+
+    async def acreate_completion(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """Complete with hedging and failover; raises DeadlineExceeded or AllProvidersFailed."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline_at = start + (deadline or self.deadline_seconds)
+        self.requests += 1
+
+        remaining_factories = list(self.factories)
+        running: Dict[asyncio.Task, LLMFactory] = {}
+        errors: List[tuple] = []
+        hedge = None
+
+        def launch() -> LLMFactory:
+            factory = remaining_factories.pop(0)
+            timeout = max(deadline_at - loop.time(), 0.001)
+            task = asyncio.ensure_future(
+                self._attempt(factory, response_model, messages, timeout, kwargs)
+            )
+            running[task] = factory
+            return factory
+
+        first = launch()
+        # At most one hedge per call; failovers replace failed attempts instead
+        hedge_at = loop.time() + self.hedge_delay(first) if remaining_factories else None
+        try:
+            while running:
+                now = loop.time()
+                if now >= deadline_at:
+                    raise self._deadline_exceeded(deadline_at - start)
+                wake_at = deadline_at if hedge_at is None else min(deadline_at, hedge_at)
+                done, _ = await asyncio.wait(
+                    running, timeout=wake_at - now, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    factory = running.pop(task)
+                    if task.exception() is None:
+                        if factory is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append((factory.provider, task.exception()))
+                    logger.warning(
+                        "LLM provider %s failed: %s", factory.provider, task.exception()
+                    )
+                    if remaining_factories:
+                        self.failovers += 1
+                        replacement = launch()
+                        if hedge is None and remaining_factories:
+                            hedge_at = loop.time() + self.hedge_delay(replacement)
+                    if not remaining_factories:
+                        hedge_at = None
+
+                if not done and hedge_at is not None and loop.time() >= hedge_at:
+                    # The current provider is slower than usual: race the next one
+                    hedge_at = None
+                    self.hedges += 1
+                    hedge = launch()
+            if loop.time() >= deadline_at:
+                # The attempts ran out of time on their own HTTP timeouts
+                raise self._deadline_exceeded(deadline_at - start)
+            raise AllProvidersFailed(errors)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def create_completion(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """Synchronous entry point for `acreate_completion`."""
+        return asyncio.run(
+            self.acreate_completion(response_model, messages, deadline=deadline, **kwargs)
+        )
+
+    def stream_completion(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[Dict[str, Any]],
+        **kwargs,
+    ) -> Iterator[BaseModel]:
+        """Stream partial results from the first provider that starts answering.
+
+        Streams aren't hedged. A provider that fails before its first partial
+        fails over to the next; once partials have been yielded, an error is
+        raised as it is.
+        """
+        self.requests += 1
+        kwargs.setdefault("timeout", self.deadline_seconds)
+        errors: List[tuple] = []
+        for position, factory in enumerate(self.factories):
+            stats = self.latency[factory.provider]
+            stats.calls += 1
+            started = False
+            try:
+                for partial in factory.stream_completion(response_model, messages, **kwargs):
+                    started = True
+                    yield partial
+                return
+            except Exception as e:
+                stats.errors += 1
+                if started:
+                    raise
+                errors.append((factory.provider, e))
+                logger.warning("LLM provider %s failed: %s", factory.provider, e)
+                if position + 1 < len(self.factories):
+                    self.failovers += 1
+        raise AllProvidersFailed(errors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "providers": {
+                provider: stats.as_dict() for provider, stats in self.latency.items()
+            },
+        }
@@ -0,0 +1,105 @@
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+# Anthropic caches everything up to and including a block marked like this
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def layout_messages(prefix: str, suffix: str, user_input: str) -> List[Dict[str, Any]]:
+    """Build chat messages whose stable part comes first and is marked cacheable.
+
+    The system prompt is sent as two text blocks: `prefix`, identical across
+    calls and tagged with `cache_control`, then the volatile `suffix`. The
+    user input goes last, so every provider sees the longest possible
+    repeated prefix.
+    """
+    blocks = [{"type": "text", "text": prefix, "cache_control": dict(CACHE_CONTROL)}]
+    if suffix:
+        blocks.append({"type": "text", "text": suffix})
+    return [
+        {"role": "system", "content": blocks},
+        {"role": "user", "content": user_input},
+    ]
+
+
+def format_messages(messages: List[Dict[str, Any]], provider: str) -> List[Dict[str, Any]]:
+    """Adapt content-block messages to a provider's wire format.
+
+    Anthropic takes the blocks (and their cache_control) as they are.
+    OpenAI-compatible APIs cache prompt prefixes automatically, so blocks
+    are joined back into one string in the same order.
+    """
+    if provider == "anthropic":
+        return messages
+    formatted = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            message = {
+                **message,
+                "content": "".join(
+                    block.get("text", "") for block in content if isinstance(block, dict)
+                ),
+            }
+        formatted.append(message)
+    return formatted
+
+
+def usage_from_response(response: Any) -> Optional[Dict[str, int]]:
+    """Read input, output and prompt-cache token counts from a raw provider response."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    if hasattr(usage, "cache_read_input_tokens") or hasattr(usage, "input_tokens"):
+        # Anthropic reports uncached, cache-read and cache-write input tokens apart
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        return {
+            "input_tokens": (getattr(usage, "input_tokens", None) or 0) + read + written,
+            "output_tokens": getattr(usage, "output_tokens", None) or 0,
+            "cached_tokens": read,
+            "cache_write_tokens": written,
+        }
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if cached is None:
+        # DeepSeek's name for the same number
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return {
+        "input_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "output_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "cached_tokens": cached or 0,
+        "cache_write_tokens": 0,
+    }
+
+
+@dataclass
+class PromptCacheUsage:
+    """Running totals of input tokens and how many of them hit the provider's cache."""
+
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def record(self, response: Any) -> Optional[Dict[str, int]]:
+        usage = usage_from_response(response)
+        if usage is None:
+            return None
+        with self._lock:
+            self.requests += 1
+            self.input_tokens += usage["input_tokens"]
+            self.cached_tokens += usage["cached_tokens"]
+            self.cache_write_tokens += usage["cache_write_tokens"]
+        return usage
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
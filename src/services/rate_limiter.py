@@ -0,0 +1,247 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.llm_settings import RateLimit
+
+# Lower lanes are served first; within a lane, first come first served
+LANES = {"interactive": 0, "batch": 1, "eval": 2}
+
+
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared across processes.
+
+    Bucket levels and the queue of waiting callers live in a SQLite file;
+    every decision runs in a `BEGIN IMMEDIATE` transaction, which takes the
+    database's write lock, so gunicorn workers, batch jobs and eval runs on
+    one machine draw from the same budget. Waiters are served by lane
+    (interactive before batch before eval) and then in arrival order. A
+    waiter that stops polling (e.g. its process died) is dropped after
+    `stale_after` seconds so it can't block the queue.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        limits: Dict[str, RateLimit],
+        poll_interval: float = 0.05,
+        stale_after: float = 30.0,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.limits = limits
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS waiters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    bucket TEXT NOT NULL,
+                    lane INTEGER NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    heartbeat REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_waiters_bucket_lane ON waiters (bucket, lane, id)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def is_limited(self, bucket: str) -> bool:
+        limit = self.limits.get(bucket)
+        return limit is not None and bool(limit.requests_per_minute or limit.tokens_per_minute)
+
+    def _enqueue(self, bucket: str, lane: str) -> int:
+        if lane not in LANES:
+            raise ValueError(f"Unknown rate limit lane: {lane}")
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO waiters (bucket, lane, enqueued_at, heartbeat) VALUES (?, ?, ?, ?)",
+                (bucket, LANES[lane], now, now),
+            ).lastrowid
+
+    def _dequeue(self, waiter_id: int) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+
+    def _try_acquire(
+        self, bucket: str, waiter_id: int, lane: str, tokens: float
+    ) -> Optional[float]:
+        """Take a request and `tokens` if it's this waiter's turn.
+
+        Returns None once acquired, otherwise how long to sleep before retrying.
+        """
+        limit = self.limits[bucket]
+        rpm = limit.requests_per_minute
+        tpm = limit.tokens_per_minute
+        # A request larger than the whole bucket could never be served
+        tokens = min(tokens, tpm) if tpm else 0
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                beat = conn.execute(
+                    "UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, waiter_id)
+                )
+                if beat.rowcount == 0:
+                    # Dropped as stale (e.g. a long pause); rejoin at the same place
+                    conn.execute(
+                        "INSERT INTO waiters (id, bucket, lane, enqueued_at, heartbeat) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (waiter_id, bucket, LANES[lane], now, now),
+                    )
+                conn.execute(
+                    "DELETE FROM waiters WHERE heartbeat < ?", (now - self.stale_after,)
+                )
+                head = conn.execute(
+                    "SELECT id FROM waiters WHERE bucket = ? ORDER BY lane, id LIMIT 1",
+                    (bucket,),
+                ).fetchone()
+
+                row = conn.execute(
+                    "SELECT requests, tokens, updated_at FROM buckets WHERE name = ?", (bucket,)
+                ).fetchone()
+                requests_left, tokens_left, updated_at = row or (rpm or 0, tpm or 0, now)
+                elapsed = max(now - updated_at, 0)
+                if rpm:
+                    requests_left = min(rpm, requests_left + elapsed * rpm / 60)
+                if tpm:
+                    tokens_left = min(tpm, tokens_left + elapsed * tpm / 60)
+
+                acquired = (
+                    head is not None
+                    and head[0] == waiter_id
+                    and (not rpm or requests_left >= 1)
+                    and (not tpm or tokens_left >= tokens)
+                )
+                if acquired:
+                    requests_left -= 1 if rpm else 0
+                    tokens_left -= tokens
+                    conn.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, requests, tokens, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (bucket, requests_left, tokens_left, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if acquired:
+            return None
+        if head is None or head[0] != waiter_id:
+            return self.poll_interval
+        # At the head of the queue: sleep until the bucket has refilled enough
+        waits = [self.poll_interval]
+        if rpm and requests_left < 1:
+            waits.append((1 - requests_left) * 60 / rpm)
+        if tpm and tokens_left < tokens:
+            waits.append((tokens - tokens_left) * 60 / tpm)
+        # Keep polling often enough that the heartbeat doesn't go stale
+        return min(max(waits), self.stale_after / 3)
+
+    def _record_wait(self, lane: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                lane, {"acquired": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            )
+            stats["acquired"] += 1
+            stats["wait_seconds_total"] += seconds
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], seconds)
+
+    def acquire(self, bucket: str, tokens: float = 0, lane: str = "interactive") -> float:
+        """Block until a request of `tokens` fits the bucket; returns seconds waited."""
+        if not self.is_limited(bucket):
+            return 0.0
+        start = time.monotonic()
+        waiter_id = self._enqueue(bucket, lane)
+        try:
+            while (delay := self._try_acquire(bucket, waiter_id, lane, tokens)) is not None:
+                time.sleep(delay)
+        except BaseException:
+            self._dequeue(waiter_id)
+            raise
+        waited = time.monotonic() - start
+        self._record_wait(lane, waited)
+        return waited
+
+    async def aacquire(self, bucket: str, tokens: float = 0, lane: str = "interactive") -> float:
+        """Async counterpart of `acquire`; the SQLite work runs in a thread."""
+        if not self.is_limited(bucket):
+            return 0.0
+        start = time.monotonic()
+        waiter_id = await asyncio.to_thread(self._enqueue, bucket, lane)
+        try:
+            while (
+                delay := await asyncio.to_thread(
+                    self._try_acquire, bucket, waiter_id, lane, tokens
+                )
+            ) is not None:
+                await asyncio.sleep(delay)
+        except BaseException:
+            await asyncio.to_thread(self._dequeue, waiter_id)
+            raise
+        waited = time.monotonic() - start
+        self._record_wait(lane, waited)
+        return waited
+
+    def settle(self, bucket: str, reserved: float, actual: float) -> None:
+        """Correct the token bucket once a response reports its real usage."""
+        limit = self.limits.get(bucket)
+        if limit is None or not limit.tokens_per_minute or actual == reserved:
+            return
+        with self._connect() as conn:
+            # May go negative, which makes the next callers wait for the overdraft
+            conn.execute(
+                "UPDATE buckets SET tokens = MIN(tokens + ?, ?) WHERE name = ?",
+                (reserved - actual, limit.tokens_per_minute, bucket),
+            )
+
+    def queue_depth(self) -> Dict[str, Dict[str, int]]:
+        """Callers waiting right now, across processes, by bucket and lane."""
+        names = {number: name for name, number in LANES.items()}
+        depth: Dict[str, Dict[str, int]] = {}
+        with self._connect() as conn:
+            for bucket, lane, count in conn.execute(
+                "SELECT bucket, lane, COUNT(*) FROM waiters WHERE heartbeat >= ? "
+                "GROUP BY bucket, lane",
+                (time.time() - self.stale_after,),
+            ):
+                depth.setdefault(bucket, {})[names.get(lane, str(lane))] = count
+        return depth
+
+    def stats(self) -> Dict[str, Any]:
+        """This process's acquisitions and wait times by lane, plus the shared queue depth."""
+        with self._lock:
+            lanes = {lane: dict(values) for lane, values in self._stats.items()}
+        for values in lanes.values():
+            values["wait_seconds_avg"] = values["wait_seconds_total"] / values["acquired"]
+        return {"lanes": lanes, "queue_depth": self.queue_depth()}
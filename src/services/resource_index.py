@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import math
+import re
+import sqlite3
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.retrieval_settings import get_retrieval_settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Titles are short but say what a resource is about
+TITLE_WEIGHT = 2.0
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str  # "resource" or "task"
+    id: int
+    score: float
+
+
+def _tokens(text: str) -> List[str]:
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class ResourceIndex:
+    """Local hashed TF-IDF index over resource and task text.
+
+    Resources are indexed by title and notes, tasks by name and description.
+    Term frequencies are hashed into a fixed number of signed buckets, so a
+    document is vectorized on its own and the index updates one row at a
+    time. Vectors live in a SQLite file shared by the web app and the
+    pipelines; IDF weights are computed over a project's documents at query
+    time.
+    """
+
+    def __init__(self, path: str | Path, dimensions: int = 4096) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dimensions = dimensions
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    kind TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    project_id INTEGER NOT NULL,
+                    task_id INTEGER,
+                    digest TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (kind, id)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_documents_project_id ON documents (project_id)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def vectorize(self, text: str, title: str = "") -> np.ndarray:
+        """Sublinear term frequencies of unigrams and bigrams, hashed into buckets."""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        counts = Counter(_tokens(text))
+        for token, count in Counter(_tokens(title)).items():
+            counts[token] += TITLE_WEIGHT * count
+        for token, count in counts.items():
+            h = zlib.crc32(token.encode("utf-8"))
+            # The sign bit keeps colliding tokens from only ever adding up
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dimensions] += sign * (1.0 + math.log(count))
+        return vector
+
+    def _digest(self, title: str, text: str) -> str:
+        material = f"{self.dimensions}\0{title}\0{text}".encode("utf-8")
+        return hashlib.blake2b(material, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _resource_fields(resource):
+        return resource.title or "", resource.notes or ""
+
+    @staticmethod
+    def _task_fields(task):
+        return task.name or "", task.description or ""
+
+    def _upsert_rows(self, conn: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+        written = 0
+        for kind, doc_id, project_id, task_id, title, text in rows:
+            vector = self.vectorize(text, title)
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(kind, id, project_id, task_id, digest, vector) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    doc_id,
+                    project_id,
+                    task_id,
+                    self._digest(title, text),
+                    vector.tobytes(),
+                ),
+            )
+            written += 1
+        return written
+
+    def index_resource(self, resource, project_id: int) -> None:
+        title, text = self._resource_fields(resource)
+        with self._connect() as conn:
+            self._upsert_rows(
+                conn, [("resource", resource.id, project_id, resource.task_id, title, text)]
+            )
+
+    def index_task(self, task) -> None:
+        title, text = self._task_fields(task)
+        with self._connect() as conn:
+            self._upsert_rows(conn, [("task", task.id, task.project_id, task.id, title, text)])
+
+    def remove_resource(self, resource_id: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM documents WHERE kind = 'resource' AND id = ?", (resource_id,)
+            )
+
+    def remove_task(self, task_id: int) -> None:
+        """Remove a task and the resources filed under it."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE task_id = ?", (task_id,))
+
+    def remove_project(self, project_id: int) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE project_id = ?", (project_id,))
+
+    def sync_project(self, project) -> int:
+        """Bring a loaded project's documents up to date; returns rows re-indexed.
+
+        Only documents whose text changed (or that were never indexed) are
+        vectorized again, so this is cheap when the routes kept the index fresh.
+        """
+        wanted: Dict[tuple, tuple] = {}
+        for task in project.tasks:
+            title, text = self._task_fields(task)
+            wanted[("task", task.id)] = (project.id, task.id, title, text)
+            for resource in task.resources:
+                title, text = self._resource_fields(resource)
+                wanted[("resource", resource.id)] = (project.id, task.id, title, text)
+
+        with self._connect() as conn:
+            stored = {
+                (kind, doc_id): digest
+                for kind, doc_id, digest in conn.execute(
+                    "SELECT kind, id, digest FROM documents WHERE project_id = ?",
+                    (project.id,),
+                )
+            }
+            stale = [key for key in stored if key not in wanted]
+            changed = [
+                (*key, *fields)
+                for key, fields in wanted.items()
+                if stored.get(key) != self._digest(fields[2], fields[3])
+            ]
+            if not stale and not changed:
+                return 0
+            conn.execute("BEGIN")
+            conn.executemany("DELETE FROM documents WHERE kind = ? AND id = ?", stale)
+            written = self._upsert_rows(conn, changed)
+            conn.execute("COMMIT")
+        return written
+
+    def search(
+        self, project_id: int, query: str, k: Optional[int] = 10, kind: Optional[str] = None
+    ) -> List[SearchHit]:
+        """Return the `k` (all if None) documents of a project most similar to the query."""
+        sql = "SELECT kind, id, vector FROM documents WHERE project_id = ?"
+        params: list = [project_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self._connect() as conn:
+            rows = [
+                row
+                for row in conn.execute(sql, params)
+                if len(row[2]) == self.dimensions * 4
+            ]
+        if not rows or k == 0:
+            return []
+
+        matrix = np.vstack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(rows)) / (1 + document_frequency)) + 1.0
+        matrix = matrix * idf
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        query_vector = self.vectorize(query) * idf
+        norm = np.linalg.norm(query_vector)
+        if norm == 0:
+            return []
+        scores = matrix @ (query_vector / norm)
+
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [SearchHit(rows[i][0], rows[i][1], float(scores[i])) for i in top]
+
+
+_shared_indexes: Dict[str, ResourceIndex] = {}
+
+
+def get_resource_index() -> Optional[ResourceIndex]:
+    """Shared index for the configured path, or None if retrieval is disabled."""
+    settings = get_retrieval_settings()
+    if not settings.enabled:
+        return None
+    if settings.path not in _shared_indexes:
+        _shared_indexes[settings.path] = ResourceIndex(
+            settings.path, dimensions=settings.dimensions
+        )
+    return _shared_indexes[settings.path]
+
+
+def _safely(update: Callable[[ResourceIndex], None]) -> None:
+    # The index is derived data: a failure, including opening it, must not
+    # fail the write that triggered it
+    try:
+        index = get_resource_index()
+        if index is not None:
+            update(index)
+    except Exception:
+        logger.exception("Could not update the retrieval index")
+
+
+def reindex_resource(resource) -> None:
+    _safely(lambda index: index.index_resource(resource, resource.task.project_id))
+
+
+def reindex_task(task) -> None:
+    _safely(lambda index: index.index_task(task))
+
+
+def unindex_resource(resource_id: int) -> None:
+    _safely(lambda index: index.remove_resource(resource_id))
+
+
+def unindex_task(task_id: int) -> None:
+    _safely(lambda index: index.remove_task(task_id))
+
+
+def unindex_project(project_id: int) -> None:
+    _safely(lambda index: index.remove_project(project_id))
@@ -0,0 +1,271 @@
+import logging
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from markupsafe import Markup, escape
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("project", "task", "resource")
+
+# Searchable text of each kind: (table, title column, body columns). On
+# PostgreSQL the tables' generated `search_vector` columns are built from
+# the same fields (see the add_full_text_search migration).
+SOURCES = {
+    "project": ("projects", "name", ("description", "purpose", "desired_outcome")),
+    "task": ("tasks", "name", ("description", "context")),
+    "resource": ("resources", "title", ("notes", "url")),
+}
+
+# Snippets mark matches with control characters, replaced by <mark> once the
+# rest of the text is escaped, since the stored text is user input
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+SNIPPET_WORDS = 24
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    id: int
+    project_id: Optional[int]
+    task_id: Optional[int]
+    title: str
+    rank: float
+    snippet: Markup
+
+
+@dataclass
+class SearchResults:
+    query: str
+    hits: List[SearchHit]
+    page: int
+    per_page: int
+    has_next: bool
+    elapsed_ms: float
+    backend: str
+
+
+def highlight(snippet: Optional[str]) -> Markup:
+    """Escape a snippet and turn its match markers into <mark> tags"""
+    escaped = str(escape(snippet or ""))
+    return Markup(escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>"))
+
+
+def _postgres_statement(kinds: Sequence[str]):
+    branches = {
+        "project": """
+            SELECT 'project' AS kind, p.id, p.id AS project_id, NULL::integer AS task_id,
+                   p.name AS title,
+                   concat_ws(' ', p.description, p.purpose, p.desired_outcome) AS body,
+                   ts_rank_cd(p.search_vector, q.query) AS rank
+            FROM projects p, q WHERE p.search_vector @@ q.query""",
+        "task": """
+            SELECT 'task', t.id, t.project_id, t.id, t.name,
+                   concat_ws(' ', t.description, t.context),
+                   ts_rank_cd(t.search_vector, q.query)
+            FROM tasks t, q WHERE t.search_vector @@ q.query""",
+        "resource": """
+            SELECT 'resource', r.id, t.project_id, r.task_id, r.title,
+                   concat_ws(' ', r.notes, r.url),
+                   ts_rank_cd(r.search_vector, q.query)
+            FROM resources r JOIN tasks t ON t.id = r.task_id, q
+            WHERE r.search_vector @@ q.query""",
+    }
+    # Each branch is served by its table's GIN index; only the page of hits
+    # that's returned gets a (comparatively slow) ts_headline
+    return text(
+        f"""
+        WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query)
+        SELECT hits.kind, hits.id, hits.project_id, hits.task_id, hits.title, hits.rank,
+               ts_headline('english', hits.body, q.query, :headline_options) AS snippet
+        FROM (
+            {" UNION ALL ".join(branches[kind] for kind in kinds)}
+            ORDER BY rank DESC, kind, id
+            LIMIT :limit OFFSET :offset
+        ) hits, q
+        ORDER BY hits.rank DESC, hits.kind, hits.id
+        """
+    ).bindparams(
+        headline_options=(
+            f"StartSel={MATCH_START}, StopSel={MATCH_END}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=1"
+        )
+    )
+
+
+def _sqlite_body(prefix: str, columns: Sequence[str]) -> str:
+    return " || ' ' || ".join(f"coalesce({prefix}.{column}, '')" for column in columns)
+
+
+def sqlite_schema() -> List[str]:
+    """DDL of the FTS5 index that stands in for the tsvector columns on SQLite.
+
+    Triggers keep it in step with the tables, like the generated columns do
+    on PostgreSQL.
+    """
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, row_id UNINDEXED, title, body, tokenize='porter unicode61')"
+    ]
+    for kind, (table, title, body) in SOURCES.items():
+        insert = (
+            "INSERT INTO search_index (kind, row_id, title, body) "
+            f"VALUES ('{kind}', new.id, coalesce(new.{title}, ''), {_sqlite_body('new', body)});"
+        )
+        delete = f"DELETE FROM search_index WHERE kind = '{kind}' AND row_id = old.id;"
+        columns = ", ".join((title, *body))
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {columns} "
+            f"ON {table} BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete} END",
+        ]
+    return statements
+
+
+_sqlite_ready: "weakref.WeakSet" = weakref.WeakSet()
+_sqlite_lock = threading.Lock()
+
+
+def ensure_sqlite_index(engine) -> None:
+    """Create the FTS5 index and its triggers, filling it from existing rows once.
+
+    The check and the fill run in one BEGIN IMMEDIATE transaction: pysqlite
+    doesn't open one before SELECT or CREATE, so two processes could both
+    find the index missing and each fill it.
+    """
+    if engine in _sqlite_ready:
+        return
+    with _sqlite_lock:
+        raw = engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            isolation_level = connection.isolation_level
+            # Manage the transaction ourselves instead of pysqlite's implicit one
+            connection.isolation_level = None
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    exists = connection.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'search_index'"
+                    ).fetchone()
+                    for statement in sqlite_schema():
+                        connection.execute(statement)
+                    if not exists:
+                        for kind, (table, title, body) in SOURCES.items():
+                            connection.execute(
+                                "INSERT INTO search_index (kind, row_id, title, body) "
+                                f"SELECT '{kind}', t.id, coalesce(t.{title}, ''), "
+                                f"{_sqlite_body('t', body)} FROM {table} t"
+                            )
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+            finally:
+                connection.isolation_level = isolation_level
+        finally:
+            raw.close()
+        _sqlite_ready.add(engine)
+
+
+def _sqlite_statement(kinds: Sequence[str]):
+    return text(
+        f"""
+        SELECT s.kind, s.row_id AS id,
+               CASE s.kind WHEN 'project' THEN s.row_id WHEN 'task' THEN t.project_id
+                           ELSE rt.project_id END AS project_id,
+               CASE s.kind WHEN 'task' THEN s.row_id WHEN 'resource' THEN r.task_id END AS task_id,
+               s.title,
+               -bm25(search_index, 0.0, 0.0, 10.0, 1.0) AS rank,
+               snippet(search_index, 3, char(2), char(3), '…', {SNIPPET_WORDS}) AS snippet
+        FROM search_index s
+        LEFT JOIN tasks t ON s.kind = 'task' AND t.id = s.row_id
+        LEFT JOIN resources r ON s.kind = 'resource' AND r.id = s.row_id
+        LEFT JOIN tasks rt ON rt.id = r.task_id
+        WHERE search_index MATCH :query AND s.kind IN :kinds
+        ORDER BY rank DESC, s.kind, s.row_id
+        LIMIT :limit OFFSET :offset
+        """
+    ).bindparams(bindparam("kinds", value=list(kinds), expanding=True))
+
+
+def search(
+    db,
+    query: str,
+    kinds: Optional[Sequence[str]] = None,
+    page: int = 1,
+    per_page: int = 20,
+) -> SearchResults:
+    """
+    Full-text search over projects, tasks and resources, best match first
+
+    PostgreSQL ranks with ts_rank_cd over the weighted `search_vector`
+    columns and understands quoted phrases, `or` and `-word`. Elsewhere
+    (SQLite) the FTS5 index ranks with BM25 and every word must match.
+
+    Args:
+        db: Database session
+        query: What the user typed
+        kinds: Subset of KINDS to search, all by default
+        page: 1-based page of results
+        per_page: Results per page
+
+    Returns:
+        SearchResults: The page of hits, whether there's a next one and how
+        long the query took
+    """
+    kinds = [kind for kind in KINDS if kind in (kinds or KINDS)]
+    engine = db.get_bind()
+    backend = engine.dialect.name
+    start = time.perf_counter()
+    words = TOKEN_PATTERN.findall(query)
+    rows = []
+    if words and kinds:
+        params = {"limit": per_page + 1, "offset": (page - 1) * per_page}
+        if backend == "postgresql":
+            statement = _postgres_statement(kinds)
+            params["query"] = query
+        else:
+            ensure_sqlite_index(engine)
+            statement = _sqlite_statement(kinds)
+            # Quoted so FTS5 query syntax in the input is matched literally
+            params["query"] = " ".join(f'"{word}"' for word in words)
+        rows = db.execute(statement, params).all()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Search %r (%s, page %d): %d hit(s) in %.1f ms",
+        query, backend, page, min(len(rows), per_page), elapsed_ms,
+    )
+
+    hits = [
+        SearchHit(
+            kind=row.kind,
+            id=row.id,
+            project_id=row.project_id,
+            task_id=row.task_id,
+            title=row.title,
+            rank=float(row.rank),
+            snippet=highlight(row.snippet),
+        )
+        for row in rows[:per_page]
+    ]
+    return SearchResults(
+        query=query,
+        hits=hits,
+        page=page,
+        per_page=per_page,
+        has_next=len(rows) > per_page,
+        elapsed_ms=elapsed_ms,
+        backend=backend,
+    )
@@ -0,0 +1,157 @@
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+type TokenCountMode = Literal["auto", "exact", "estimate", "off"]
+
+# Providers whose models use OpenAI's tokenizers
+TIKTOKEN_PROVIDERS = {"openai", "github_models"}
+
+# Chat formatting overhead, see OpenAI's "How to count tokens" cookbook
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+# Rough characters-per-token ratio for English text on modern BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class TokenCount:
+    """Input token count of a chat request."""
+
+    total: int
+    per_message: List[int] = field(default_factory=list)
+    method: Literal["tiktoken", "estimate"] = "tiktoken"
+    encoding: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _encoding_name_for_model(model: str) -> str:
+    # GitHub Models prefixes the vendor, e.g. "openai/gpt-4.1-mini"
+    model = model.rsplit("/", 1)[-1]
+    try:
+        return tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        if model.startswith(("gpt-4o", "gpt-4.1", "gpt-4.5", "o1", "o3", "o4")):
+            return "o200k_base"
+        return "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str) -> Optional[tiktoken.Encoding]:
+    """Load (once per process) a tiktoken encoding, or None if it is unavailable.
+
+    Tokenizer files are read from TIKTOKEN_CACHE_DIR when set, so a directory
+    pre-populated with `flask warm-tokenizers` works without network access.
+    """
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(
+            "Tokenizer %s unavailable (%s); falling back to estimates", encoding_name, e
+        )
+        return None
+
+
+def _message_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        # Content blocks, e.g. [{"type": "text", "text": "..."}]
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in value
+        )
+    return str(value)
+
+
+class TokenCounter:
+    """Counts input tokens of chat messages without rendering anything.
+
+    In "auto" mode OpenAI-compatible providers get exact tiktoken counts and
+    other providers (whose tokenizers differ anyway) a cheap length-based
+    estimate. "exact" forces tiktoken, "estimate" forces the estimate and
+    "off" skips counting.
+    """
+
+    def __init__(self, mode: TokenCountMode = "auto", tokenizer_dir: Optional[str] = None):
+        self.mode = mode
+        if tokenizer_dir:
+            os.environ.setdefault("TIKTOKEN_CACHE_DIR", tokenizer_dir)
+
+    def _use_tiktoken(self, provider: str) -> bool:
+        if self.mode == "exact":
+            return True
+        return self.mode == "auto" and provider in TIKTOKEN_PROVIDERS
+
+    def count_text(self, text: str, provider: str, model: str) -> int:
+        """Count the tokens of a bare string (no chat formatting overhead)."""
+        if self._use_tiktoken(provider):
+            encoding = get_encoding(_encoding_name_for_model(model))
+            if encoding is not None:
+                return len(encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def count_messages(
+        self, messages: List[Dict[str, Any]], provider: str, model: str
+    ) -> Optional[TokenCount]:
+        if self.mode == "off":
+            return None
+
+        encoding = None
+        if self._use_tiktoken(provider):
+            encoding = get_encoding(_encoding_name_for_model(model))
+
+        per_message = []
+        for message in messages:
+            text = "".join(_message_text(value) for value in message.values())
+            if encoding is not None:
+                tokens = len(encoding.encode(text, disallowed_special=()))
+            else:
+                tokens = math.ceil(len(text) / CHARS_PER_TOKEN)
+            per_message.append(TOKENS_PER_MESSAGE + tokens)
+
+        return TokenCount(
+            total=sum(per_message) + TOKENS_PER_REPLY,
+            per_message=per_message,
+            method="tiktoken" if encoding is not None else "estimate",
+            encoding=encoding.name if encoding is not None else None,
+        )
+
+
+def render_token_count(messages: List[Dict[str, Any]], count: TokenCount) -> None:
+    """Pretty-print a token count with rich. Debugging aid only."""
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.syntax import Syntax
+    from rich.table import Table
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Role", style="cyan", no_wrap=True)
+    table.add_column("Content", style="white")
+    table.add_column("Tokens", style="green")
+    for message, tokens in zip(messages, count.per_message):
+        role = message.get("role", "-")
+        content = _message_text(message.get("content", str(message)))
+        if role == "system":
+            # Syntax highlight HTML for system prompt
+            table.add_row(role, Syntax(content, "html", theme="dracula", word_wrap=True), str(tokens))
+        else:
+            preview = content[:80] + ("..." if len(content) > 80 else "")
+            table.add_row(role, preview, str(tokens))
+    Console().print(
+        Panel(
+            table,
+            title=f"[{count.method}] Estimated input tokens: [bold yellow]{count.total}[/]",
+            border_style="bright_blue",
+            padding=(1, 2),
+        )
+    )
@@ -53,22 +53,25 @@ document.addEventListener('DOMContentLoaded', function() {
         e.preventDefault();
         if (!draggedItem) return;
 
-        // Collect new order of tasks
-        const taskOrders = Array.from(tasksList.querySelectorAll('.task')).map((row, index) => ({
-            taskId: parseInt(row.dataset.taskId),
-            order: index
-        }));
+        // Describe the drop as a single move relative to the new neighbours
+        const previous = draggedItem.previousElementSibling;
+        const next = draggedItem.nextElementSibling;
+        const move = {
+            taskId: parseInt(draggedItem.dataset.taskId),
+            afterId: previous ? parseInt(previous.dataset.taskId) : null,
+            beforeId: next ? parseInt(next.dataset.taskId) : null
+        };
 
         // Update task numbers in the UI immediately
         updateTaskNumbers();
 
-        // Send order to server
+        // Send the move to the server
         fetch(`/projects/${getProjectId()}/tasks/reorder`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ taskOrders })
+            body: JSON.stringify({ move })
         })
         .then(response => response.json())
         .then(data => {
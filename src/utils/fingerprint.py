@@ -0,0 +1,99 @@
+import hashlib
+import re
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"')\]]+", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "si"}
+TRACKING_PREFIXES = ("utm_",)
+
+SIMHASH_BITS = 64
+# Features are single words and word pairs: pairs keep some word order, and
+# with words alone a one-word edit moves a short text's hash less
+SHINGLE_SIZES = (1, 2)
+# Shorter texts share too few shingles for their distance to mean anything
+MIN_TOKENS = 8
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Normalize a URL so reposted links compare equal
+
+    Lowercases the scheme and host, drops `www.`, default ports, the
+    fragment, tracking parameters and a trailing slash, upgrades http to
+    https and sorts the remaining query parameters.
+
+    Args:
+        url: URL to canonicalize
+
+    Returns:
+        str | None: The canonical URL, or None if it isn't a valid http(s) URL
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        # e.g. a non-numeric or out-of-range port, or an unclosed IPv6 bracket
+        return None
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower().removeprefix("www.")
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def extract_urls(text: str) -> List[str]:
+    return [match.rstrip(".,;:!?") for match in URL_PATTERN.findall(text or "")]
+
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of a text's words and word pairs
+
+    Texts that differ by a few words get fingerprints that differ in a few
+    bits. URLs are left out so a repost with a tracking link still matches.
+    The value is signed so it fits a BIGINT column.
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        int | None: The fingerprint, or None when the text is too short
+    """
+    tokens = _tokens(URL_PATTERN.sub(" ", text or ""))
+    if len(tokens) < MIN_TOKENS:
+        return None
+    shingles = [
+        " ".join(tokens[i : i + size])
+        for size in SHINGLE_SIZES
+        for i in range(len(tokens) - size + 1)
+    ]
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    # A bit is set where most shingles' hashes set it
+    value = 0
+    for bit in range(SIMHASH_BITS):
+        if sum(h >> bit & 1 for h in hashes) * 2 > len(hashes):
+            value |= 1 << bit
+    return value - (1 << SIMHASH_BITS) if value >> (SIMHASH_BITS - 1) else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return ((a ^ b) & ((1 << SIMHASH_BITS) - 1)).bit_count()
@@ -1,7 +1,115 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
 import markdown
 import bleach
 from markupsafe import Markup
 
+# Bump whenever the extensions or sanitizer rules change so stored HTML
+# columns get re-rendered (see the `render-markdown` CLI command)
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = [
+    'markdown.extensions.fenced_code',
+    'markdown.extensions.tables',
+    'markdown.extensions.nl2br',
+    'markdown.extensions.sane_lists',
+]
+
+# Allowed tags and attributes for security
+ALLOWED_TAGS = [
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'br',
+    'ul', 'ol', 'li', 'strong', 'em', 'a', 'pre', 'code',
+    'blockquote', 'table', 'thead', 'tbody', 'tr', 'th', 'td',
+    'img', 'span', 'div', 'strike', 'del'
+]
+
+ALLOWED_ATTRS = {
+    'a': ['href', 'title', 'target', 'rel'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    '*': ['class', 'style']
+}
+
+
+class MarkdownRenderer:
+    """
+    Reusable markdown -> sanitized HTML engine
+
+    Keeps a single Markdown pipeline (reset between uses) and a prebuilt
+    bleach Cleaner, fronted by a bounded LRU cache keyed by a hash of the
+    source text.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        self._cleaner = bleach.Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRS,
+            strip=True,
+        )
+        self._cache = OrderedDict()
+        # Markdown instances are stateful, so renders and cache updates are serialized
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _render_uncached(self, text):
+        # Convert markdown to HTML, then sanitize it
+        html = self._md.reset().convert(text)
+        return self._cleaner.clean(html)
+
+    def render(self, text):
+        """
+        Convert markdown text to sanitized HTML, using the cache when possible
+
+        Args:
+            text: Markdown text to convert
+
+        Returns:
+            str: Sanitized HTML
+        """
+        key = self._key(text)
+        with self._lock:
+            html = self._cache.get(key)
+            if html is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return html
+
+            self.misses += 1
+            html = self._render_uncached(text)
+            self._cache[key] = html
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return html
+
+    def cache_info(self):
+        """Return hit/miss counters and current cache occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+            }
+
+    def cache_clear(self):
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+renderer = MarkdownRenderer()
+
+
 def md_to_html(text):
     """
     Convert markdown text to safe HTML
@@ -15,38 +123,41 @@ def md_to_html(text):
     if not text:
         return Markup("")
 
-    # Convert markdown to HTML
-    html = markdown.markdown(
-        text,
-        extensions=[
-            'markdown.extensions.fenced_code',
-            'markdown.extensions.tables',
-            'markdown.extensions.nl2br',
-            'markdown.extensions.sane_lists',
-        ]
-    )
-
-    # Define allowed tags and attributes for security
-    allowed_tags = [
-        'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'br',
-        'ul', 'ol', 'li', 'strong', 'em', 'a', 'pre', 'code',
-        'blockquote', 'table', 'thead', 'tbody', 'tr', 'th', 'td',
-        'img', 'span', 'div', 'strike', 'del'
-    ]
-
-    allowed_attrs = {
-        'a': ['href', 'title', 'target', 'rel'],
-        'img': ['src', 'alt', 'title', 'width', 'height'],
-        '*': ['class', 'style']
-    }
-
-    # Sanitize the HTML for security
-    clean_html = bleach.clean(
-        html,
-        tags=allowed_tags,
-        attributes=allowed_attrs,
-        strip=True
-    )
-
     # Return as a Markup object so Jinja knows it's safe HTML
-    return Markup(clean_html)
+    return Markup(renderer.render(text))
+
+
+def render_markdown_fields(obj, fields):
+    """
+    Store sanitized HTML for each markdown field of a model instance
+
+    Each field's HTML is written to `<field>_html` and the instance's
+    `markdown_version` is set to the current RENDERER_VERSION.
+
+    Args:
+        obj: Model instance holding the markdown fields
+        fields: Names of the markdown fields to render
+    """
+    for field in fields:
+        text = getattr(obj, field)
+        setattr(obj, f"{field}_html", renderer.render(text) if text else None)
+    obj.markdown_version = RENDERER_VERSION
+
+
+def stored_html(obj, field):
+    """
+    Return the stored HTML of a markdown field as Markup
+
+    Falls back to rendering on the fly when the row has not been rendered
+    with the current RENDERER_VERSION yet.
+
+    Args:
+        obj: Model instance holding the markdown field
+        field: Name of the markdown field
+
+    Returns:
+        Markup: Safe HTML markup that can be rendered in templates
+    """
+    if obj.markdown_version != RENDERER_VERSION:
+        return md_to_html(getattr(obj, field))
+    return Markup(getattr(obj, f"{field}_html") or "")
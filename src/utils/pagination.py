@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(sort_value, row_id):
+    """
+    Encode the keyset position of a row as an opaque URL-safe cursor
+
+    Args:
+        sort_value: Value of the sort column (datetime) for the row
+        row_id: Primary key of the row
+
+    Returns:
+        str: Cursor to pass back as the `after` query parameter
+    """
+    payload = json.dumps(
+        [sort_value.isoformat() if sort_value else None, row_id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by `encode_cursor`
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        tuple: (sort_value, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        sort_value = datetime.fromisoformat(sort_value)
+        # Stored timestamps are naive; an offset means the cursor was edited
+        if sort_value.tzinfo is not None:
+            raise ValueError("cursor timestamp has a timezone")
+        return sort_value, int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture
+def llm_factory_module(monkeypatch):
+    for key in (
+        "OPENAI_API_KEY",
+        "ANTHROPIC_API_KEY",
+        "GITHUB_MODELS_API_KEY",
+        "DEEPSEEK_API_KEY",
+    ):
+        monkeypatch.setenv(key, "test-key")
+    from config.llm_settings import get_settings
+    from services import llm_factory
+
+    get_settings.cache_clear()
+    monkeypatch.setattr(llm_factory.LLMFactory, "_record_token_count", lambda self, messages, model: None)
+    yield llm_factory
+    get_settings.cache_clear()
@@ -0,0 +1,209 @@
+import asyncio
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from main import completed_inputs, open_output, read_inputs, run_batch, show_pipeline_progress
+from pipelines.pkm.new_info_for_project_evaluator import (
+    BatchEvaluationResult,
+    NewInfoClassification,
+    NewProjectInfoAction,
+    NewProjectInfoEvaluatorPipeline,
+    NewProjectInfoRelevance,
+    Novelty,
+)
+
+
+class Pipeline:
+    """Answers in reverse input order, so results finish out of order."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def aiter_evaluations(self, project_id, inputs, semaphore):
+        if project_id == 404:
+            raise ValueError(f"Project with id {project_id} not found.")
+
+        async def evaluate(index, text):
+            async with semaphore:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                await asyncio.sleep(0.01 * (len(inputs) - index))
+                self.in_flight -= 1
+            error = "RuntimeError: boom" if text == "bad" else None
+            return BatchEvaluationResult(index=index, user_input=text, error=error)
+
+        for done in asyncio.as_completed([evaluate(i, text) for i, text in enumerate(inputs)]):
+            yield await done
+
+
+def test_read_inputs_from_jsonl_and_directory(tmp_path):
+    jsonl = tmp_path / "inputs.jsonl"
+    jsonl.write_text('"plain"\n\n{"id": "a", "input": "with id"}\n{"input": "  "}\n')
+    folder = tmp_path / "notes"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "one.md").write_text("first")
+    (folder / "sub" / "two.txt").write_text("second")
+    (folder / "image.png").write_bytes(b"\x89PNG")
+
+    assert read_inputs(jsonl) == [("1", "plain"), ("a", "with id")]
+    assert read_inputs(folder) == [("one.md", "first"), ("sub/two.txt", "second")]
+
+    jsonl.write_text('{"id": 1, "input": "x"}\n{"id": 1, "input": "y"}\n')
+    with pytest.raises(ValueError):
+        read_inputs(jsonl)
+
+
+def test_interactive_run_shows_pipeline_progress(monkeypatch):
+    from rich.console import Console
+
+    pipeline_logger = logging.getLogger("pipelines")
+    monkeypatch.setattr(pipeline_logger, "handlers", [])
+    monkeypatch.setattr(pipeline_logger, "level", logging.NOTSET)
+    console = Console(file=io.StringIO(), width=200)
+
+    show_pipeline_progress(console)
+    logging.getLogger("pipelines.pkm.new_info_for_project_evaluator").info("Project context: %s", "64/6000")
+    logging.getLogger("httpx").info("HTTP Request: POST")
+
+    assert console.file.getvalue().strip() == "Project context: 64/6000"
+
+
+def test_batch_streams_results_and_resumes(tmp_path):
+    items = [("a", "first"), ("b", "bad"), ("c", "third")]
+    pipeline = Pipeline()
+    output = io.StringIO()
+
+    succeeded, failed = asyncio.run(run_batch(pipeline, items, [1, 404], output, max_concurrency=3))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (succeeded, failed) == (2, 4)
+    assert pipeline.peak == 3
+    # Written in completion order, not input order
+    assert [r["id"] for r in records if r["project_id"] == 1] == ["c", "b", "a"]
+    assert {r["error"] for r in records if r["project_id"] == 404} == {
+        "ValueError: Project with id 404 not found."
+    }
+
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({**r, "result": {} if r["error"] is None else None}) + "\n"
+            for r in records
+        )
+        + '{"project_id": 1, "id": "b", "res'
+    )
+    skip = completed_inputs(path)
+    assert skip == {(1, "a"), (1, "c")}
+
+    with open_output(path, resume=True) as output:
+        asyncio.run(run_batch(Pipeline(), items, [1], output, max_concurrency=2, skip=skip))
+    # The cut-short line is gone and every line is a whole record
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 7
+    assert (records[-1]["project_id"], records[-1]["id"]) == (1, "b")
+    assert records[-1]["error"] == "RuntimeError: boom"
+
+
+class LLM:
+    """Stub LLM shared by every project of a batch, failing on "bad"."""
+
+    max_concurrency = 8
+
+    def __init__(self):
+        self.slow = set()
+        self.in_flight = 0
+        self.peak = 0
+        self.started = 0
+        self.cancelled = 0
+
+    def count_text_tokens(self, text):
+        return len(text.split())
+
+    async def acreate_completion(self, response_model, messages):
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(1 if messages[-1]["content"] in self.slow else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if messages[-1]["content"] == "bad":
+            raise RuntimeError("boom")
+        return NewInfoClassification(
+            reasoning="",
+            relevance=NewProjectInfoRelevance.NO_RELEVANCE,
+            related_resources=[],
+            novelty_reasoning="",
+            novelty=Novelty.new,
+            action_reasoning="",
+            action=NewProjectInfoAction.EXCLUDE,
+        )
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    projects = {
+        project_id: SimpleNamespace(
+            id=project_id, name=f"Project {project_id}", description="", purpose=None,
+            desired_outcome=None, created_at=None, deadline=None, status="In Progress",
+            priority="High", tasks=[],
+        )
+        for project_id in (1, 2)
+    }
+
+    def get_project(project_id):
+        if project_id not in projects:
+            raise ValueError(f"Project with id {project_id} not found.")
+        return projects[project_id]
+
+    pipeline = NewProjectInfoEvaluatorPipeline(llm=LLM(), retrieval_top_k=0)
+    monkeypatch.setattr(pipeline, "get_project", get_project)
+    return pipeline
+
+
+def test_batch_shares_one_limit_across_projects(pipeline):
+    items = [(str(i), "bad" if i == 3 else f"input {i}") for i in range(6)]
+    output = io.StringIO()
+
+    succeeded, failed = asyncio.run(
+        run_batch(pipeline, items, [1, 2, 404], output, max_concurrency=3)
+    )
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (succeeded, failed) == (10, 8)
+    # Each project alone would run up to 6 calls at once
+    assert pipeline.llm.peak == 3
+    assert pipeline.llm.started == 12
+    errors = {(r["project_id"], r["id"]): r["error"] for r in records if r["error"]}
+    assert errors == {
+        (1, "3"): "RuntimeError: boom",
+        (2, "3"): "RuntimeError: boom",
+        **{(404, str(i)): "ValueError: Project with id 404 not found." for i in range(6)},
+    }
+
+
+def test_stopping_early_cancels_the_calls_in_flight(pipeline):
+    llm = pipeline.llm
+    inputs = [f"input {i}" for i in range(5)]
+    llm.slow = set(inputs[1:])
+
+    async def stop_after_first_result():
+        results = pipeline.aiter_evaluations(1, inputs, max_concurrency=2)
+        assert (await anext(results)).error is None
+        await results.aclose()
+        # Give the cancelled calls a turn to unwind, before asyncio.run would
+        await asyncio.sleep(0)
+        assert llm.in_flight == 0
+        assert llm.cancelled == 2
+
+    asyncio.run(stop_after_first_result())
+    # Inputs still waiting for the semaphore never reached the LLM
+    assert llm.started == 3
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.project import Project
+from models.resource import Resource
+from models.task import Task
+
+# Seeded rows were last written well before the test's own edits
+SEEDED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+
+    from api import routes
+    from services import resource_index
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Project(id=1, name="Nexus", status="In Progress", updated_at=SEEDED_AT))
+    db.add(Task(id=1, project_id=1, name="Read", sort_order=1024, updated_at=SEEDED_AT))
+    db.add(
+        Resource(
+            id=1, task_id=1, title="Post", url="https://a.example", type="article",
+            updated_at=SEEDED_AT,
+        )
+    )
+    db.commit()
+    monkeypatch.setattr(routes, "get_request_db", lambda: db)
+    monkeypatch.setattr(resource_index, "get_resource_index", lambda: None)
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.register_blueprint(routes.projects_bp)
+    yield app.test_client()
+    db.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("path", ["/projects/1/json", "/projects/all/json"])
+def test_matching_validators_get_304(client, path):
+    response = client.get(path)
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.get(path, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    assert client.get(path, headers={"If-None-Match": 'W/"stale"'}).status_code == 200
+    older = "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert client.get(path, headers={"If-Modified-Since": older}).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    headers = {"If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified}
+    assert client.get(path, headers=headers).status_code == 200
+
+
+def test_etag_changes_with_every_write(client):
+    def etag():
+        return client.get("/projects/1/json").headers["ETag"]
+
+    writes = [
+        ("/projects/1/tasks/1/update", {"name": "Read more", "status": "todo", "priority": "High"}),
+        ("/resources/1/update", {"title": "Post", "url": "https://a.example", "type": "video"}),
+        ("/projects/1/tasks/add", {"name": "Watch"}),
+        ("/projects/1/tasks/1/resources/create", {"title": "New", "url": "https://b.example", "type": "article"}),
+        ("/resources/1/delete", {}),
+        ("/projects/1/tasks/2/delete/confirm", {}),
+    ]
+    previous = etag()
+    for path, form in writes:
+        assert client.post(path, data=form).status_code == 302, path
+        current = etag()
+        assert current != previous, path
+        previous = current
+
+
+def test_pending_flashes_bypass_304(client):
+    etag = client.get("/projects/1/json").headers["ETag"]
+    with client.session_transaction() as session:
+        session["_flashes"] = [("success", "Task added.")]
+
+    response = client.get("/projects/1/json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
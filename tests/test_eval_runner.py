@@ -0,0 +1,125 @@
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from evals.runner import EvalCheckpoint, run_dataset_experiment
+
+
+class FakeItem:
+    def __init__(self, number, langfuse):
+        self.id = f"item_{number}"
+        self.input = {"number": number}
+        self.expected_output = {"double": number * 2}
+        self.langfuse = langfuse
+
+    @contextmanager
+    def observe(self, run_name):
+        yield f"trace_{self.id}"
+        self.langfuse.linked.append((run_name, self.id))
+
+
+class FakeLangfuse:
+    """Just the dataset and ingestion calls the runner makes."""
+
+    def __init__(self, size, rejected=()):
+        self.items = [FakeItem(number, self) for number in range(size)]
+        self.linked = []
+        self.batches = []
+        self.rejected = set(rejected)
+        self.client = SimpleNamespace(ingestion=SimpleNamespace(batch=self.batch))
+
+    def get_dataset(self, name):
+        return SimpleNamespace(items=self.items)
+
+    def batch(self, batch):
+        self.batches.append(batch)
+        errors = [
+            SimpleNamespace(id=event.id, message="rejected")
+            for event in batch
+            if event.body.trace_id in self.rejected
+        ]
+        return SimpleNamespace(successes=[], errors=errors)
+
+
+class Doubler:
+    def __init__(self, delay=0.05, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, item):
+        with self._lock:
+            self.calls.append(item.id)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if item.input["number"] in self.fail_on:
+            raise RuntimeError("provider error")
+        return item.input["number"] * 2
+
+
+EVALUATORS = {"exact_match": lambda item, output: output == item.expected_output["double"]}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return EvalCheckpoint(tmp_path / "checkpoints.sqlite3")
+
+
+def test_items_run_concurrently_with_batched_scores(checkpoint):
+    langfuse = FakeLangfuse(20)
+    task = Doubler()
+
+    start = time.perf_counter()
+    summary = run_dataset_experiment(
+        langfuse, "numbers", "run", task, EVALUATORS,
+        max_concurrency=5, checkpoint=checkpoint, score_batch_size=8,
+    )
+
+    assert time.perf_counter() - start < 0.6
+    assert task.peak == 5
+    assert (summary.completed, summary.failed, summary.skipped) == (20, 0, 0)
+    assert len(langfuse.linked) == 20
+    # 20 scores in batches of at least 8, not one request per item
+    assert 2 <= len(langfuse.batches) <= 3
+    assert sum(len(batch) for batch in langfuse.batches) == 20
+    assert all(event.body.value == 1.0 for batch in langfuse.batches for event in batch)
+
+
+def test_rerun_resumes_after_failures(checkpoint):
+    langfuse = FakeLangfuse(10)
+    first = run_dataset_experiment(
+        langfuse, "numbers", "run", Doubler(delay=0, fail_on={3, 7}), EVALUATORS,
+        checkpoint=checkpoint,
+    )
+    assert (first.completed, first.failed) == (8, 2)
+
+    task = Doubler(delay=0)
+    second = run_dataset_experiment(
+        langfuse, "numbers", "run", task, EVALUATORS, checkpoint=checkpoint
+    )
+    assert sorted(task.calls) == ["item_3", "item_7"]
+    assert (second.completed, second.skipped) == (2, 8)
+
+    # Another run name starts from scratch
+    other = run_dataset_experiment(
+        langfuse, "numbers", "other run", Doubler(delay=0), EVALUATORS, checkpoint=checkpoint
+    )
+    assert other.completed == 10
+
+
+def test_items_with_rejected_scores_are_not_checkpointed(checkpoint):
+    langfuse = FakeLangfuse(4, rejected={"trace_item_2"})
+    run_dataset_experiment(
+        langfuse, "numbers", "run", Doubler(delay=0), EVALUATORS, checkpoint=checkpoint
+    )
+
+    assert checkpoint.completed("run") == {"item_0", "item_1", "item_3"}
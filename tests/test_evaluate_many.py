@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from pipelines.pkm.new_info_for_project_evaluator import (
+    NewInfoClassification,
+    NewProjectInfoAction,
+    NewProjectInfoEvaluatorPipeline,
+    NewProjectInfoRelevance,
+    Novelty,
+)
+
+
+class LLM:
+    """Answers each input after `delays[input]` seconds, failing on "bad"."""
+
+    def __init__(self, delays, max_concurrency=8):
+        self.delays = delays
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.peak = 0
+        self.finished = []
+
+    def count_text_tokens(self, text):
+        return len(text.split())
+
+    async def acreate_completion(self, response_model, messages):
+        user_input = messages[-1]["content"]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(user_input, 0.01))
+        finally:
+            self.in_flight -= 1
+        if user_input == "bad":
+            raise RuntimeError("boom")
+        self.finished.append(user_input)
+        return response_model(
+            reasoning=user_input,
+            relevance=NewProjectInfoRelevance.WEAK_RELEVANCE,
+            related_resources=[],
+            novelty_reasoning="",
+            novelty=Novelty.new,
+            action_reasoning="",
+            action=NewProjectInfoAction.ADD_TO_PROJECT,
+        )
+
+
+def make_pipeline(monkeypatch, llm):
+    project = SimpleNamespace(
+        id=1, name="Nexus", description="", purpose=None, desired_outcome=None,
+        created_at=None, deadline=None, status="In Progress", priority="High", tasks=[],
+    )
+    pipeline = NewProjectInfoEvaluatorPipeline(llm=llm, retrieval_top_k=0)
+    monkeypatch.setattr(pipeline, "get_project", lambda project_id: project)
+    return pipeline
+
+
+def test_results_come_back_in_input_order(monkeypatch):
+    inputs = ["first", "second", "third"]
+    llm = LLM({"first": 0.06, "second": 0.03, "third": 0.01})
+
+    results = make_pipeline(monkeypatch, llm).evaluate_many(1, inputs)
+
+    assert llm.finished == ["third", "second", "first"]
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.user_input for r in results] == inputs
+    assert [r.result.reasoning for r in results] == inputs
+    assert all(isinstance(r.result, NewInfoClassification) for r in results)
+
+
+def test_a_failing_item_does_not_fail_the_batch(monkeypatch):
+    results = make_pipeline(monkeypatch, LLM({})).evaluate_many(1, ["first", "bad", "third"])
+
+    assert [r.error for r in results] == [None, "RuntimeError: boom", None]
+    assert results[1].result is None
+    assert [r.result.reasoning for r in (results[0], results[2])] == ["first", "third"]
+
+
+@pytest.mark.parametrize("max_concurrency, expected", [(2, 2), (None, 3)])
+def test_calls_in_flight_stay_within_max_concurrency(monkeypatch, max_concurrency, expected):
+    # Without an explicit limit the LLM's own max_concurrency applies
+    llm = LLM({}, max_concurrency=3)
+    inputs = [f"input {i}" for i in range(10)]
+
+    results = make_pipeline(monkeypatch, llm).evaluate_many(1, inputs, max_concurrency)
+
+    assert llm.peak == expected
+    assert [r.error for r in results] == [None] * len(inputs)
@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pipelines.pkm.new_info_for_project_evaluator import (
+    NewProjectInfoAction,
+    NewProjectInfoEvaluatorPipeline,
+    Novelty,
+)
+from utils.fingerprint import canonicalize_url, hamming_distance, simhash
+
+NOTES = (
+    "Postgres partial indexes only cover the rows matching their predicate, which keeps "
+    "them small and makes queries that filter on the same condition much cheaper to plan "
+    "and run, at the cost of being unusable for any other filter."
+)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/post",
+        "HTTP://www.Example.com:80/post/",
+        "https://example.com/post?utm_source=newsletter&utm_medium=email#comments",
+    ],
+)
+def test_reposted_urls_canonicalize_alike(url):
+    assert canonicalize_url(url) == "https://example.com/post"
+
+
+def test_canonical_url_keeps_meaningful_parts():
+    assert canonicalize_url("https://example.com:8443/a?b=2&a=1") == "https://example.com:8443/a?a=1&b=2"
+    assert canonicalize_url("ftp://example.com/file") is None
+
+
+@pytest.mark.parametrize(
+    "url", ["http://example.com:abc/x", "https://example.com:99999/", "http://[::1"]
+)
+def test_malformed_urls_have_no_canonical_form(url):
+    from models.resource import Resource
+
+    assert canonicalize_url(url) is None
+    resource = Resource(url=url, notes=None)
+    resource.fingerprint()
+    assert resource.canonical_url is None
+
+
+def test_simhash_distance_tracks_edits():
+    edited = NOTES.replace("much cheaper", "a lot cheaper")
+    unrelated = (
+        "Gradient checkpointing trades compute for memory by recomputing activations "
+        "during the backward pass instead of storing all of them."
+    )
+
+    assert simhash(NOTES) == simhash(NOTES.upper())
+    assert hamming_distance(simhash(NOTES), simhash(edited)) <= 10
+    assert hamming_distance(simhash(NOTES), simhash(unrelated)) > 16
+    assert simhash("too short to fingerprint") is None
+
+
+class LLM:
+    def __init__(self):
+        self.calls = 0
+
+    def count_text_tokens(self, text):
+        return len(text.split())
+
+    def create_completion(self, **kwargs):
+        self.calls += 1
+        raise AssertionError("a duplicate should not reach the LLM")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    resource = SimpleNamespace(
+        id=7,
+        title="Partial indexes",
+        url="https://www.example.com/partial-indexes/",
+        notes=NOTES,
+        canonical_url=None,
+        notes_simhash=None,
+    )
+    project = SimpleNamespace(
+        id=1, name="DB", status="In Progress", description="",
+        tasks=[SimpleNamespace(resources=[resource])],
+    )
+    pipeline = NewProjectInfoEvaluatorPipeline(llm=LLM(), retrieval_top_k=0)
+    monkeypatch.setattr(pipeline, "get_project", lambda project_id: project)
+    return pipeline
+
+
+@pytest.mark.parametrize(
+    "user_input",
+    [
+        "https://example.com/partial-indexes?utm_source=feed",
+        NOTES.replace("keeps them small", "keeps them very small"),
+    ],
+)
+def test_duplicates_are_classified_without_the_llm(pipeline, user_input):
+    result = pipeline.evaluate_new_info(1, user_input)
+
+    assert result.novelty == Novelty.redundant
+    assert result.action == NewProjectInfoAction.EXCLUDE
+    assert result.related_resources == ["Partial indexes"]
+    assert pipeline.llm.calls == 0
+
+
+def test_new_content_is_not_a_duplicate(pipeline):
+    project = pipeline.get_project(1)
+    assert pipeline.find_duplicate(project, "https://example.com/another-post") is None
+    assert pipeline.find_duplicate(project, "My take on https://example.com/partial-indexes") is None
+    pipeline.duplicate_max_distance = None
+    assert pipeline.find_duplicate(project, NOTES) is None
+
+
+def test_malformed_urls_dont_break_duplicate_detection(pipeline):
+    project = pipeline.get_project(1)
+    resources = project.tasks[0].resources
+    resources.insert(0, SimpleNamespace(
+        id=8, title="Broken", url="http://[::1", notes=None, canonical_url=None, notes_simhash=None,
+    ))
+
+    assert pipeline.find_duplicate(project, "http://example.com:abc/x") is None
+    match = pipeline.find_duplicate(project, "https://example.com/partial-indexes")
+    assert match.resource.id == 7
+
+
+def test_stored_canonical_url_fits_its_column():
+    from models.resource import CANONICAL_URL_LENGTH, Resource
+
+    resource = Resource(url="http://example.com/" + "a" * 236, notes=None)
+    resource.fingerprint()
+    assert len(resource.url) == 255 and len(resource.canonical_url) == 256
+
+    resource.url = "https://example.com/?q=" + "é" * 200
+    resource.fingerprint()
+    assert len(canonicalize_url(resource.url)) > CANONICAL_URL_LENGTH
+    assert resource.canonical_url is None
@@ -0,0 +1,147 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.evaluation_job import EvaluationJob
+from models.project import Project
+from services import job_queue
+
+
+class Classification(BaseModel):
+    relevance: str
+    action: str
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.sqlite3'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Project(id=1, name="Nexus", status="In Progress"))
+    db.commit()
+    db.close()
+    yield Session
+    engine.dispose()
+
+
+def test_each_job_is_claimed_once(Session):
+    db = Session()
+    for i in range(20):
+        job_queue.enqueue_evaluation(db, 1, f"input {i}")
+    db.close()
+    claimed = []
+    lock = threading.Lock()
+
+    def claim(worker_id):
+        db = Session()
+        while (job := job_queue.claim_next_job(db, worker_id)) is not None:
+            with lock:
+                claimed.append(job.id)
+        db.close()
+
+    threads = [threading.Thread(target=claim, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(1, 21))
+
+
+def test_failed_job_is_retried_until_out_of_attempts(Session):
+    db = Session()
+    job_queue.enqueue_evaluation(db, 1, "input")
+    for attempt in range(1, 3):
+        job = job_queue.claim_next_job(db, "w")
+        assert job.attempts == attempt
+        job_queue.fail_job(db, job, "RuntimeError: boom", max_attempts=2)
+
+    assert job.status == "failed" and job.finished_at is not None
+    assert job_queue.claim_next_job(db, "w") is None
+
+
+def test_jobs_of_a_dead_worker_are_requeued(Session):
+    db = Session()
+    job_queue.enqueue_evaluation(db, 1, "input")
+    job = job_queue.claim_next_job(db, "dead")
+    job.heartbeat_at -= timedelta(seconds=600)
+    db.commit()
+
+    assert job_queue.requeue_stale_jobs(db, stale_after=300, max_attempts=3) == 1
+    assert job_queue.claim_next_job(db, "alive").worker_id == "alive"
+
+
+def test_worker_stores_results_and_errors(Session, caplog):
+    class Pipeline:
+        def evaluate_new_info(self, project_id, user_input):
+            if user_input == "bad":
+                raise ValueError("unparseable")
+            return Classification(relevance="strong_relevance", action="add_to_project")
+
+    db = Session()
+    good = job_queue.enqueue_evaluation(db, 1, "good")
+    bad = job_queue.enqueue_evaluation(db, 1, "bad")
+    worker = job_queue.EvaluationWorker(
+        concurrency=2,
+        poll_interval=0.01,
+        max_attempts=1,
+        pipeline_factory=Pipeline,
+        session_factory=Session,
+    )
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    while worker.processed < 2:
+        worker.stop_event.wait(0.01)
+    worker.stop()
+    thread.join()
+
+    db.expire_all()
+    assert good.status == "succeeded"
+    assert good.result == {"relevance": "strong_relevance", "action": "add_to_project"}
+    assert bad.status == "failed" and bad.error == "Evaluation failed"
+    # The details are logged, not stored for clients to read
+    assert "unparseable" in caplog.text
+
+
+@pytest.fixture
+def client(Session, monkeypatch):
+    from flask import Flask
+
+    from api import evaluations
+
+    db = Session()
+    monkeypatch.setattr(evaluations, "get_request_db", lambda: db)
+    app = Flask(__name__)
+    app.register_blueprint(evaluations.evaluations_bp)
+    yield app.test_client(), db
+    db.close()
+
+
+def test_submitted_evaluation_is_polled_until_done(client):
+    client, db = client
+    response = client.post("/projects/1/evaluations", json={"input": "A new article"})
+
+    assert response.status_code == 202
+    assert response.json["status"] == "queued"
+    pending = client.get(response.headers["Location"])
+    assert pending.status_code == 202 and pending.headers["Retry-After"]
+
+    job = db.get(EvaluationJob, response.json["id"])
+    job_queue.complete_job(db, job, {"relevance": "weak_relevance"})
+    done = client.get(response.headers["Location"])
+    assert done.status_code == 200 and done.json == {"relevance": "weak_relevance"}
+    assert client.get(f"/evaluations/{job.id}").json["status"] == "succeeded"
+
+
+def test_submit_and_poll_reject_unknown_ids(client):
+    client, _ = client
+    assert client.post("/projects/1/evaluations", json={}).status_code == 400
+    assert client.post("/projects/2/evaluations", json={"input": "x"}).status_code == 404
+    assert client.get("/evaluations/99/result").status_code == 404
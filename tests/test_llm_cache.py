@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from services.llm_cache import LLMResponseCache
+
+
+class Verdict(BaseModel):
+    label: str
+    score: float
+
+
+def params(content="hello", temperature=0.0):
+    return {
+        "model": "test-model",
+        "temperature": temperature,
+        "max_retries": 3,
+        "max_tokens": None,
+        "response_model": Verdict,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(tmp_path / "cache.sqlite3")
+
+
+def test_key_covers_request_and_schema(cache):
+    key = cache.make_key("openai", params())
+    assert key == cache.make_key("openai", params())
+    assert key == cache.make_key("openai", {**params(), "max_retries": 1})
+    assert key != cache.make_key("deepseek", params())
+    assert key != cache.make_key("openai", params(content="other"))
+    assert key != cache.make_key("openai", params(temperature=0.5))
+
+    class OtherVerdict(BaseModel):
+        label: str
+
+    assert key != cache.make_key("openai", {**params(), "response_model": OtherVerdict})
+
+
+def test_round_trip_rebuilds_model(cache):
+    cache.put("k", Verdict(label="new", score=0.5))
+    assert cache.get("k", Verdict) == Verdict(label="new", score=0.5)
+    assert cache.get("missing", Verdict) is None
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=0.05)
+    cache.put("k", Verdict(label="new", score=0.5))
+    time.sleep(0.1)
+    assert cache.get("k", Verdict) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    entry_size = len(Verdict(label="a", score=0.5).model_dump_json())
+    cache = LLMResponseCache(tmp_path / "cache.sqlite3", max_bytes=2 * entry_size)
+    cache.put("a", Verdict(label="a", score=0.5))
+    time.sleep(0.01)
+    cache.put("b", Verdict(label="b", score=0.5))
+    time.sleep(0.01)
+    cache.get("a", Verdict)  # "b" is now the least recently used
+    time.sleep(0.01)
+    cache.put("c", Verdict(label="c", score=0.5))
+    assert cache.get("b", Verdict) is None
+    assert cache.get("a", Verdict) is not None
+    assert cache.get("c", Verdict) is not None
+
+
+def test_concurrent_threads_share_one_call(cache):
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return Verdict(label="new", score=0.9)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("k", Verdict, compute))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [Verdict(label="new", score=0.9)] * 5
+    assert cache.get_or_compute("k", Verdict, compute) == Verdict(label="new", score=0.9)
+    assert len(calls) == 1
+
+
+def test_concurrent_tasks_share_one_call(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return Verdict(label="new", score=0.9)
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.aget_or_compute("k", Verdict, compute) for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [Verdict(label="new", score=0.9)] * 5
+    assert cache.stats()["shared"] == 4
+
+
+def test_failures_are_not_cached(cache):
+    async def fail():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.aget_or_compute("k", Verdict, fail))
+    assert cache.get("k", Verdict) is None
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class FakeAsyncClient:
+    """Stand-in for an instructor async client that tracks concurrency."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = []
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create_with_completion=self.create_with_completion)
+        )
+
+    async def create_with_completion(self, **params):
+        self.calls.append(params)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        result = params["response_model"](text=params["messages"][-1]["content"])
+        return result, SimpleNamespace(usage=None)
+
+
+def test_acreate_completion_bounds_concurrency(llm_factory_module, monkeypatch):
+    factory = llm_factory_module.LLMFactory("openai", max_concurrency=3)
+    fake = FakeAsyncClient()
+    monkeypatch.setattr(factory, "_initialize_client", lambda use_async=False: fake)
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                factory.acreate_completion(
+                    response_model=Answer,
+                    messages=[{"role": "user", "content": str(i)}],
+                )
+                for i in range(10)
+            )
+        )
+
+    results = asyncio.run(run())
+    assert [r.text for r in results] == [str(i) for i in range(10)]
+    assert fake.peak == 3
+    assert fake.calls[0]["model"] == factory.settings.default_model
+    assert fake.calls[0]["temperature"] == factory.settings.temperature
+
+    # A second event loop gets its own client and semaphore
+    asyncio.run(run())
+    assert len(fake.calls) == 20
+
+
+def test_cached_completion_skips_provider(llm_factory_module, monkeypatch, tmp_path):
+    from services.llm_cache import LLMResponseCache
+
+    factory = llm_factory_module.LLMFactory(
+        "openai", cache=LLMResponseCache(tmp_path / "cache.sqlite3")
+    )
+    fake = FakeAsyncClient()
+    monkeypatch.setattr(factory, "_initialize_client", lambda use_async=False: fake)
+    messages = [{"role": "user", "content": "same"}]
+
+    async def run():
+        first = await factory.acreate_completion(response_model=Answer, messages=messages)
+        second = await factory.acreate_completion(response_model=Answer, messages=messages)
+        uncached = await factory.acreate_completion(
+            response_model=Answer, messages=messages, use_cache=False
+        )
+        return first, second, uncached
+
+    first, second, uncached = asyncio.run(run())
+    assert first == second == uncached == Answer(text="same")
+    assert len(fake.calls) == 2
+
+
+class MockProvider(BaseHTTPRequestHandler):
+    """Speaks just enough of the OpenAI and Anthropic wire formats.
+
+    It mimics prefix caching: input already seen in an earlier request (the
+    marked system block for Anthropic, the longest common prefix for OpenAI)
+    is reported as cached, at one token per four characters.
+    """
+
+    requests = []
+    seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.path, body))
+        if self.path.endswith("/messages"):
+            cacheable = "".join(b["text"] for b in body["system"] if "cache_control" in b)
+            rest = "".join(b["text"] for b in body["system"] if "cache_control" not in b)
+            hit = cacheable in self.seen
+            self.seen.append(cacheable)
+            tool = body["tools"][0]["name"]
+            return self._reply(
+                {
+                    "id": "msg_1",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body["model"],
+                    "content": [
+                        {"type": "tool_use", "id": "toolu_1", "name": tool, "input": {"text": "ok"}}
+                    ],
+                    "stop_reason": "tool_use",
+                    "stop_sequence": None,
+                    "usage": {
+                        "input_tokens": len(rest) // 4 + 10,
+                        "output_tokens": 5,
+                        "cache_read_input_tokens": len(cacheable) // 4 if hit else 0,
+                        "cache_creation_input_tokens": 0 if hit else len(cacheable) // 4,
+                    },
+                }
+            )
+
+        prompt = "".join(m["content"] for m in body["messages"])
+        common = max((len(os.path.commonprefix([prompt, old])) for old in self.seen), default=0)
+        self.seen.append(prompt)
+        tool = body["tools"][0]["function"]["name"]
+        return self._reply(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [
+                                {
+                                    "id": "call_1",
+                                    "type": "function",
+                                    "function": {"name": tool, "arguments": '{"text": "ok"}'},
+                                }
+                            ],
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": 5,
+                    "total_tokens": len(prompt) // 4 + 5,
+                    "prompt_tokens_details": {"cached_tokens": common // 4},
+                },
+            }
+        )
+
+
+@pytest.fixture
+def mock_provider():
+    MockProvider.requests, MockProvider.seen = [], []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockProvider)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+STABLE = "You are a project manager. " * 100
+LAYOUT = [("Tasks: A, B", "first input"), ("Tasks: B, C", "second input")]
+
+
+def test_anthropic_gets_cache_control_blocks(llm_factory_module, monkeypatch, mock_provider):
+    import instructor
+    from anthropic import Anthropic
+    from services.prompt_cache import layout_messages
+
+    factory = llm_factory_module.LLMFactory("anthropic")
+    factory.client = instructor.from_anthropic(
+        Anthropic(api_key="test-key", base_url=mock_provider, max_retries=0)
+    )
+    for suffix, user_input in LAYOUT:
+        result = factory.create_completion(
+            response_model=Answer, messages=layout_messages(STABLE, suffix, user_input)
+        )
+        assert result.text == "ok"
+
+    path, body = MockProvider.requests[0]
+    assert path == "/v1/messages"
+    assert body["system"][0] == {
+        "type": "text",
+        "text": STABLE,
+        "cache_control": {"type": "ephemeral"},
+    }
+    assert body["system"][1] == {"type": "text", "text": "Tasks: A, B"}
+    usage = factory.prompt_cache_usage
+    assert usage.requests == 2
+    assert usage.cache_write_tokens == len(STABLE) // 4
+    assert usage.cached_tokens == len(STABLE) // 4
+
+
+def test_openai_gets_stable_prefix_first(llm_factory_module, monkeypatch, mock_provider):
+    import instructor
+    from openai import OpenAI
+    from services.prompt_cache import layout_messages
+
+    factory = llm_factory_module.LLMFactory("openai")
+    factory.client = instructor.from_openai(
+        OpenAI(api_key="test-key", base_url=f"{mock_provider}/v1", max_retries=0)
+    )
+    for suffix, user_input in LAYOUT:
+        factory.create_completion(
+            response_model=Answer, messages=layout_messages(STABLE, suffix, user_input)
+        )
+
+    path, body = MockProvider.requests[0]
+    assert path == "/v1/chat/completions"
+    assert body["messages"][0] == {"role": "system", "content": STABLE + "Tasks: A, B"}
+    assert body["messages"][1] == {"role": "user", "content": "first input"}
+    usage = factory.prompt_cache_usage
+    assert usage.requests == 2
+    # Everything up to the first differing suffix character came from the cache
+    assert usage.cached_tokens == len(STABLE + "Tasks: ") // 4
+    assert 0 < usage.hit_ratio < 1
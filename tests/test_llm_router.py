@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pydantic import BaseModel
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class StandIn:
+    """Local OpenAI-compatible server answering after `delay` seconds, or failing."""
+
+    def __init__(self, name, delay=0.0, status=200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stand_in.requests += 1
+                time.sleep(stand_in.delay)
+                if stand_in.status != 200:
+                    payload = json.dumps({"error": {"message": "injected fault"}}).encode()
+                else:
+                    arguments = json.dumps({"text": stand_in.name})
+                    payload = json.dumps(
+                        {
+                            "id": "chatcmpl-1",
+                            "object": "chat.completion",
+                            "created": 0,
+                            "model": body["model"],
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "finish_reason": "stop",
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": None,
+                                        "tool_calls": [
+                                            {
+                                                "id": "call_1",
+                                                "type": "function",
+                                                "function": {
+                                                    "name": body["tools"][0]["function"]["name"],
+                                                    "arguments": arguments,
+                                                },
+                                            }
+                                        ],
+                                    },
+                                }
+                            ],
+                        }
+                    ).encode()
+                try:
+                    self.send_response(stand_in.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # the client gave up on us
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_ins():
+    servers = []
+
+    def start(*specs):
+        servers.extend(StandIn(*spec) for spec in specs)
+        return servers
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def make_router(llm_factory_module):
+    import instructor
+    from openai import AsyncOpenAI
+    from services.llm_router import LLMRouter
+
+    def make(servers, **options):
+        factories = []
+        for provider, server in zip(("deepseek", "github_models", "openai"), servers):
+            factory = llm_factory_module.LLMFactory(provider)
+            factory._initialize_client = lambda use_async=False, url=server.url: instructor.from_openai(
+                AsyncOpenAI(api_key="test-key", base_url=url, max_retries=0)
+            )
+            factories.append(factory)
+        return LLMRouter(factories=factories, **options)
+
+    return make
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_hedge_beats_slow_primary(stand_ins, make_router):
+    slow, fast = stand_ins(("slow", 2.0), ("fast", 0.0))
+    router = make_router([slow, fast], hedge_delay_seconds=0.1, deadline_seconds=5)
+
+    start = time.perf_counter()
+    result = router.create_completion(Answer, MESSAGES)
+
+    assert result.text == "fast"
+    assert time.perf_counter() - start < 1.5
+    stats = router.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["providers"]["deepseek"]["cancelled"] == 1
+    assert stats["providers"]["github_models"]["p50_ms"] is not None
+
+
+def test_failover_on_error(stand_ins, make_router):
+    broken, healthy = stand_ins(("broken", 0.0, 500), ("healthy", 0.0))
+    router = make_router([broken, healthy], hedge_delay_seconds=10)
+
+    result = router.create_completion(Answer, MESSAGES, max_retries=1)
+
+    assert result.text == "healthy"
+    assert router.failovers == 1
+    assert router.hedges == 0
+    assert router.latency["deepseek"].errors == 1
+
+
+def test_all_providers_failing(stand_ins, make_router):
+    from services.llm_router import AllProvidersFailed
+
+    servers = stand_ins(("a", 0.0, 500), ("b", 0.0, 503))
+    router = make_router(servers, hedge_delay_seconds=10)
+
+    with pytest.raises(AllProvidersFailed) as raised:
+        router.create_completion(Answer, MESSAGES, max_retries=1)
+    assert [provider for provider, _ in raised.value.errors] == ["deepseek", "github_models"]
+
+
+def test_deadline_cancels_everything(stand_ins, make_router):
+    from services.llm_router import DeadlineExceeded
+
+    servers = stand_ins(("a", 2.0), ("b", 2.0))
+    router = make_router(servers, hedge_delay_seconds=0.05)
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        router.create_completion(Answer, MESSAGES, deadline=0.3)
+    assert time.perf_counter() - start < 1.0
+    assert router.deadlines_exceeded == 1
+
+
+def test_hedge_delay_follows_latency_percentile(make_router, stand_ins):
+    [server] = stand_ins(("only", 0.0))
+    router = make_router([server, server], hedge_min_samples=5, hedge_percentile=90)
+    stats = router.latency["deepseek"]
+    for ms in range(1, 11):
+        stats.record(ms / 1000)
+
+    assert router.hedge_delay(router.primary) == pytest.approx(0.0091)
+    assert asyncio.run(router.acreate_completion(Answer, MESSAGES)).text == "only"
@@ -0,0 +1,73 @@
+from markupsafe import Markup
+from types import SimpleNamespace
+from utils.markdown_helper import (
+    RENDERER_VERSION,
+    MarkdownRenderer,
+    md_to_html,
+    render_markdown_fields,
+    stored_html,
+)
+
+
+def test_md_to_html_empty():
+    assert md_to_html(None) == Markup("")
+    assert md_to_html("") == Markup("")
+
+
+def test_md_to_html_renders_and_sanitizes():
+    html = md_to_html("**bold**\n\n<script>alert(1)</script>")
+    assert isinstance(html, Markup)
+    assert "<strong>bold</strong>" in html
+    assert "<script>" not in html
+
+
+def test_renderer_reuse_does_not_leak_state():
+    renderer = MarkdownRenderer()
+    first = renderer.render("| a | b |\n|---|---|\n| 1 | 2 |")
+    second = renderer.render("plain text")
+    assert "<table>" in first
+    assert second == "<p>plain text</p>"
+
+
+def test_renderer_cache_hits_and_misses():
+    renderer = MarkdownRenderer()
+    renderer.render("# Title")
+    renderer.render("# Title")
+    renderer.render("other")
+    info = renderer.cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 2
+    assert info["size"] == 2
+
+
+def test_renderer_cache_is_bounded():
+    renderer = MarkdownRenderer(maxsize=2)
+    renderer.render("a")
+    renderer.render("b")
+    renderer.render("a")  # refresh "a" so "b" is evicted next
+    renderer.render("c")
+    assert renderer.cache_info()["size"] == 2
+    renderer.render("a")
+    assert renderer.cache_info()["hits"] == 2
+    renderer.render("b")
+    assert renderer.cache_info()["misses"] == 4
+
+    renderer.cache_clear()
+    assert renderer.cache_info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2}
+
+
+def test_render_markdown_fields_and_stored_html():
+    obj = SimpleNamespace(description="*hi*", context=None, markdown_version=None)
+    render_markdown_fields(obj, ("description", "context"))
+    assert obj.markdown_version == RENDERER_VERSION
+    assert obj.description_html == "<p><em>hi</em></p>"
+    assert obj.context_html is None
+    assert stored_html(obj, "context") == Markup("")
+
+    # Stored HTML is served as-is while the renderer version matches
+    obj.description_html = "<p>stored</p>"
+    assert stored_html(obj, "description") == Markup("<p>stored</p>")
+
+    # Stale rows fall back to rendering the source text
+    obj.markdown_version = RENDERER_VERSION - 1
+    assert stored_html(obj, "description") == Markup("<p><em>hi</em></p>")
@@ -0,0 +1,16 @@
+import pytest
+from datetime import datetime
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    updated_at = datetime(2025, 6, 11, 9, 41, 7, 215530)
+    cursor = encode_cursor(updated_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (updated_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "", encode_cursor(None, 1)])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
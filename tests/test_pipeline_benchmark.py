@@ -0,0 +1,45 @@
+import copy
+
+from benchmarks.pipeline_benchmark import SCENARIOS, compare, run_benchmark
+
+
+def test_benchmark_runs_every_scenario_offline(llm_factory_module):
+    results = run_benchmark(projects=2, tasks=3, resources=2, inputs=4, latency=0.01)
+
+    assert set(results["scenarios"]) == set(SCENARIOS)
+    for name, scenario in results["scenarios"].items():
+        stages = scenario["stages"]
+        assert stages["llm_wait"]["calls"] == 4, name
+        assert stages["llm_wait"]["p50_ms"] >= 10, name
+        assert {"render", "parse"} <= set(stages), name
+    assert {"db_load", "index", "retrieval", "context"} <= set(
+        results["scenarios"]["project_info"]["stages"]
+    )
+    # Traces, scores and dataset run links all went to the stand-in
+    assert results["langfuse_events"] > 0
+
+
+def test_compare_flags_slower_stages_only():
+    baseline = {
+        "scenarios": {
+            "new_info": {
+                "wall_ms_per_item": 60.0,
+                "stages": {
+                    "db_load": {"ms_per_item": 2.0},
+                    "render": {"ms_per_item": 0.2},
+                    "llm_wait": {"ms_per_item": 50.0},
+                },
+            }
+        }
+    }
+    results = copy.deepcopy(baseline)
+    stages = results["scenarios"]["new_info"]["stages"]
+    stages["db_load"]["ms_per_item"] = 4.0
+    # Triple, but still under the absolute noise floor
+    stages["render"]["ms_per_item"] = 0.6
+    # The fake provider's latency is configured, not a regression
+    stages["llm_wait"]["ms_per_item"] = 100.0
+
+    assert compare(results, baseline) == [
+        "new_info/db_load: 4.00 ms/item vs baseline 2.00 ms/item"
+    ]
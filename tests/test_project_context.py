@@ -0,0 +1,117 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from pipelines.pkm.project_context import (
+    PROJECT_TAG_TOKENS,
+    RESOURCE_TAG_TOKENS,
+    TASK_TAG_TOKENS,
+    ProjectContextBuilder,
+)
+
+
+# PROJECT_TAG_TOKENS plus "Project", "A project", "In Progress", "High"
+HEADER = PROJECT_TAG_TOKENS + 6
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def make_resource(title, notes, is_consumed=False, day=1):
+    return SimpleNamespace(
+        title=title,
+        url=f"https://example.com/{title}",
+        type="article",
+        notes=notes,
+        is_consumed=is_consumed,
+        added_at=datetime(2025, 1, day),
+        updated_at=None,
+    )
+
+
+def make_task(name, status, priority, resources=(), description="word " * 100, day=1):
+    return SimpleNamespace(
+        name=name,
+        description=description,
+        status=status,
+        priority=priority,
+        due_date=None,
+        created_at=datetime(2025, 1, day),
+        updated_at=None,
+        resources=list(resources),
+    )
+
+
+def make_project(tasks):
+    return SimpleNamespace(
+        name="Project",
+        description="A project",
+        purpose=None,
+        desired_outcome=None,
+        created_at=None,
+        deadline=None,
+        status="In Progress",
+        priority="High",
+        tasks=tasks,
+    )
+
+
+def test_everything_fits_in_a_large_budget():
+    project = make_project(
+        [make_task("a", "todo", "low", [make_resource("r", "some notes")])]
+    )
+    context = ProjectContextBuilder(count_words, token_budget=100_000).build(project)
+
+    assert context.dropped_tokens == 0
+    assert context.used_tokens == context.full_tokens
+    assert [entry.full for entry in context.tasks] == [True]
+    assert context.tasks[0].resources[0].full
+
+
+def test_top_ranked_items_get_full_text_and_the_rest_stubs():
+    done = make_task("done", "done", "high")
+    active = make_task("active", "in progress", "low")
+    todo = make_task("todo", "todo", "high")
+    project = make_project([done, active, todo])
+    # Room for all stubs and exactly one description
+    stubs = 3 * TASK_TAG_TOKENS + len("done done high todo todo high active in progress low".split())
+    budget = HEADER + stubs + 100
+    context = ProjectContextBuilder(count_words, token_budget=budget, stub_share=0.9).build(project)
+
+    # Project order is kept, only the in-progress task is in full
+    assert [entry.task.name for entry in context.tasks] == ["done", "active", "todo"]
+    assert [entry.full for entry in context.tasks] == [False, True, False]
+    assert context.stubbed_items == 2
+    assert context.dropped_tokens == 200
+    assert context.used_tokens <= budget
+
+
+def test_consumed_resources_rank_first_and_overflow_is_omitted():
+    consumed = make_resource("consumed", "note " * 50, is_consumed=True, day=1)
+    newest = make_resource("newest", "note " * 50, day=9)
+    task = make_task("task", "todo", "high", [newest, consumed], description="")
+    project = make_project([task])
+    task_stub = TASK_TAG_TOKENS + 3
+    resource_stub = RESOURCE_TAG_TOKENS + 3
+    budget = HEADER + task_stub + resource_stub
+    context = ProjectContextBuilder(count_words, token_budget=budget, stub_share=1).build(project)
+
+    [entry] = context.tasks
+    assert [r.resource.title for r in entry.resources] == ["consumed"]
+    assert context.omitted_resources == 1
+    assert context.dropped_tokens == 50 + (resource_stub + 50)
+
+
+def test_retrieval_restricts_resources():
+    kept = make_resource("kept", "notes")
+    pruned = make_resource("pruned", "notes")
+    kept.id, pruned.id = 1, 2
+    task = make_task("task", "todo", "high", [kept, pruned])
+    task.id = 10
+    context = ProjectContextBuilder(count_words, token_budget=100_000).build(
+        make_project([task]), resource_ids={1}, task_ids={10}
+    )
+
+    assert [r.resource.title for r in context.tasks[0].resources] == ["kept"]
+    assert context.pruned_resources == 1
+    assert context.dropped_tokens == 0
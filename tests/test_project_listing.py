@@ -0,0 +1,142 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.project import Project
+from utils.pagination import encode_cursor
+
+TIED = datetime(2025, 3, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+
+    from api import routes
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        # 1-3 share updated_at, so only the id orders them
+        Project(id=1, name="One", status="In Progress", priority="High",
+                deadline=datetime(2025, 6, 1), updated_at=TIED),
+        Project(id=2, name="Two", status="Completed", priority="Low",
+                deadline=datetime(2025, 6, 30), updated_at=TIED),
+        Project(id=3, name="Three", status="In Progress", priority="Low",
+                deadline=datetime(2025, 7, 1), updated_at=TIED),
+        Project(id=4, name="Four", status="In Progress", priority="High",
+                updated_at=datetime(2025, 1, 1)),
+        Project(id=5, name="Five", status="Completed", priority="High",
+                deadline=datetime(2025, 5, 31, 18, 0), updated_at=datetime(2025, 4, 1)),
+    ])
+    db.commit()
+    monkeypatch.setattr(routes, "get_request_db", lambda: db)
+    rendered = []
+
+    def render_template(name, **context):
+        rendered.append(context)
+        return name
+
+    monkeypatch.setattr(routes, "render_template", render_template)
+    app = Flask(__name__)
+    app.register_blueprint(routes.projects_bp)
+    client = app.test_client()
+
+    def listing(**params):
+        response = client.get("/projects", query_string=params)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return rendered[-1]
+
+    client.listing = listing
+    yield client
+    db.close()
+    engine.dispose()
+
+
+def ids(page):
+    return [project.id for project in page["projects"]]
+
+
+def test_pages_follow_each_other_through_ties(client):
+    pages = []
+    params = {"per_page": 2}
+    while True:
+        page = client.listing(**params)
+        pages.append(ids(page))
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert pages == [[5, 3], [2, 1], [4]]
+    first = client.listing(per_page=2)
+    assert first["is_first_page"] and first["stats"].total == 5
+    assert not client.listing(per_page=2, after=first["next_cursor"])["is_first_page"]
+
+
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        ({"status": "In Progress"}, [3, 1, 4]),
+        ({"priority": "High"}, [5, 1, 4]),
+        ({"status": "Completed", "priority": "High"}, [5]),
+        # Deadlines are whole days: the 31st includes its evening
+        ({"deadline_from": "2025-06-01"}, [3, 2, 1]),
+        ({"deadline_to": "2025-05-31"}, [5]),
+        ({"deadline_from": "2025-06-01", "deadline_to": "2025-06-30"}, [2, 1]),
+        ({"status": ""}, [5, 3, 2, 1, 4]),
+    ],
+)
+def test_filters(client, params, expected):
+    page = client.listing(**params)
+
+    assert ids(page) == expected
+    # Stats cover every project whatever the filters
+    assert page["stats"].total == 5
+
+
+def test_filters_carry_over_to_later_pages(client):
+    first = client.listing(status="In Progress", per_page=2)
+    second = client.listing(status="In Progress", per_page=2, after=first["next_cursor"])
+
+    assert (ids(first), ids(second)) == ([3, 1], [4])
+    assert second["filters"]["status"] == "In Progress"
+    assert second["filters"]["per_page"] == 2
+
+
+def tampered(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"after": "not-a-cursor"},
+        {"after": encode_cursor(None, 1)},
+        {"after": tampered(["2025-03-01T09:00:00", "1 OR 1=1"])},
+        {"after": tampered(["yesterday", 1])},
+        {"after": tampered(["2025-03-01T09:00:00+05:00", 3])},
+        {"after": tampered({"updated_at": "2025-03-01T09:00:00"})},
+        {"per_page": "ten"},
+        {"deadline_from": "01/06/2025"},
+    ],
+)
+def test_invalid_parameters_are_rejected(client, params):
+    response = client.get("/projects", query_string=params)
+
+    assert response.status_code == 400
+
+
+def test_cursor_past_every_project_is_an_empty_last_page(client):
+    page = client.listing(after=encode_cursor(datetime(2000, 1, 1), 1))
+
+    assert ids(page) == [] and page["next_cursor"] is None
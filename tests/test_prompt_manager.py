@@ -0,0 +1,42 @@
+import os
+
+import pytest
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+from prompts.prompt_manager import PromptManager
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        PromptManager,
+        "_env",
+        Environment(loader=FileSystemLoader(tmp_path), undefined=StrictUndefined),
+    )
+    monkeypatch.setattr(PromptManager, "_cache", {})
+    (tmp_path / "greet.j2").write_text("---\nauthor: Tester\n---\nHello {{ name }}!")
+    return tmp_path
+
+
+def test_compiled_template_is_reused(templates):
+    assert PromptManager.get_prompt("greet", name="Ann") == "Hello Ann!"
+    first = PromptManager.get_compiled("greet")
+    PromptManager.get_prompt("greet", name="Bob")
+    assert PromptManager.get_compiled("greet") is first
+    assert PromptManager.get_template_info("greet")["author"] == "Tester"
+
+
+def test_edited_template_is_recompiled(templates):
+    PromptManager.get_prompt("greet", name="Ann")
+    path = templates / "greet.j2"
+    path.write_text("---\nauthor: Tester\n---\nBye {{ name }} {{ title }}")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert PromptManager.get_prompt("greet", name="Ann", title="Dr") == "Bye Ann Dr"
+    assert set(PromptManager.get_template_info("greet")["variables"]) == {"name", "title"}
+
+
+def test_preload_builds_manifest(templates):
+    (templates / "other.j2").write_text("{{ a }}{{ b }}")
+    assert PromptManager.preload() == {"greet": ["name"], "other": ["a", "b"]}
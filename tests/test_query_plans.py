@@ -0,0 +1,19 @@
+import pytest
+from sqlalchemy import create_engine
+from database.database import Base
+from database.query_plans import check_hot_queries
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_hot_queries_use_indexes(engine):
+    results = check_hot_queries(engine)
+    missing = [(query.name, plan) for query, ok, plan in results if not ok]
+    assert not missing
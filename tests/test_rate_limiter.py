@@ -0,0 +1,140 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from config.llm_settings import RateLimit
+from services.rate_limiter import RateLimiter
+
+# 100 tokens a second, so waits in these tests stay well under a second
+LIMITS = {"deepseek": RateLimit(tokens_per_minute=6000)}
+
+
+def make_limiter(path):
+    return RateLimiter(path, LIMITS, poll_interval=0.01)
+
+
+def test_waits_for_the_bucket_to_refill(tmp_path):
+    limiter = make_limiter(tmp_path / "limits.sqlite3")
+
+    assert limiter.acquire("deepseek", 6000) < 0.1
+    waited = limiter.acquire("deepseek", 50)
+
+    assert 0.4 < waited < 1.0
+    assert limiter.stats()["lanes"]["interactive"]["acquired"] == 2
+
+
+def test_unlimited_bucket_never_waits(tmp_path):
+    limiter = make_limiter(tmp_path / "limits.sqlite3")
+    assert limiter.acquire("openai", 10**9) == 0.0
+    with pytest.raises(ValueError):
+        limiter.acquire("deepseek", 1, lane="bulk")
+
+
+def test_interactive_lane_goes_before_eval(tmp_path):
+    limiter = make_limiter(tmp_path / "limits.sqlite3")
+    limiter.acquire("deepseek", 6000)
+    served = []
+
+    def call(lane):
+        limiter.acquire("deepseek", 50, lane=lane)
+        served.append(lane)
+
+    threads = [threading.Thread(target=call, args=("eval",))]
+    threads[0].start()
+    time.sleep(0.1)
+    assert limiter.queue_depth() == {"deepseek": {"eval": 1}}
+    threads.append(threading.Thread(target=call, args=("interactive",)))
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+
+    assert served == ["interactive", "eval"]
+
+
+def test_settle_returns_unused_tokens(tmp_path):
+    limiter = make_limiter(tmp_path / "limits.sqlite3")
+    limiter.acquire("deepseek", 6000)
+    limiter.settle("deepseek", reserved=6000, actual=1000)
+
+    assert limiter.acquire("deepseek", 5000) < 0.1
+
+
+def _acquire_in_child(path, results):
+    results.put(make_limiter(path).acquire("deepseek", 50, lane="batch"))
+
+
+def test_processes_share_the_bucket(tmp_path):
+    path = tmp_path / "limits.sqlite3"
+    limiter = make_limiter(path)
+    limiter.acquire("deepseek", 6000)
+    # Overdraw by three seconds' worth so the bucket is still empty once the child is up
+    limiter.settle("deepseek", reserved=0, actual=300)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    child = context.Process(target=_acquire_in_child, args=(path, results))
+    child.start()
+    waited = results.get(timeout=5)
+    child.join()
+
+    assert waited > 0.5
+
+
+def test_factory_acquires_and_settles(llm_factory_module, monkeypatch, tmp_path):
+    from pydantic import BaseModel
+    from types import SimpleNamespace
+
+    class Answer(BaseModel):
+        text: str
+
+    class Client:
+        def __init__(self):
+            self.chat = SimpleNamespace(completions=self)
+            self.params = None
+
+        def create_with_completion(self, **params):
+            self.params = params
+            usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+            return Answer(text="ok"), SimpleNamespace(usage=usage)
+
+    factory = llm_factory_module.LLMFactory("deepseek")
+    factory.client = Client()
+    factory.rate_limiter = RateLimiter(
+        tmp_path / "limits.sqlite3", {"deepseek": RateLimit(tokens_per_minute=60000)}
+    )
+    settled = []
+    monkeypatch.setattr(factory.rate_limiter, "settle", lambda *args: settled.append(args))
+
+    factory.create_completion(Answer, [{"role": "user", "content": "hi"}], lane="batch")
+
+    assert "lane" not in factory.client.params
+    assert factory.rate_limiter.stats()["lanes"]["batch"]["acquired"] == 1
+    # Token counting is patched out and deepseek sets no max_tokens, so nothing was reserved
+    assert settled == [("deepseek", 0, 120)]
+
+
+def test_metrics_report_the_shared_limiter(llm_factory_module, monkeypatch, tmp_path):
+    from flask import Flask
+
+    from api.metrics import metrics_bp
+    from config.llm_settings import get_settings
+
+    app = Flask(__name__)
+    app.register_blueprint(metrics_bp)
+    client = app.test_client()
+    monkeypatch.setattr(llm_factory_module, "_shared_limiters", {})
+
+    assert client.get("/metrics/llm-rate-limits").json["enabled"] is False
+
+    monkeypatch.setenv("LLM_RATE_LIMITS", '{"deepseek": {"tokens_per_minute": 6000}}')
+    monkeypatch.setenv("LLM_RATE_LIMIT_PATH", str(tmp_path / "limits.sqlite3"))
+    get_settings.cache_clear()
+    llm_factory_module.get_rate_limiter().acquire("deepseek", 10, "batch")
+
+    metrics = client.get("/metrics/llm-rate-limits").json
+    assert metrics["limits"]["deepseek"]["tokens_per_minute"] == 6000
+    assert metrics["lanes"]["batch"]["acquired"] == 1
+    assert {"wait_seconds_avg", "wait_seconds_max"} <= set(metrics["lanes"]["batch"])
+    assert metrics["queue_depth"] == {}
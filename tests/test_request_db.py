@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database import database
+from database.database import Base, InstrumentedQueuePool, PoolWaitStats
+from models.project import Project
+
+
+class RecordingSession(Session):
+    """Session that remembers whether it was rolled back and closed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rolled_back = False
+        self.closed = False
+
+    def rollback(self):
+        self.rolled_back = True
+        super().rollback()
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    from flask import Flask
+
+    from api import db as request_db
+
+    engine = create_engine(f"sqlite:///{tmp_path}/app.sqlite3")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        request_db, "SessionLocal", sessionmaker(bind=engine, class_=RecordingSession)
+    )
+    app = Flask(__name__)
+    request_db.init_app(app)
+    app.sessions = []
+
+    @app.route("/projects/<name>", methods=["POST"])
+    def create(name):
+        db = request_db.get_request_db()
+        assert request_db.get_request_db() is db
+        app.sessions.append(db)
+        db.add(Project(name=name, status="In Progress"))
+        db.flush()
+        if name == "fail":
+            raise RuntimeError("after the flush, before the commit")
+        db.commit()
+        return "", 201
+
+    app.engine = engine
+    yield app
+    engine.dispose()
+
+
+def stored_names(engine):
+    with sessionmaker(bind=engine)() as db:
+        return db.scalars(select(Project.name)).all()
+
+
+def test_one_session_per_request_closed_at_teardown(app):
+    client = app.test_client()
+    assert client.post("/projects/a").status_code == 201
+    assert client.post("/projects/b").status_code == 201
+
+    first, second = app.sessions
+    assert first is not second
+    assert first.closed and second.closed
+    assert not first.rolled_back
+    assert stored_names(app.engine) == ["a", "b"]
+
+
+def test_failed_request_rolls_back_its_session(app):
+    response = app.test_client().post("/projects/fail")
+
+    assert response.status_code == 500
+    (session,) = app.sessions
+    assert session.rolled_back and session.closed
+    assert stored_names(app.engine) == []
+
+
+def test_pool_metrics_report_checkout_waits(monkeypatch, tmp_path):
+    from flask import Flask
+
+    from api.metrics import metrics_bp
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.sqlite3",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "pool_wait_stats", PoolWaitStats())
+
+    held = engine.connect()
+    with pytest.raises(Exception):
+        engine.connect()  # the only connection is taken: times out
+    release = threading.Timer(0.05, held.close)
+    release.start()
+    start = time.perf_counter()
+    engine.connect().close()  # waits for the timer to give it back
+    waited = time.perf_counter() - start
+    release.join()
+
+    app = Flask(__name__)
+    app.register_blueprint(metrics_bp)
+    stats = app.test_client().get("/metrics/db-pool").json
+    engine.dispose()
+
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert (stats["size"], stats["checked_out"], stats["timeout_seconds"]) == (1, 0, 0.2)
+    wait = stats["wait"]
+    assert (wait["checkouts"], wait["timeouts"]) == (2, 1)
+    # The timed-out checkout waited the full timeout, the last one for the timer
+    assert wait["max_wait_seconds"] >= 0.2
+    assert 0.04 <= wait["total_wait_seconds"] - wait["max_wait_seconds"] < waited + 0.01
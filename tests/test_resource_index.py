@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from services.resource_index import ResourceIndex
+
+
+def make_project(resources):
+    task = SimpleNamespace(
+        id=1, project_id=7, name="Research", description="Read up on the topic", resources=resources
+    )
+    return SimpleNamespace(id=7, tasks=[task])
+
+
+def make_resource(resource_id, title, notes):
+    return SimpleNamespace(id=resource_id, task_id=1, title=title, notes=notes)
+
+
+def test_search_ranks_similar_resources_first(tmp_path):
+    index = ResourceIndex(tmp_path / "index.sqlite3", dimensions=1024)
+    project = make_project(
+        [
+            make_resource(1, "Sourdough basics", "Starter hydration and long fermentation of bread dough"),
+            make_resource(2, "Postgres indexes", "B-tree and GIN indexes speed up query plans"),
+            make_resource(3, "Kubernetes intro", "Pods, deployments and services"),
+        ]
+    )
+    index.sync_project(project)
+
+    hits = index.search(7, "Which GIN indexes does Postgres need for this query?", k=2, kind="resource")
+
+    assert [hit.id for hit in hits][0] == 2
+    assert hits[0].score > hits[1].score
+    assert index.search(8, "indexes") == []
+
+
+def test_sync_only_reindexes_changed_documents(tmp_path):
+    index = ResourceIndex(tmp_path / "index.sqlite3", dimensions=1024)
+    resources = [make_resource(1, "A", "first notes"), make_resource(2, "B", "second notes")]
+    project = make_project(resources)
+
+    assert index.sync_project(project) == 3  # the task and both resources
+    assert index.sync_project(project) == 0
+
+    resources[0].notes = "rewritten notes"
+    assert index.sync_project(project) == 1
+
+    # Documents gone from the project are dropped
+    project.tasks[0].resources = resources[:1]
+    index.sync_project(project)
+    assert {hit.id for hit in index.search(7, "notes", k=None, kind="resource")} == {1}
+
+    index.remove_task(1)
+    assert index.search(7, "notes", k=None) == []
+
+
+def test_index_failures_dont_escape_the_write(tmp_path, monkeypatch, caplog):
+    from config.retrieval_settings import get_retrieval_settings
+    from services import resource_index
+
+    # The cache "directory" is a file, so the index can't be opened
+    (tmp_path / "cache").write_text("")
+    monkeypatch.setenv("RETRIEVAL_INDEX_ENABLED", "true")
+    monkeypatch.setenv("RETRIEVAL_INDEX_PATH", str(tmp_path / "cache" / "index.sqlite3"))
+    monkeypatch.setattr(resource_index, "_shared_indexes", {})
+    get_retrieval_settings.cache_clear()
+    try:
+        resource_index.reindex_resource(make_resource(1, "A", "notes"))
+        resource_index.unindex_project(7)
+    finally:
+        get_retrieval_settings.cache_clear()
+    assert caplog.text.count("Could not update the retrieval index") == 2
+
+    class Detached:
+        id = 1
+
+        @property
+        def task(self):
+            raise RuntimeError("lazy load on a closed session")
+
+    monkeypatch.setattr(resource_index, "get_resource_index", lambda: ResourceIndex(tmp_path / "ok.sqlite3"))
+    resource_index.reindex_resource(Detached())
+    assert caplog.text.count("Could not update the retrieval index") == 3
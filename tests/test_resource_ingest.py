@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.project import Project
+from models.resource import Resource
+from models.task import Task
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+
+    from api import routes
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Project(id=1, name="Nexus", status="In Progress"))
+    db.add_all([
+        Task(id=1, project_id=1, name="Read", sort_order=1024),
+        Task(id=2, project_id=1, name="Watch", sort_order=2048),
+    ])
+    db.add_all([
+        Resource(id=1, task_id=1, title="Old title", url="https://a.example", type="article", notes="keep"),
+        Resource(id=2, task_id=1, title="Same", url="https://b.example", type="article"),
+        Resource(id=3, task_id=2, title="Elsewhere", url="https://c.example", type="video"),
+    ])
+    db.commit()
+    monkeypatch.setattr(routes, "get_request_db", lambda: db)
+    app = Flask(__name__)
+    app.register_blueprint(routes.projects_bp)
+    yield app.test_client(), db
+    db.close()
+    engine.dispose()
+
+
+def test_batch_ingest_reports_each_row(client):
+    client, db = client
+    response = client.post(
+        "/projects/1/tasks/1/resources/batch",
+        json={
+            "resources": [
+                {"title": "New title", "url": "https://a.example", "type": "paper"},
+                {"title": "Same", "url": "https://b.example", "type": "article"},
+                {"title": "Taken", "url": "https://c.example", "type": "video"},
+                {"title": "Fresh", "url": "https://d.example", "type": "article", "notes": "n"},
+                {"title": "Again", "url": "https://d.example", "type": "article"},
+                {"title": "No url", "type": "article"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json["results"]
+    assert [r["status"] for r in results] == [
+        "updated", "unchanged", "conflict", "created", "duplicate", "invalid",
+    ]
+    assert [r.get("id") for r in results[:3]] == [1, 2, 3]
+    assert results[5]["error"] == "url is required"
+    assert response.json["counts"]["created"] == 1
+
+    db.expire_all()
+    updated = db.get(Resource, 1)
+    assert (updated.title, updated.type, updated.notes) == ("New title", "paper", "keep")
+    assert db.get(Resource, 3).task_id == 2
+    created = db.get(Resource, results[3]["id"])
+    assert (created.task_id, created.title, created.is_consumed) == (1, "Fresh", False)
+
+
+def test_batch_ingest_rejects_bad_requests(client):
+    client, _ = client
+    assert client.post("/projects/1/tasks/1/resources/batch", json={}).status_code == 400
+    response = client.post(
+        "/projects/1/tasks/9/resources/batch",
+        json={"resources": [{"title": "t", "url": "https://e.example", "type": "article"}]},
+    )
+    assert response.status_code == 404
+
+
+def test_batch_ingest_updates_is_consumed_only_when_given(client):
+    client, db = client
+    url = "/projects/1/tasks/1/resources/batch"
+    same = {"title": "Same", "url": "https://b.example", "type": "article"}
+
+    response = client.post(url, json={"resources": [{**same, "is_consumed": True}]})
+    assert response.json["results"][0]["status"] == "updated"
+    db.expire_all()
+    assert db.get(Resource, 2).is_consumed is True
+
+    response = client.post(url, json={"resources": [same, {**same, "url": "https://e.example"}]})
+    assert [r["status"] for r in response.json["results"]] == ["unchanged", "created"]
+    created_id = response.json["results"][1]["id"]
+    response = client.post(url, json={"resources": [{**same, "is_consumed": False}]})
+    assert response.json["results"][0]["status"] == "updated"
+    db.expire_all()
+    assert db.get(Resource, 2).is_consumed is False
+    assert db.get(Resource, created_id).is_consumed is False
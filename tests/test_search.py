@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.project import Project
+from models.resource import Resource
+from models.task import Task
+from services.search import search
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.sqlite3'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Project(id=1, name="Database tuning", description="Make the listing queries fast"))
+    db.add(Task(id=1, project_id=1, name="Read about indexes", description="Partial and covering indexes"))
+    db.add_all([
+        Resource(id=1, task_id=1, title="Indexes in depth", url="https://a.example", type="article",
+                 notes="B-tree <internals> explained"),
+        Resource(id=2, task_id=1, title="Vacuum", url="https://b.example", type="article",
+                 notes="How vacuum reclaims space used by old indexes"),
+    ])
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_results_are_ranked_and_linked_to_their_project(db):
+    results = search(db, "indexes")
+
+    # Title matches first, the resource that only mentions indexes in its notes last
+    assert {(hit.kind, hit.id) for hit in results.hits[:2]} == {("resource", 1), ("task", 1)}
+    assert (results.hits[-1].kind, results.hits[-1].id) == ("resource", 2)
+    assert {hit.project_id for hit in results.hits} == {1}
+    assert {hit.task_id for hit in results.hits} == {1}
+    assert results.backend == "sqlite" and results.elapsed_ms > 0
+    # Stemmed: "index" matches "indexes"
+    assert len(search(db, "index", kinds=["resource"]).hits) == 2
+
+
+def test_snippets_escape_text_and_mark_matches(db):
+    snippet = search(db, "internals", kinds=["resource"]).hits[0].snippet
+
+    assert str(snippet) == "B-tree &lt;<mark>internals</mark>&gt; explained https://a.example"
+
+
+def test_index_follows_writes_and_pages(db):
+    # Built from existing rows on first use, then kept current by triggers
+    assert search(db, "vacuum").hits
+    db.get(Resource, 2).title = "Autovacuum"
+    db.get(Resource, 2).notes = "Background cleanup"
+    db.delete(db.get(Resource, 1))
+    db.commit()
+
+    assert search(db, "vacuum").hits == []
+    assert [hit.id for hit in search(db, "autovacuum").hits] == [2]
+
+    first = search(db, "database OR", per_page=1)
+    assert first.hits == [] and not first.has_next
+    db.add_all(Task(project_id=1, name=f"Database chore {i}") for i in range(3))
+    db.commit()
+    pages = [search(db, "database", page=page, per_page=2) for page in (1, 2)]
+    assert [len(page.hits) for page in pages] == [2, 2]
+    assert pages[0].has_next and not pages[1].has_next
+
+
+def test_json_endpoint(db, monkeypatch):
+    from flask import Flask
+
+    from api import routes, search as search_api
+
+    monkeypatch.setattr(search_api, "get_request_db", lambda: db)
+    app = Flask(__name__)
+    app.register_blueprint(routes.projects_bp)
+    app.register_blueprint(search_api.search_bp)
+    client = app.test_client()
+
+    response = client.get("/search/json?q=covering&kind=task")
+    assert response.status_code == 200
+    assert response.json["results"][0]["url"] == "/projects/1/tasks/1"
+    assert client.get("/search/json").status_code == 400
+    assert client.get("/search/json?q=x&page=abc").status_code == 400
+
+
+def test_concurrent_first_searches_fill_the_index_once(db, monkeypatch):
+    import contextlib
+    import threading
+
+    from services import search as search_service
+
+    # Separate engines stand in for separate processes, which share no lock
+    monkeypatch.setattr(search_service, "_sqlite_lock", contextlib.nullcontext())
+    url = db.get_bind().url
+    engines = [create_engine(url) for _ in range(2)]
+    # Holds whoever checks for the index first until the other has had the chance too
+    checked = threading.Barrier(2)
+    schema = search_service.sqlite_schema
+
+    def slow_schema():
+        try:
+            checked.wait(timeout=0.5)
+        except threading.BrokenBarrierError:
+            pass
+        return schema()
+
+    monkeypatch.setattr(search_service, "sqlite_schema", slow_schema)
+    threads = [
+        threading.Thread(target=search_service.ensure_sqlite_index, args=(engine,))
+        for engine in engines
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for engine in engines:
+        engine.dispose()
+
+    indexed = db.execute(text("SELECT kind, row_id FROM search_index")).all()
+    assert sorted(indexed) == [("project", 1), ("resource", 1), ("resource", 2), ("task", 1)]
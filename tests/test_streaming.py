@@ -0,0 +1,190 @@
+import json
+from enum import Enum
+from typing import Optional
+
+import httpx
+import instructor
+import pytest
+from openai import OpenAI
+from pydantic import BaseModel
+
+
+class Verdict(str, Enum):
+    KEEP = "keep"
+    DROP = "drop"
+
+
+class Decision(BaseModel):
+    reasoning: str
+    verdict: Verdict
+    notes: str
+
+
+ANSWER = {"reasoning": "It repeats an earlier resource", "verdict": "drop", "notes": "n/a"}
+
+
+def streaming_handler(arguments, chunk_size=5, status=200):
+    """OpenAI chat completion stream that writes a tool call a few characters at a time."""
+    requests = []
+
+    def handle(request):
+        requests.append(json.loads(request.content))
+        if status != 200:
+            return httpx.Response(status, json={"error": {"message": "injected fault"}})
+        name = requests[-1]["tools"][0]["function"]["name"]
+        events = []
+        for start in range(0, len(arguments), chunk_size):
+            call = {"index": 0, "function": {"arguments": arguments[start : start + chunk_size]}}
+            if start == 0:
+                call.update(id="call_1", type="function")
+                call["function"]["name"] = name
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "test",
+                "choices": [{"index": 0, "delta": {"tool_calls": [call]}, "finish_reason": None}],
+            }
+            events.append(f"data: {json.dumps(chunk)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, content="".join(events).encode()
+        )
+
+    handle.requests = requests
+    return handle
+
+
+def use_transport(factory, handler):
+    factory.client = instructor.from_openai(
+        OpenAI(
+            api_key="test-key",
+            base_url="http://provider.test/v1",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+            max_retries=0,
+        )
+    )
+
+
+def test_stream_yields_partials_until_complete(llm_factory_module):
+    factory = llm_factory_module.LLMFactory("deepseek")
+    factory.cache = None
+    handler = streaming_handler(json.dumps(ANSWER))
+    use_transport(factory, handler)
+
+    partials = list(
+        factory.stream_completion(Decision, [{"role": "user", "content": "hi"}], max_retries=0)
+    )
+
+    assert len(partials) > 5
+    # The reasoning grows before the verdict exists; a half-written verdict never shows
+    assert partials[3].reasoning and partials[3].verdict is None
+    assert {p.verdict for p in partials} == {None, Verdict.DROP}
+    assert Decision.model_validate(partials[-1].model_dump()) == Decision(**ANSWER)
+    assert handler.requests[0]["stream"] is True
+
+
+def test_stream_is_cached_once_complete(llm_factory_module, tmp_path):
+    from services.llm_cache import LLMResponseCache
+
+    factory = llm_factory_module.LLMFactory(
+        "deepseek", cache=LLMResponseCache(tmp_path / "cache.sqlite3")
+    )
+    handler = streaming_handler(json.dumps(ANSWER))
+    use_transport(factory, handler)
+    messages = [{"role": "user", "content": "hi"}]
+
+    list(factory.stream_completion(Decision, messages, temperature=0))
+    replay = list(factory.stream_completion(Decision, messages, temperature=0))
+
+    assert replay == [Decision(**ANSWER)]
+    assert len(handler.requests) == 1
+
+
+def test_router_stream_fails_over_before_first_partial(llm_factory_module):
+    from services.llm_router import LLMRouter
+
+    broken = llm_factory_module.LLMFactory("deepseek")
+    healthy = llm_factory_module.LLMFactory("github_models")
+    for factory in (broken, healthy):
+        factory.cache = None
+    use_transport(broken, streaming_handler("", status=500))
+    use_transport(healthy, streaming_handler(json.dumps(ANSWER)))
+    router = LLMRouter(factories=[broken, healthy])
+
+    partials = list(
+        router.stream_completion(Decision, [{"role": "user", "content": "hi"}], max_retries=0)
+    )
+
+    assert partials[-1].verdict == Verdict.DROP
+    assert router.failovers == 1
+    assert router.latency["deepseek"].errors == 1
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+
+    from api import evaluations
+
+    class Partial(BaseModel):
+        reasoning: Optional[str] = None
+        relevance: Optional[str] = None
+        action: Optional[str] = None
+
+    class Pipeline:
+        def stream_new_info(self, project_id, user_input):
+            for fields in (
+                {"reasoning": "Sim"},
+                {"reasoning": "Similar to task 3"},
+                {"reasoning": "Similar to task 3"},
+                {"reasoning": "Similar to task 3", "relevance": "strong_relevance"},
+                {"reasoning": "Similar to task 3", "relevance": "strong_relevance", "action": "add_to_project"},
+            ):
+                yield Partial(**fields)
+                if user_input == "fail":
+                    raise RuntimeError("connection to 10.0.0.5 refused")
+
+    class Session:
+        def get(self, model, project_id):
+            return object() if project_id == 1 else None
+
+    monkeypatch.setattr(evaluations, "get_pipeline", lambda: Pipeline())
+    monkeypatch.setattr(evaluations, "get_request_db", lambda: Session())
+    app = Flask(__name__)
+    app.register_blueprint(evaluations.evaluations_bp)
+    return app.test_client()
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_sse_endpoint_sends_decisions_as_they_arrive(client):
+    response = client.post("/projects/1/evaluate/stream", json={"input": "A new article"})
+
+    assert response.mimetype == "text/event-stream"
+    events = parse_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == [
+        "partial", "partial", "partial", "relevance", "partial", "action", "done",
+    ]
+    assert events[3][1] == {"relevance": "strong_relevance"}
+    assert events[-1][1]["action"] == "add_to_project"
+
+
+def test_sse_endpoint_validates_before_streaming(client):
+    assert client.get("/projects/1/evaluate/stream").status_code == 400
+    assert client.get("/projects/2/evaluate/stream?input=hello").status_code == 404
+
+
+def test_sse_endpoint_hides_failure_details(client, caplog):
+    response = client.post("/projects/1/evaluate/stream", json={"input": "fail"})
+
+    events = parse_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == ["partial", "error"]
+    assert events[-1][1] == {"error": "Evaluation failed"}
+    assert "10.0.0.5" in caplog.text
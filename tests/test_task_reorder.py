@@ -0,0 +1,167 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registers the tables on Base.metadata)
+from database.database import Base
+from models.project import Project
+from models.task import Task
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+
+    from api import routes
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Project(id=1, name="Nexus", status="In Progress"),
+        Project(id=2, name="Other", status="In Progress"),
+    ])
+    db.add_all([
+        Task(id=1, project_id=1, name="One", sort_order=1024),
+        Task(id=2, project_id=1, name="Two", sort_order=2048),
+        Task(id=3, project_id=1, name="Three", sort_order=3072),
+        Task(id=4, project_id=2, name="Elsewhere", sort_order=1024),
+    ])
+    db.commit()
+    monkeypatch.setattr(routes, "get_request_db", lambda: db)
+    app = Flask(__name__)
+    app.register_blueprint(routes.projects_bp)
+    yield app.test_client(), db
+    db.close()
+    engine.dispose()
+
+
+def task_order(db, project_id=1):
+    db.expire_all()
+    tasks = db.query(Task).filter(Task.project_id == project_id)
+    return [task.id for task in tasks.order_by(Task.sort_order, Task.id)]
+
+
+def test_full_order_is_applied(client):
+    client, db = client
+    response = client.post(
+        "/projects/1/tasks/reorder",
+        json={"taskOrders": [
+            {"taskId": 1, "order": 3}, {"taskId": 2, "order": 1}, {"taskId": 3, "order": 2},
+        ]},
+    )
+
+    assert response.status_code == 200
+    assert task_order(db) == [2, 3, 1]
+
+
+@pytest.mark.parametrize(
+    "task_orders",
+    [
+        [{"taskId": 1, "order": 1}, {"taskId": "2", "order": 2}, {"taskId": 3, "order": 3}],
+        [{"taskId": 1, "order": 1}, {"taskId": 2, "order": True}, {"taskId": 3, "order": 3}],
+        [{"taskId": 1, "order": 2}, {"taskId": 2, "order": 1}],
+        [{"taskId": 1, "order": 1}, {"taskId": 2, "order": 2}, {"taskId": 2, "order": 3}],
+        [{"taskId": 1, "order": 1}, {"taskId": 2, "order": 2}, {"taskId": 4, "order": 3}],
+        [{"taskId": 1, "order": 1}, {"taskId": 2, "order": 2}, {"taskId": 3, "order": 3}, 4],
+        [],
+        {"taskId": 1, "order": 1},
+    ],
+)
+def test_bad_full_orders_are_rejected(client, task_orders):
+    client, db = client
+    response = client.post("/projects/1/tasks/reorder", json={"taskOrders": task_orders})
+
+    assert response.status_code == 400
+    assert response.json["status"] == "error"
+    assert task_order(db) == [1, 2, 3]
+    assert task_order(db, project_id=2) == [4]
+
+
+def move(client, **fields):
+    return client.post("/projects/1/tasks/reorder", json={"move": fields})
+
+
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        ({"taskId": 1, "afterId": 2}, [2, 1, 3]),
+        ({"taskId": 1, "afterId": 3}, [2, 3, 1]),
+        ({"taskId": 3, "beforeId": 1}, [3, 1, 2]),
+        ({"taskId": 1, "beforeId": 3}, [2, 1, 3]),
+        # afterId wins when both are given
+        ({"taskId": 3, "afterId": 1, "beforeId": 2}, [1, 3, 2]),
+        ({"taskId": 2, "afterId": None, "beforeId": None}, [1, 2, 3]),
+    ],
+)
+def test_single_move_updates_only_the_moved_task(client, fields, expected):
+    client, db = client
+    response = move(client, **fields)
+
+    assert response.status_code == 200
+    assert task_order(db) == expected
+    others = {task.id: task.sort_order for task in db.query(Task) if task.id != fields["taskId"]}
+    original = {1: 1024, 2: 2048, 3: 3072, 4: 1024}
+    assert others == {task_id: original[task_id] for task_id in others}
+
+
+def test_move_renumbers_when_neighbours_have_no_gap(client):
+    client, db = client
+    db.get(Task, 2).sort_order = 1025
+    db.commit()
+
+    assert move(client, taskId=3, afterId=1).status_code == 200
+    assert task_order(db) == [1, 3, 2]
+    keys = [db.get(Task, task_id).sort_order for task_id in (1, 3, 2)]
+    assert keys[0] < keys[1] < keys[2] and keys[1] - keys[0] > 1
+
+
+def test_move_gives_legacy_tasks_keys_first(client):
+    client, db = client
+    for task_id in (1, 2, 3):
+        db.get(Task, task_id).sort_order = None
+    db.commit()
+
+    assert move(client, taskId=1, afterId=3).status_code == 200
+    assert task_order(db) == [2, 3, 1]
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"taskId": 99, "afterId": 1},
+        {"taskId": 99},
+        {"taskId": 1, "afterId": 99},
+        {"taskId": 4, "afterId": 1},
+        {"taskId": 1, "beforeId": 4},
+    ],
+)
+def test_move_of_unknown_or_foreign_task_is_not_found(client, fields):
+    client, db = client
+    response = move(client, **fields)
+
+    assert response.status_code == 404
+    assert task_order(db) == [1, 2, 3]
+    assert task_order(db, project_id=2) == [4]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"move": 5},
+        {"move": [1, 2]},
+        {"move": {"afterId": 2}},
+        {"move": {"taskId": "1", "afterId": 2}},
+        {"move": {"taskId": True, "afterId": 2}},
+        {"move": {"taskId": 1, "afterId": "2"}},
+    ],
+)
+def test_malformed_moves_are_rejected(client, payload):
+    client, db = client
+    response = client.post("/projects/1/tasks/reorder", json=payload)
+
+    assert response.status_code == 400
+    assert task_order(db) == [1, 2, 3]
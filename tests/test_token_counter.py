@@ -0,0 +1,60 @@
+from services import token_counter
+from services.token_counter import TokenCounter
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": "Hello there, how are you today?"},
+]
+
+
+def test_estimate_for_non_openai_providers():
+    count = TokenCounter(mode="auto").count_messages(MESSAGES, "anthropic", "claude-3-5-sonnet-20240620")
+    assert count.method == "estimate"
+    assert count.encoding is None
+    assert len(count.per_message) == 2
+    assert count.total == sum(count.per_message) + token_counter.TOKENS_PER_REPLY
+
+
+def test_off_mode_skips_counting():
+    assert TokenCounter(mode="off").count_messages(MESSAGES, "openai", "gpt-4o") is None
+
+
+def test_exact_count_uses_cached_encoder(monkeypatch):
+    loads = []
+
+    class FakeEncoding:
+        name = "fake_base"
+
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    def fake_get_encoding(name):
+        loads.append(name)
+        return FakeEncoding()
+
+    monkeypatch.setattr(token_counter.tiktoken, "get_encoding", fake_get_encoding)
+    token_counter.get_encoding.cache_clear()
+    try:
+        counter = TokenCounter(mode="auto")
+        first = counter.count_messages(MESSAGES, "github_models", "openai/gpt-4.1-mini")
+        counter.count_messages(MESSAGES, "openai", "gpt-4.1")
+    finally:
+        token_counter.get_encoding.cache_clear()
+
+    assert loads == ["o200k_base"]
+    assert first.method == "tiktoken"
+    # Role and content are encoded together, as in the chat format
+    assert first.per_message == [3 + 5, 3 + 6]
+
+
+def test_unavailable_tokenizer_falls_back_to_estimate(monkeypatch):
+    def offline(name):
+        raise OSError("no network")
+
+    monkeypatch.setattr(token_counter.tiktoken, "get_encoding", offline)
+    token_counter.get_encoding.cache_clear()
+    try:
+        count = TokenCounter(mode="exact").count_messages(MESSAGES, "openai", "gpt-4o")
+    finally:
+        token_counter.get_encoding.cache_clear()
+    assert count.method == "estimate"